@@ -0,0 +1,78 @@
+"""
+Benchmark: a batch run vs one graph run per RFP.
+
+Writes generated RFPs (line items drawn from a shared pool of specs, as in
+benchmarks/prequalify.py) to a temporary RFP_DIR, then times
+- per-RFP: the compiled graph invoked once per RFP ID (what N calls to
+  /api/v1/trigger cost, without the queueing)
+- batch: src.agents.batch.run_batch over all IDs (one repository load,
+  each distinct spec matched once)
+and checks that both give every RFP the same grand total.
+
+Usage:
+    python benchmarks/batch_trigger.py --rfps 50 200 --items 8 --spec-pool 40
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rfps", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--items", type=int, default=8, help="max line items per RFP")
+    parser.add_argument("--spec-pool", type=int, default=40, help="distinct line item specs across all RFPs")
+    args = parser.parse_args()
+
+    # Before importing the agents: the RFP registry reads RFP_DIR at import
+    rfp_dir = tempfile.mkdtemp(prefix="batch_bench_")
+    os.environ["RFP_DIR"] = rfp_dir
+    os.environ["EVENT_STDOUT"] = "0"
+    from prequalify import make_rfps, make_spec_pool
+    from src.agents.batch import run_batch
+    from src.data_layer.rfp_registry import get_rfp_registry
+    from src.graph import get_app_graph
+
+    rng = random.Random(7)
+    pool = make_spec_pool(args.spec_pool, rng)
+    graph = get_app_graph()
+
+    print(f"{'rfps':>6}{'items':>7}{'unique':>8}{'per-RFP s':>11}{'batch s':>9}{'speedup':>9}")
+    for n in args.rfps:
+        rfps = make_rfps(n, args.items, pool, rng, datetime.now())
+        with open(os.path.join(rfp_dir, "bench_rfp.json"), "w") as f:
+            json.dump(rfps, f)
+        get_rfp_registry().refresh(force=True)
+        ids = [rfp["id"] for rfp in rfps]
+
+        start = time.perf_counter()
+        expected = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for rfp_id in ids:
+                out = graph.invoke({"pipeline_id": rfp_id, "demo_mode": True, "available_rfps": [],
+                                    "selected_rfp_id": rfp_id, "rfp_url": None, "selection_reason": None})
+                expected[rfp_id] = out["final_response"]["grand_total"]
+        per_rfp = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run_batch("bench", [{"pipeline_id": rfp_id, "rfp_id": rfp_id} for rfp_id in ids])
+        batch = time.perf_counter() - start
+
+        got = {pid: r["output"]["final_response"]["grand_total"] for pid, r in result["results"].items()}
+        assert got == expected, "batch totals differ from per-RFP totals"
+        stats = result["stats"]
+        print(f"{n:>6}{stats['line_items']:>7}{stats['unique_specs']:>8}{per_rfp:>11.3f}{batch:>9.3f}{per_rfp / batch:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
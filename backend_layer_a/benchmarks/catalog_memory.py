@@ -0,0 +1,87 @@
+"""
+Memory benchmark: dict-based JsonProductRepository vs ColumnarProductRepository.
+
+Generates a synthetic cable catalog, loads it with each repository (including
+the spec index) and reports the memory retained after load.
+
+Usage:
+    python benchmarks/catalog_memory.py --skus 200000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.data_layer.json_impl import JsonProductRepository
+from src.data_layer.columnar_impl import ColumnarProductRepository
+
+VOLTAGES = ["1.1kV", "3.3kV", "6.6kV", "11kV", "22kV", "33kV", "66kV", "132kV", "220kV"]
+SIZES = [16, 25, 35, 50, 70, 95, 120, 150, 185, 240, 300, 400, 500, 630, 800, 1000]
+MATERIALS = ["Copper", "Aluminum"]
+INSULATIONS = ["XLPE", "PVC", "Mica Tape + XLPE", "EPR"]
+SHEATHS = ["PVC", "LSZH", "Lead Alloy", "HDPE"]
+
+
+def generate_catalog(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    catalog = []
+    for i in range(n):
+        voltage, size, cores = rng.choice(VOLTAGES), rng.choice(SIZES), rng.choice([1, 2, 3, 4])
+        material = rng.choice(MATERIALS)
+        specs = {
+            "voltage": voltage,
+            "conductor_size_mm2": size,
+            "conductor_material": material,
+            "insulation": rng.choice(INSULATIONS),
+            "cores": cores,
+            "sheath": rng.choice(SHEATHS),
+        }
+        if rng.random() < 0.2:
+            specs["properties"] = ["Fire Resistant", "Low Smoke"]
+        catalog.append({
+            "sku_id": f"SKU-{i:07d}-{voltage}-{size}",
+            "product_name": f"{voltage} {cores}x{size}mm2 {specs['insulation']} {material} Cable",
+            "specs": specs,
+        })
+    return catalog
+
+
+def measure(repo_cls, data_dir: str) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    repo = repo_cls(data_dir)
+    repo.find_by_specs({"voltage": "11kV", "conductor_size_mm2": 185})  # load + index
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del repo
+    return {"retained_mb": current / 2**20, "peak_mb": peak / 2**20, "load_s": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--skus", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        with open(os.path.join(data_dir, "product_repo.json"), "w") as f:
+            json.dump(generate_catalog(args.skus), f)
+
+        print(f"Catalog: {args.skus} SKUs")
+        print(f"{'repository':<28}{'retained MB':>14}{'peak MB':>12}{'load s':>10}")
+        for repo_cls in (JsonProductRepository, ColumnarProductRepository):
+            r = measure(repo_cls, data_dir)
+            print(f"{repo_cls.__name__:<28}{r['retained_mb']:>14.1f}{r['peak_mb']:>12.1f}{r['load_s']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
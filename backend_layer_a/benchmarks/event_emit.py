@@ -0,0 +1,104 @@
+"""
+Microbenchmark: per-event cost of emit_event on the calling thread.
+
+Compares the old inline path (strftime + json.dumps + print) with the
+EventSink (enqueue only, serialized on the writer thread), with stdout
+disabled, and with sampling. Output goes to /dev/null; the writer thread's
+drain time is reported separately.
+
+Usage:
+    python benchmarks/event_emit.py --events 50000 --items 500 --threads 4
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.utils.logger import EventBus, EventSink
+
+
+def inline_emit(event_type: str, payload: dict):
+    # What emit_event used to do on every call
+    event = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "type": event_type,
+        "payload": payload
+    }
+    print(f"[EVENT] {json.dumps(event)}")
+    return event
+
+
+def make_payload(items: int) -> dict:
+    # Shaped like the technical agent's AGENT_OUTPUT with a per-item list
+    return {
+        "agent": "Technical Agent",
+        "output": {
+            "message": "Completed technical spec matching.",
+            "processed_items": items,
+            "status_flags": ["STANDARD"] * items,
+        },
+    }
+
+
+def run(emit, events: int, threads: int, items: int) -> float:
+    """Mean calling-thread cost per event, in microseconds."""
+    per_thread = events // threads
+    timings = []
+
+    def worker():
+        payload = make_payload(items)
+        start = time.perf_counter()
+        for _ in range(per_thread):
+            emit("AGENT_OUTPUT", payload)
+        timings.append(time.perf_counter() - start)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return sum(timings) / (per_thread * threads) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--items", type=int, default=500, help="length of the per-item list in each payload")
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    devnull = open(os.devnull, "w")
+    real_stdout, sys.stdout = sys.stdout, devnull
+    results = []
+    try:
+        results.append(("inline print", run(inline_emit, args.events, args.threads, args.items), 0.0))
+
+        configs = [
+            ("sink", dict(enabled=True)),
+            ("sink, 10% sampled", dict(enabled=True, sample_rates={"AGENT_OUTPUT": 0.1})),
+            ("sink, level=WARNING", dict(enabled=True, level="WARNING")),
+            ("stdout disabled", dict(enabled=False)),
+        ]
+        for name, kwargs in configs:
+            # Large enough that nothing is dropped during the run
+            bus = EventBus(EventSink(stream=devnull, max_pending=args.events + 1, **kwargs))
+            cost = run(bus.emit, args.events, args.threads, args.items)
+            start = time.perf_counter()
+            bus.sink.flush(timeout=600)
+            results.append((name, cost, time.perf_counter() - start))
+    finally:
+        sys.stdout = real_stdout
+        devnull.close()
+
+    print(f"{args.events} events, {args.items}-item payloads, {args.threads} threads")
+    print(f"{'mode':<24}{'us/event (caller)':>20}{'writer drain s':>16}")
+    for name, cost, drain in results:
+        print(f"{name:<24}{cost:>20.2f}{drain:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Local-server harness for the pooled HTTP fetcher (src/tools/http_fetcher).
+
+Starts a fake document server (http.server, reachable as 127.0.0.1 and
+localhost) and fetches from it through the shared fetcher, with a fresh
+on-disk cache:
+- ETag and Last-Modified documents are fetched twice. The second fetch
+  must be answered with a 304 and served from the cache (from_cache=True,
+  same body). A document whose ETag changes must be downloaded again.
+- Bodies over HTTP_MAX_BYTES must raise FetchTooLarge, both with a
+  Content-Length and when streamed without one.
+- Concurrent fetches of slow pages must never have more than
+  HTTP_PER_HOST requests in flight per host.
+
+Exits non-zero if any check fails.
+
+Usage:
+    python benchmarks/fetch_harness.py --per-host 3 --requests 24 --delay 0.1
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class DocumentServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class DocumentHandler(BaseHTTPRequestHandler):
+    max_bytes = 0
+    delay = 0.0
+    versions = Counter()     # path -> ETag version, bumped by /bump
+    statuses = Counter()     # (path, status) served
+    in_flight = Counter()    # host -> slow requests running now
+    peak = Counter()         # host -> most slow requests running at once
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers=(), length: bool = True):
+        with self.lock:
+            self.statuses[(urlsplit(self.path).path, status)] += 1
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        if length:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path in ("/etag", "/changing"):
+            etag = f'"{path[1:]}-v{self.versions[path]}"'
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, headers=[("ETag", etag)])
+            body = f"document {path} version {self.versions[path]}\n".encode("utf-8") * 50
+            return self._send(200, body, [("ETag", etag), ("Content-Type", "text/plain; charset=utf-8")])
+        if path == "/bump":
+            self.versions["/changing"] += 1
+            return self._send(200, b"ok")
+        if path == "/lastmod":
+            if self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                return self._send(304, headers=[("Last-Modified", LAST_MODIFIED)])
+            return self._send(200, b"last-modified document\n" * 50,
+                              [("Last-Modified", LAST_MODIFIED), ("Content-Type", "text/plain")])
+        if path == "/big":
+            return self._send(200, b"x" * (self.max_bytes + 1), [("Content-Type", "application/pdf")])
+        if path == "/big-streamed":
+            # No Content-Length: the cap has to trip while reading
+            return self._send(200, b"x" * (self.max_bytes * 4), [("Content-Type", "application/pdf")], length=False)
+        if path == "/slow":
+            host = self.headers.get("Host", "").split(":")[0]
+            with self.lock:
+                self.in_flight[host] += 1
+                self.peak[host] = max(self.peak[host], self.in_flight[host])
+            try:
+                time.sleep(self.delay)
+                return self._send(200, b"slow page\n", [("Content-Type", "text/plain")])
+            finally:
+                with self.lock:
+                    self.in_flight[host] -= 1
+        self._send(404)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--per-host", type=int, default=3, help="HTTP_PER_HOST for the run")
+    parser.add_argument("--requests", type=int, default=24, help="concurrent slow fetches, split over two hosts")
+    parser.add_argument("--delay", type=float, default=0.1, help="seconds a slow page takes")
+    parser.add_argument("--max-bytes", type=int, default=64 * 1024, help="HTTP_MAX_BYTES for the run")
+    args = parser.parse_args()
+
+    # Before importing the fetcher: module-level configuration
+    os.environ["HTTP_CACHE_DIR"] = tempfile.mkdtemp(prefix="fetch_harness_")
+    os.environ["HTTP_PER_HOST"] = str(args.per_host)
+    os.environ["HTTP_MAX_BYTES"] = str(args.max_bytes)
+    from src.tools.http_fetcher import FetchTooLarge, fetch_url, fetch_url_async, fetcher_stats
+
+    DocumentHandler.max_bytes = args.max_bytes
+    DocumentHandler.delay = args.delay
+    server = DocumentServer(("127.0.0.1", free_port()), DocumentHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    base = f"http://127.0.0.1:{port}"
+    statuses = DocumentHandler.statuses
+
+    problems = []
+
+    def check(ok: bool, message: str):
+        print(f"  {'ok  ' if ok else 'FAIL'} {message}")
+        if not ok:
+            problems.append(message)
+
+    print("revalidation")
+    for path in ("/etag", "/lastmod"):
+        first = fetch_url(base + path)
+        second = fetch_url(base + path)
+        check(not first.from_cache and first.status == 200, f"{path}: first fetch downloaded")
+        check(second.from_cache and second.content == first.content and statuses[(path, 304)] == 1,
+              f"{path}: second fetch got a 304 and the cached body")
+    fetch_url(base + "/changing")
+    fetch_url(base + "/bump")
+    changed = fetch_url(base + "/changing")
+    check(not changed.from_cache and b"version 1" in changed.content, "/changing: new ETag downloaded again")
+
+    print("size cap")
+    for path in ("/big", "/big-streamed"):
+        try:
+            fetch_url(base + path)
+            check(False, f"{path}: FetchTooLarge raised")
+        except FetchTooLarge:
+            check(True, f"{path}: FetchTooLarge raised")
+
+    print("per-host limit")
+    hosts = ["127.0.0.1", "localhost"]
+    urls = [f"http://{hosts[i % 2]}:{port}/slow?i={i}" for i in range(args.requests)]
+
+    async def fetch_all():
+        return await asyncio.gather(*[fetch_url_async(url) for url in urls])
+
+    start = time.perf_counter()
+    results = asyncio.run(fetch_all())
+    elapsed = time.perf_counter() - start
+    peak = dict(DocumentHandler.peak)
+    check(all(r.status == 200 for r in results), f"{len(urls)} slow fetches completed in {elapsed:.3f}s")
+    check(max(peak.values()) <= args.per_host, f"peak in flight per host {peak} <= {args.per_host}")
+
+    print(f"fetcher counters: {fetcher_stats()}")
+    server.shutdown()
+    if problems:
+        print("FAIL: " + "; ".join(problems))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Cold-start check: import time of the API module, via python -X importtime.
+
+Imports the target module in fresh interpreters, reports the median
+cumulative import time and the heaviest imports, and exits non-zero if
+the median exceeds --max-ms or if a module that should load lazily
+(langgraph, langchain, numpy, httpx, pypdf) is imported at startup.
+
+Usage:
+    python benchmarks/import_time.py --module src.main --runs 5 --max-ms 1500
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Needed by pipelines, not by the API process until the first run (or warm-up)
+LAZY_MODULES = ["langgraph", "langchain", "langchain_core", "langchain_google_genai", "numpy", "httpx", "pypdf"]
+
+
+def import_profile(module: str) -> List[Tuple[str, int, int]]:
+    """(module, self us, cumulative us) for every import of one cold run."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": ROOT},
+    )
+    if proc.returncode != 0:
+        sys.exit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=1500, help="fail if the median import time exceeds this")
+    parser.add_argument("--top", type=int, default=10, help="heaviest top-level imports to show")
+    args = parser.parse_args()
+
+    totals = []
+    profile: List[Tuple[str, int, int]] = []
+    for _ in range(args.runs):
+        profile = import_profile(args.module)
+        total = next((cumulative for name, _, cumulative in profile if name == args.module), None)
+        if total is None:
+            sys.exit(f"{args.module} not in the import profile (already imported by site?)")
+        totals.append(total / 1000)
+
+    median = statistics.median(totals)
+    print(f"import {args.module}: median {median:.0f} ms over {args.runs} runs "
+          f"(min {min(totals):.0f}, max {max(totals):.0f}), threshold {args.max_ms:.0f} ms")
+
+    # Top-level packages by cumulative time, from the last run
+    packages: Dict[str, int] = {}
+    for name, _, cumulative in profile:
+        top = name.split(".")[0]
+        if name == top:
+            packages[top] = max(packages.get(top, 0), cumulative)
+    print(f"{'package':<32}{'ms':>10}")
+    for name, cumulative in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"{name:<32}{cumulative / 1000:>10.1f}")
+
+    loaded = sorted({name.split(".")[0] for name, _, _ in profile} & set(LAZY_MODULES))
+    failed = False
+    if loaded:
+        print(f"FAIL: imported at startup, should be lazy: {', '.join(loaded)}")
+        failed = True
+    if median > args.max_ms:
+        print(f"FAIL: median import time {median:.0f} ms exceeds {args.max_ms:.0f} ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: batch pre-qualification of many RFPs against the catalog.
+
+Generates RFPs whose scope excerpts draw line items from a pool of
+realistic specs, then times
+- per-RFP: parse + candidate lookup + scoring one RFP at a time (what
+  running the Technical Agent's matching per RFP would cost)
+- batch: prequalification.rank_rfps (one lexer pass per RFP, identical
+  spec sets looked up and scored once, heap top-k)
+and checks that both give the same coverage.
+
+Usage:
+    python benchmarks/prequalify.py --rfps 1000 5000 --items 8 --spec-pool 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.agents.prequalification import PREQUAL_MATCH_THRESHOLD, catalog_coverage, rank_rfps
+from src.data_layer.registry import get_repositories
+from src.tools.rfp_lexer import extract_line_items
+from src.utils.batch_matcher import scorer_for_repo
+
+VOLTAGES = ["1.1kV", "3.3kV", "11kV", "33kV", "66kV", "132kV", "220kV"]
+SIZES = [16, 25, 70, 95, 185, 240, 300, 400, 630, 1000]
+
+
+def make_spec_pool(n: int, rng: random.Random):
+    pool = []
+    for _ in range(n):
+        cores = rng.choice([1, 3, 4])
+        pool.append(f"{rng.choice(VOLTAGES)} {cores}x{rng.choice(SIZES)}mm2 "
+                    f"{rng.choice(['XLPE', 'PVC'])} Cable, {rng.choice(['Copper', 'Aluminum'])} Conductor")
+    return pool
+
+
+def make_rfps(n: int, items: int, pool, rng: random.Random, now: datetime):
+    rfps = []
+    for i in range(n):
+        lines = [f"Line Item {j + 1}: {rng.choice(pool)}. Quantity: {rng.randint(100, 9000)} meters."
+                 for j in range(rng.randint(1, items))]
+        rfps.append({
+            "id": f"bench_{i}",
+            "title": f"Tender {i}",
+            "submission_deadline": (now + timedelta(days=rng.randint(1, 89))).isoformat(),
+            "estimated_value": rng.randint(100000, 10000000),
+            "scope_excerpt": "Scope of supply.\n" + "\n".join(lines),
+        })
+    return rfps
+
+
+def per_rfp_coverage(rfps, repo):
+    results = []
+    for rfp in rfps:
+        specs = [item["specs"] for item in extract_line_items(rfp["scope_excerpt"])]
+        candidates = repo.find_by_specs_many(specs)
+        scorer = scorer_for_repo(repo, candidates)
+        scores = scorer.score_rfp(specs, [scorer.positions_for(c) for c in candidates])
+        covered = sum(max(s.match_percent, default=0.0) >= PREQUAL_MATCH_THRESHOLD for s in scores)
+        results.append((covered, len(specs)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rfps", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--items", type=int, default=8, help="max line items per RFP")
+    parser.add_argument("--spec-pool", type=int, default=200, help="distinct line item specs across all RFPs")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    now = datetime.now()
+    window = (now, now + timedelta(days=90))
+    repo = get_repositories().product
+    pool = make_spec_pool(args.spec_pool, rng)
+
+    print(f"{'rfps':>8}{'per-RFP s':>12}{'batch s':>10}{'speedup':>9}")
+    for n in args.rfps:
+        rfps = make_rfps(n, args.items, pool, rng, now)
+
+        start = time.perf_counter()
+        expected = per_rfp_coverage(rfps, repo)
+        per_rfp = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ranking, _ = rank_rfps(rfps, window, k=args.top, min_coverage=0.0, repo=repo)
+        batch = time.perf_counter() - start
+
+        assert catalog_coverage(rfps, repo) == expected, "batch coverage differs from per-RFP coverage"
+        print(f"{n:>8}{per_rfp:>12.3f}{batch:>10.3f}{per_rfp / batch:>8.1f}x")
+    print("best:", ranking[0].summary())
+
+
+if __name__ == "__main__":
+    main()
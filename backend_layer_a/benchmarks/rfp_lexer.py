@@ -0,0 +1,223 @@
+"""
+Benchmark: shared single-pass RFP lexer vs the two legacy line-item parsers.
+
+Generates scope texts of increasing size (line items with specs, quantity
+and tests, plus continuation lines) and times
+- legacy main_agent.parse_line_items (one re.search per field per line)
+- legacy ingest heuristic loop (same, plus raw_text built with +=)
+- src.tools.rfp_lexer.extract_line_items
+
+Parsing time per MB should stay flat for the lexer as the input grows.
+
+Usage:
+    python benchmarks/rfp_lexer.py --sizes 1 2 4 8
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.tools.rfp_lexer import extract_line_items
+
+VOLTAGES = ["1.1kV", "3.3kV", "11kV", "33kV", "66kV", "132kV"]
+SIZES = [25, 70, 185, 300, 630]
+
+
+def generate_scope(mb: float, seed: int = 7, continuation: int = 3) -> str:
+    rng = random.Random(seed)
+    parts = ["Scope of Supply for the Transmission Upgrade Project.\n"]
+    size, n = 0, 0
+    while size < mb * 1024 * 1024:
+        n += 1
+        v, s, cores = rng.choice(VOLTAGES), rng.choice(SIZES), rng.choice([1, 3, 4])
+        mat = rng.choice(["Copper", "Aluminum"])
+        lines = [f"Line Item {n}: {v} {cores}x{s}mm2 XLPE Cable, {mat} Conductor, PVC Oversheath. Quantity: {rng.randint(100, 20000)} meters."]
+        # Long items (many continuation lines) are where += building goes quadratic
+        lines += [f"Installation note {k}: laying in trefoil formation, earthing at both ends, route section {rng.randint(1, 99)}." for k in range(continuation)]
+        lines.append("Tests required: Type Test, Routine Test, High Voltage Test")
+        block = "\n".join(lines) + "\n"
+        parts.append(block)
+        size += len(block)
+    return "".join(parts)
+
+
+def legacy_parse_line_items(scope_text: str):
+    # main_agent.parse_line_items before the shared lexer
+    items = []
+    # Split by "Line Item" or "Item"
+    lines = scope_text.split('\n')
+    current_item = {}
+    
+    for line in lines:
+        line = line.strip()
+        if not line: continue
+        
+        # Detect new item
+        match = re.search(r"(?:Line )?Item (\d+):", line)
+        if match:
+            # Save previous if exists
+            if current_item:
+                items.append(current_item)
+            current_item = {"item_id": match.group(1), "raw_text": line, "specs": {}}
+        
+        if current_item:
+            # Simple keyword extraction
+            lower_line = line.lower()
+            
+            # Specs
+            if "voltage" not in current_item["specs"]:
+                v_match = re.search(r"(\d+(\.\d+)?kV)", line, re.IGNORECASE)
+                if v_match: current_item["specs"]["voltage"] = v_match.group(1)
+            
+            if "conductor_size_mm2" not in current_item["specs"]:
+                c_match = re.search(r"(\d+)mm2", line, re.IGNORECASE)
+                if c_match: current_item["specs"]["conductor_size_mm2"] = int(c_match.group(1))
+
+            if "cond_mat" not in current_item["specs"]:
+                if "copper" in lower_line: current_item["specs"]["conductor_material"] = "Copper"
+                if "aluminum" in lower_line: current_item["specs"]["conductor_material"] = "Aluminum"
+            
+            if "insulation" not in current_item["specs"] or current_item["specs"]["insulation"] == "XLPE":
+                 if "xlpe" in lower_line: current_item["specs"]["insulation"] = "XLPE"
+                 if "pvc" in lower_line: current_item["specs"]["insulation"] = "PVC"
+                 if "mica" in lower_line: current_item["specs"]["insulation"] = "Mica Tape + XLPE" # Specific override
+            
+            # Cores
+            if "cores" not in current_item["specs"]:
+                # Try to find NxPattern e.g. 3x300
+                core_match = re.search(r"(\d+)x\d+mm2", line, re.IGNORECASE)
+                if core_match: current_item["specs"]["cores"] = int(core_match.group(1))
+            
+            # Quantity
+            q_match = re.search(r"Quantity:\s*(\d+)", line, re.IGNORECASE)
+            if q_match:
+                current_item["quantity"] = int(q_match.group(1))
+
+            # Tests
+            tc_match = re.search(r"Tests required: (.*)", line, re.IGNORECASE)
+            if tc_match:
+                current_item["tests_required"] = [t.strip() for t in tc_match.group(1).split(',')]
+
+            # Product Name guess
+            if "product_name" not in current_item:
+                 # Remove "Item X:" and "Quantity..."
+                 clean = re.sub(r"(?:Line )?Item \d+:", "", line)
+                 clean = re.sub(r"Quantity.*", "", clean)
+                 current_item["product_name"] = clean.strip().strip(".,")
+
+    if current_item:
+        items.append(current_item)
+        
+    return items
+
+
+def legacy_ingest_items(raw_content: str):
+    # Heuristic loop of ingest.llm_parse_rfp before the shared lexer
+    items = []
+    
+    # Normalizing Text
+    lines = raw_content.split('\n')
+    
+    current_item = {}
+    
+    # Aggressive Regex for "Item X" or "Line Item X" or just "1. Description"
+    item_pattern = re.compile(r"(?:Item|Line Item|No\.)\s*(\d+)[:.]", re.IGNORECASE)
+    
+    for line in lines:
+        line = line.strip()
+        if not line: continue
+        
+        match = item_pattern.search(line)
+        if match:
+            # Save previous
+            if current_item:
+                items.append(current_item)
+            
+            # Start New
+            item_id = match.group(1)
+            desc_guess = line[match.end():].strip()
+            current_item = {
+                "item_id": item_id,
+                "raw_text": line,
+                "product_description": desc_guess, # Temporary holding
+                "specs": {},
+                "tests_required": []
+            }
+        
+        if current_item:
+            current_item["raw_text"] += " " + line
+            lower = line.lower()
+            
+            # Extract Specs (Heuristic)
+            # Voltage
+            v_match = re.search(r"(\d+(\.\d+)?kV)", line, re.IGNORECASE)
+            if v_match and "voltage" not in current_item["specs"]:
+                current_item["specs"]["voltage"] = v_match.group(1)
+            
+            # Conductor Size
+            bs_match = re.search(r"(\d+)\s*(?:mm2|sqmm)", line, re.IGNORECASE)
+            if bs_match and "conductor_size_mm2" not in current_item["specs"]:
+                current_item["specs"]["conductor_size_mm2"] = int(bs_match.group(1))
+            
+            # Cores
+            c_match = re.search(r"(\d+)\s*[xX]\s*\d+", line)
+            if c_match and "cores" not in current_item["specs"]:
+                current_item["specs"]["cores"] = int(c_match.group(1))
+            
+            # Material
+            if "copper" in lower or " cu " in lower: current_item["specs"]["conductor_material"] = "Copper"
+            if "aluminum" in lower or " al " in lower or "acsr" in lower: current_item["specs"]["conductor_material"] = "Aluminum"
+            
+            # Insulation
+            if "xlpe" in lower: current_item["specs"]["insulation"] = "XLPE"
+            if "pvc" in lower: current_item["specs"]["insulation"] = "PVC"
+            
+            # Quantity
+            q_match = re.search(r"(?:Qty|Quantity)[\s:]*(\d+)", line, re.IGNORECASE)
+            if q_match:
+                current_item["quantity"] = int(q_match.group(1))
+            
+            # Product Name Refinement
+            # If we captured a description earlier, try to improve it
+            if len(current_item.get("product_description", "")) < 10 and len(line) > 10 and len(line) < 100:
+                 if "cable" in lower or "conductor" in lower:
+                     current_item["product_description"] = line
+
+    if current_item:
+        items.append(current_item)
+
+    return items
+
+
+def timed(fn, text: str) -> float:
+    start = time.perf_counter()
+    fn(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 2, 4, 8], help="scope text sizes in MB")
+    parser.add_argument("--continuation", type=int, default=3, help="continuation lines per item")
+    args = parser.parse_args()
+
+    parsers = [
+        ("legacy main_agent", legacy_parse_line_items),
+        ("legacy ingest", legacy_ingest_items),
+        ("rfp_lexer", extract_line_items),
+    ]
+    print(f"{'MB':>6}{'items':>9}" + "".join(f"{name + ' s/MB':>24}" for name, _ in parsers))
+    for mb in args.sizes:
+        text = generate_scope(mb, continuation=args.continuation)
+        items = len(extract_line_items(text))
+        real_mb = len(text) / 2**20
+        row = "".join(f"{timed(fn, text) / real_mb:>24.3f}" for _, fn in parsers)
+        print(f"{real_mb:>6.1f}{items:>9}" + row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Local-server harness for the streaming concurrent URL scan.
+
+Starts a fake tender portal (http.server, reachable as 127.0.0.1 and
+localhost so the per-host limit applies to two hosts) and the API
+(uvicorn, in-process), then POSTs /api/v1/scan with "stream": true and
+reads the NDJSON stream, then scans the same URLs without "stream" (one
+JSON response). Portal pages answer after a random delay; some
+return 500, some hang past SCAN_URL_TIMEOUT, and some have deadlines
+outside the 90-day window.
+
+It reports time to the first record, total time and the sequential
+estimate (sum of page delays), and exits non-zero if a URL is missing,
+the counts don't match what the portal served, the summary isn't the
+last record, or the non-stream response detects different RFPs.
+
+Usage:
+    python benchmarks/scan_harness.py --urls 200 --max-delay 0.3 --timeout 1
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def plan_pages(n: int, max_delay: float, timeout: float, seed: int = 3):
+    """Per page: (delay, kind) with kind in ok / late (outside window) / error / hang."""
+    rng = random.Random(seed)
+    pages = []
+    for i in range(n):
+        kind = "ok"
+        if i % 10 == 7:
+            kind = "error"
+        elif i % 10 == 8:
+            kind = "late"
+        elif i % 25 == 24:
+            kind = "hang"
+        delay = timeout * 2 if kind == "hang" else rng.uniform(0, max_delay)
+        pages.append((delay, kind))
+    return pages
+
+
+class PortalServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops SYNs under the scan's burst of connections
+    request_queue_size = 256
+
+
+class PortalHandler(BaseHTTPRequestHandler):
+    pages = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        i = int(query["i"][0])
+        delay, kind = self.pages[i]
+        time.sleep(delay)
+        if kind == "error":
+            self.send_response(500)
+            self.end_headers()
+            return
+        days = 150 if kind == "late" else 10 + i % 70
+        deadline = (datetime.now() + timedelta(days=days)).strftime("%d/%m/%Y")
+        body = (
+            f"<html><head><title>Tender {i}: 33kV Cable Supply</title></head><body>"
+            f"<h1>Tender {i}</h1><p>Last date of submission: {deadline}</p>"
+            f"<p>Estimated cost: Rs. {1 + i % 9}.5 Crore</p>"
+            f"<p>Line Item 1: 33kV 3x300mm2 XLPE Cable, Aluminum Conductor. Quantity: 5000 meters.</p>"
+            f"</body></html>"
+        ).encode("utf-8")
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the scanner gave up on a hanging page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--urls", type=int, default=200)
+    parser.add_argument("--max-delay", type=float, default=0.3, help="max seconds a portal page takes")
+    parser.add_argument("--timeout", type=float, default=1.0, help="SCAN_URL_TIMEOUT for the run")
+    parser.add_argument("--per-host", type=int, default=8, help="SCAN_PER_HOST for the run")
+    args = parser.parse_args()
+
+    # Before importing the app: module-level configuration
+    os.environ["SCAN_URL_TIMEOUT"] = str(args.timeout)
+    os.environ["SCAN_PER_HOST"] = str(args.per_host)
+    os.environ["HTTP_PER_HOST"] = str(args.per_host)
+    os.environ["HTTP_CACHE_DIR"] = ""
+    import httpx
+    import uvicorn
+    from src.main import app
+
+    pages = plan_pages(args.urls, args.max_delay, args.timeout)
+    PortalHandler.pages = pages
+    portal = PortalServer(("127.0.0.1", free_port()), PortalHandler)
+    threading.Thread(target=portal.serve_forever, daemon=True).start()
+    portal_port = portal.server_address[1]
+
+    api_port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=api_port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    hosts = ["127.0.0.1", "localhost"]
+    urls = [f"http://{hosts[i % 2]}:{portal_port}/tender?i={i}" for i in range(args.urls)]
+
+    records = []
+    first = None
+    start = time.perf_counter()
+    with httpx.stream("POST", f"http://127.0.0.1:{api_port}/api/v1/scan",
+                      json={"urls": urls, "stream": True}, timeout=None) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            if first is None:
+                first = time.perf_counter() - start
+            records.append(json.loads(line))
+    total = time.perf_counter() - start
+
+    start = time.perf_counter()
+    collected = httpx.post(f"http://127.0.0.1:{api_port}/api/v1/scan", json={"urls": urls}, timeout=None)
+    collected.raise_for_status()
+    collected = collected.json()
+    collected_total = time.perf_counter() - start
+
+    server.should_exit = True
+    portal.shutdown()
+
+    kinds = [kind for _, kind in pages]
+    expected = {"rfp": kinds.count("ok"), "skipped": kinds.count("late"),
+                "errors": kinds.count("error") + kinds.count("hang")}
+    summary = records[-1]
+    per_url = records[:-1]
+    sequential = sum(min(delay, args.timeout) for delay, _ in pages)
+
+    print(f"{args.urls} URLs on {len(hosts)} hosts, per-host limit {args.per_host}, timeout {args.timeout:g}s")
+    print(f"first record after {first:.3f}s, all {len(records)} records after {total:.3f}s "
+          f"(sequential estimate {sequential:.1f}s)")
+    print(f"summary: {json.dumps({k: v for k, v in summary.items() if k != 'scan_id'})}")
+    print(f"non-stream: {collected['detected_count']} of {collected['total_scanned']} after {collected_total:.3f}s")
+
+    problems = []
+    if summary.get("type") != "summary":
+        problems.append("last record is not the summary")
+    if sorted(r["url"] for r in per_url) != sorted(urls):
+        problems.append("per-URL records don't cover every URL exactly once")
+    got = {"rfp": summary.get("detected_count"), "skipped": summary.get("skipped"), "errors": summary.get("errors")}
+    if got != expected:
+        problems.append(f"counts {got} != expected {expected}")
+    streamed_rfps = sorted((r["rfp"]["source_url"], r["rfp"]["submission_deadline"]) for r in per_url if r["type"] == "rfp")
+    collected_rfps = sorted((r["source_url"], r["submission_deadline"]) for r in collected["rfps"])
+    if collected_rfps != streamed_rfps or collected["detected_count"] != len(collected_rfps):
+        problems.append("non-stream response differs from the stream")
+    if problems:
+        for r in per_url:
+            if r["type"] == "error":
+                print("  error:", r["url"], r["error"])
+        print("FAIL: " + "; ".join(problems))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
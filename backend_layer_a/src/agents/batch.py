@@ -0,0 +1,141 @@
+"""
+Batch runs: many RFPs planned as one job (POST /api/v1/trigger/batch).
+
+A normal trigger runs the whole graph per RFP. For bulk re-bids the batch
+instead
+- loads the repositories once and hands the same catalog / pricing data
+  (one catalog version) to every RFP,
+- parses every RFP with the Main Agent (Start),
+- matches each distinct normalized line-item spec once with the Technical
+  Agent, across all RFPs ("33kV" and "33 kV" count as the same spec),
+- prices and consolidates each RFP on its own (Pricing Agent, Main Agent
+  (End)), so every RFP still gets its own pipeline record and final
+  response, the same as from the graph.
+
+An RFP that can't be resolved or parsed fails on its own; the rest of the
+batch carries on.
+"""
+import time
+from typing import Dict, List, Tuple
+from src.data_layer.registry import get_repositories
+from src.data_layer.rfp_registry import get_rfp_registry
+from src.agents.sales import rfp_from_url
+from src.agents.main_agent import main_agent_start, main_agent_end
+from src.agents.technical import technical_agent
+from src.agents.pricing import pricing_agent
+from src.utils.spec_matcher import compile_specs
+from src.utils.logger import emit_event, pipeline_context
+
+
+def spec_key(specs: Dict) -> Tuple:
+    """Line items with the same key get the same technical match."""
+    return tuple(sorted(
+        (k, v.number if v.numeric else v.token) for k, v in compile_specs(specs).items()
+    ))
+
+
+def resolve_rfp(entry: Dict) -> Dict:
+    if entry.get("rfp_url"):
+        return rfp_from_url(entry["rfp_url"])
+    rfp = get_rfp_registry().get(entry["rfp_id"])
+    if rfp is None:
+        raise LookupError(f"RFP '{entry['rfp_id']}' not found")
+    # Copy: the registry's RFP objects are shared across pipelines
+    return {**rfp, "reason_for_selection": [f"Requested in a batch run (ID: {entry['rfp_id']})."]}
+
+
+def _start(entry: Dict, deps: Dict) -> Dict:
+    pipeline_id = entry["pipeline_id"]
+    selected = resolve_rfp(entry)
+    emit_event("AGENT_OUTPUT", {
+        "agent": "Sales Agent",
+        "pipeline_id": pipeline_id,
+        "output": {"selected_rfp": {k: selected.get(k) for k in ("id", "title", "submission_deadline", "reason_for_selection")}}
+    })
+    return main_agent_start({
+        "pipeline_id": pipeline_id,
+        "demo_mode": True,
+        "rfp_url": entry.get("rfp_url"),
+        "available_rfps": [],
+        "selected_rfp_id": selected["id"],
+        "selected_rfp": selected,
+        "selection_reason": selected["reason_for_selection"],
+        "deps": deps,
+    })
+
+
+def _finish(state: Dict, matches: Dict[Tuple, Dict], catalog_version) -> Dict:
+    technical_response = []
+    for item in state["tech_summary"]:
+        # Shared match; the line item's own id, specs and quantity
+        technical_response.append({
+            **matches[spec_key(item["specs"])],
+            "line_item_id": item["item_id"],
+            "required_specs": {**item["specs"], "product_name": item.get("product_name")},
+            "quantity": item.get("quantity", 0),
+        })
+    priced = pricing_agent({**state, "technical_response": technical_response})
+    state = {**state, "line_item_results": [{
+        "chunk": 0,
+        "technical_response": technical_response,
+        "pricing_response": priced["pricing_response"],
+        "catalog_version": catalog_version,
+    }]}
+    output = {**state, **main_agent_end(state)}
+    # Repository objects aren't part of the pipeline's output
+    output.pop("deps", None)
+    return output
+
+
+def run_batch(batch_id: str, entries: List[Dict]) -> Dict:
+    """
+    Run every entry ({"pipeline_id", "rfp_id" or "rfp_url"}) of a batch.
+    Returns {"results": {pipeline_id: record}, "stats": {...}} where each
+    record is what a graph run would store: {"status", "output"} or
+    {"status": "FAILED", "error"}.
+    """
+    started = time.perf_counter()
+    repos = get_repositories()
+    deps = {"product_repo": repos.product, "pricing_repo": repos.pricing, "catalog_version": repos.version}
+
+    results: Dict[str, Dict] = {}
+    parsed: List[Dict] = []
+    for entry in entries:
+        with pipeline_context(entry["pipeline_id"]):
+            try:
+                parsed.append(_start(entry, deps))
+            except Exception as e:
+                results[entry["pipeline_id"]] = {"status": "FAILED", "error": str(e)}
+
+    # One technical match per distinct spec across the whole batch
+    unique: Dict[Tuple, Dict] = {}
+    line_items = 0
+    for state in parsed:
+        for item in state["tech_summary"]:
+            unique.setdefault(spec_key(item["specs"]), item)
+            line_items += 1
+
+    matches: Dict[Tuple, Dict] = {}
+    if unique:
+        with pipeline_context(batch_id):
+            technical = technical_agent({"pipeline_id": batch_id, "deps": deps, "tech_summary": list(unique.values())})
+        matches = dict(zip(unique, technical["technical_response"]))
+
+    for state in parsed:
+        pipeline_id = state["pipeline_id"]
+        with pipeline_context(pipeline_id):
+            try:
+                results[pipeline_id] = {"status": "COMPLETED", "output": _finish(state, matches, repos.version)}
+            except Exception as e:
+                results[pipeline_id] = {"status": "FAILED", "error": str(e)}
+
+    return {
+        "results": results,
+        "stats": {
+            "rfps": len(entries),
+            "line_items": line_items,
+            "unique_specs": len(unique),
+            "catalog_version": repos.version,
+            "seconds": round(time.perf_counter() - started, 3),
+        },
+    }
@@ -0,0 +1,63 @@
+import os
+from typing import Dict, List
+from langgraph.types import Send
+from src.state import AgentState
+from src.data_layer.registry import get_repositories
+from src.agents.technical import technical_agent
+from src.agents.pricing import pricing_agent
+
+# Line items per fan-out branch
+CHUNK_SIZE = int(os.environ.get("LINE_ITEM_CHUNK_SIZE", "20"))
+
+def fan_out_line_items(state: AgentState):
+    """
+    Conditional edge after main_agent_start: one line_item_worker branch per
+    chunk of line items. Every branch gets the same repository set so the
+    whole RFP is matched and priced against one catalog version.
+    """
+    tech_items = state.get("tech_summary", [])
+    if not tech_items:
+        return "main_agent_end"
+
+    repos = get_repositories()
+    deps = {
+        **(state.get("deps") or {}),
+        "product_repo": repos.product,
+        "pricing_repo": repos.pricing,
+        "catalog_version": repos.version,
+    }
+    pricing_by_id = {p["item_id"]: p for p in state.get("pricing_summary", [])}
+
+    sends = []
+    for chunk, start in enumerate(range(0, len(tech_items), CHUNK_SIZE)):
+        items = tech_items[start:start + CHUNK_SIZE]
+        sends.append(Send("line_item_worker", {
+            "pipeline_id": state["pipeline_id"],
+            "chunk": chunk,
+            "deps": deps,
+            "tech_summary": items,
+            "pricing_summary": [pricing_by_id[i["item_id"]] for i in items if i["item_id"] in pricing_by_id],
+        }))
+    return sends
+
+def line_item_worker(chunk_state: Dict) -> Dict:
+    """Technical matching + pricing for one chunk of line items (map step)."""
+    technical = technical_agent(chunk_state)
+    priced = pricing_agent(technical)
+    return {
+        "line_item_results": [{
+            "chunk": chunk_state["chunk"],
+            "technical_response": technical["technical_response"],
+            "pricing_response": priced["pricing_response"],
+            "catalog_version": technical["catalog_version"],
+        }]
+    }
+
+def merge_line_item_results(results: List[Dict]) -> Dict:
+    """Reduce step: chunk results back in line-item order."""
+    ordered = sorted(results, key=lambda r: r["chunk"])
+    return {
+        "technical_response": [t for r in ordered for t in r["technical_response"]],
+        "pricing_response": [p for r in ordered for p in r["pricing_response"]],
+        "catalog_version": ordered[0]["catalog_version"] if ordered else None,
+    }
@@ -0,0 +1,133 @@
+"""
+Batch pre-qualification of detected RFPs.
+
+Before the Sales Agent commits a full pipeline to an RFP, every open RFP is
+scored in one pass:
+- coverage: share of its line items (parsed from scope_excerpt with the
+  shared lexer) whose best catalog candidate reaches PREQUAL_MATCH_THRESHOLD
+  spec match. Candidates come from the catalog's spec index and are scored
+  by the vectorized matcher, with identical spec sets across all RFPs
+  looked up and scored only once.
+- urgency: how close the deadline is, within the scan window.
+- value: estimated_value relative to the largest one in the batch.
+
+The weighted sum ranks the RFPs; those below PREQUAL_MIN_COVERAGE are not
+eligible at all. Only the top k are kept, with a heap.
+
+Configuration (env):
+    PREQUAL_WEIGHTS           "deadline=0.4,value=0.3,coverage=0.3"
+    PREQUAL_MATCH_THRESHOLD   spec match % for a line item to count as covered (default 40)
+    PREQUAL_MIN_COVERAGE      minimum coverage to be eligible, 0..1 (default 0.5)
+"""
+import heapq
+import os
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from src.data_layer.registry import get_repositories
+from src.data_layer.rfp_registry import parse_deadline
+from src.tools.rfp_lexer import extract_line_items
+from src.utils.batch_matcher import scorer_for_repo
+
+FACTORS = ("deadline", "value", "coverage")
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    weights = {factor: 0.0 for factor in FACTORS}
+    for part in spec.split(","):
+        if "=" not in part:
+            continue
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in weights:
+            raise ValueError(f"Unknown PREQUAL_WEIGHTS factor '{name}'. Options: {', '.join(FACTORS)}")
+        weights[name] = float(value)
+    return weights
+
+
+PREQUAL_WEIGHTS = parse_weights(os.environ.get("PREQUAL_WEIGHTS", "deadline=0.4,value=0.3,coverage=0.3"))
+PREQUAL_MATCH_THRESHOLD = float(os.environ.get("PREQUAL_MATCH_THRESHOLD", "40"))
+PREQUAL_MIN_COVERAGE = float(os.environ.get("PREQUAL_MIN_COVERAGE", "0.5"))
+
+
+class Prequalification(NamedTuple):
+    rfp: Dict
+    score: float
+    coverage: float
+    covered_items: int
+    line_items: int
+    days_left: Optional[float]
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.rfp.get("id"),
+            "score": round(self.score, 4),
+            "coverage": round(self.coverage, 4),
+            "covered_items": self.covered_items,
+            "line_items": self.line_items,
+            "days_left": round(self.days_left, 1) if self.days_left is not None else None,
+        }
+
+
+def _specs_key(specs: Dict) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in specs.items()))
+
+
+def catalog_coverage(rfps: Sequence[Dict], repo=None,
+                     threshold: float = PREQUAL_MATCH_THRESHOLD) -> List[Tuple[int, int]]:
+    """(covered line items, line items) per RFP, in order."""
+    repo = repo or get_repositories().product
+
+    # Identical spec sets (common across tenders) are looked up and scored once
+    unique: Dict[Tuple, int] = {}
+    unique_specs: List[Dict] = []
+    refs_per_rfp: List[List[int]] = []
+    for rfp in rfps:
+        refs = []
+        for item in extract_line_items(rfp.get("scope_excerpt") or ""):
+            key = _specs_key(item["specs"])
+            if key not in unique:
+                unique[key] = len(unique_specs)
+                unique_specs.append(item["specs"])
+            refs.append(unique[key])
+        refs_per_rfp.append(refs)
+
+    if not unique_specs:
+        return [(0, 0) for _ in rfps]
+
+    candidates = repo.find_by_specs_many(unique_specs)
+    scorer = scorer_for_repo(repo, candidates)
+    scores = scorer.score_rfp(unique_specs, [scorer.positions_for(c) for c in candidates])
+    covered = [max(s.match_percent, default=0.0) >= threshold for s in scores]
+
+    return [(sum(covered[r] for r in refs), len(refs)) for refs in refs_per_rfp]
+
+
+def rank_rfps(rfps: Sequence[Dict], window: Tuple[datetime, datetime], k: Optional[int] = None,
+              weights: Optional[Dict[str, float]] = None, min_coverage: float = PREQUAL_MIN_COVERAGE,
+              repo=None) -> Tuple[List[Prequalification], int]:
+    """
+    Best k eligible RFPs, highest score first (ties: earlier deadline).
+    Returns (ranking, number of eligible RFPs).
+    """
+    weights = weights or PREQUAL_WEIGHTS
+    start, end = window
+    window_days = max((end - start).total_seconds() / 86400, 1e-9)
+    max_value = max((rfp.get("estimated_value") or 0 for rfp in rfps), default=0) or 1
+
+    eligible: List[Prequalification] = []
+    for rfp, (covered, total) in zip(rfps, catalog_coverage(rfps, repo)):
+        coverage = covered / total if total else 0.0
+        if coverage < min_coverage:
+            continue
+        deadline = parse_deadline(rfp.get("submission_deadline"))
+        days_left = (deadline - start).total_seconds() / 86400 if deadline else None
+        # Sooner deadline -> more urgent; clamped to the window
+        urgency = min(max(1 - days_left / window_days, 0.0), 1.0) if days_left is not None else 0.0
+        value = (rfp.get("estimated_value") or 0) / max_value
+        score = weights["deadline"] * urgency + weights["value"] * value + weights["coverage"] * coverage
+        eligible.append(Prequalification(rfp, score, coverage, covered, total, days_left))
+
+    n = len(eligible) if k is None else k
+    far = float("inf")
+    ranking = heapq.nlargest(n, eligible, key=lambda p: (p.score, -(p.days_left if p.days_left is not None else far)))
+    return ranking, len(eligible)
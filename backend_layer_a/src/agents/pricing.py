@@ -1,17 +1,21 @@
 from src.state import AgentState
 # from src.tools.pricing import get_price_for_sku, get_test_cost # OLD
-from src.data_layer.json_impl import JsonPricingRepository
+from src.data_layer.registry import get_repositories
 from src.utils.logger import emit_event
 
 def pricing_agent(state: AgentState) -> AgentState:
     emit_event("AGENT_START", {"agent": "Pricing Agent", "pipeline_id": state["pipeline_id"]})
     
     # Dependency: Pricing Repository
-    repo = state.get("deps", {}).get("pricing_repo") or JsonPricingRepository()
+    repo = (state.get("deps") or {}).get("pricing_repo") or get_repositories().pricing
 
     tech_items = state.get("technical_response", [])
     pricing_reqs = {p["item_id"]: p.get("tests", []) for p in state.get("pricing_summary", [])}
     
+    # Resolve the whole RFP in two bulk calls
+    prices = repo.get_prices_bulk([item["selected_sku_id"] for item in tech_items])
+    test_costs = repo.get_test_costs_bulk([t for tests in pricing_reqs.values() for t in tests])
+
     consolidated_table = []
     
     for item in tech_items:
@@ -20,7 +24,7 @@ def pricing_agent(state: AgentState) -> AgentState:
         item_id = item["line_item_id"]
         
         # 1. Base Price (Dummy pricing table rule)
-        price_info = repo.get_price_for_sku(sku_id)
+        price_info = prices[sku_id]
         unit_price = price_info["price"]
         is_estimate = price_info["is_estimate"] # Fallback flag
         
@@ -33,7 +37,7 @@ def pricing_agent(state: AgentState) -> AgentState:
         req_tests = pricing_reqs.get(item_id, [])
         
         for t_name in req_tests:
-            t_info = repo.get_test_cost(t_name)
+            t_info = test_costs[t_name]
             cost = t_info["cost"]
             billing = t_info.get("billing", "per_unit")
             
@@ -1,7 +1,21 @@
 from src.state import AgentState
-from src.tools.fetch import fetch_local_rfps, filter_rfps
+from src.tools.fetch import deadline_window, fetch_open_rfps
+from src.agents.prequalification import PREQUAL_MATCH_THRESHOLD, PREQUAL_MIN_COVERAGE, rank_rfps
 from src.utils.logger import emit_event
 
+# Pre-qualification ranking entries reported in the Sales Agent's event
+PREQUAL_TOP_K = 5
+
+def rfp_from_url(rfp_url: str) -> dict:
+    """The selected-RFP record for a user-provided URL (also used by batch runs)."""
+    return {
+        "id": "url_based_rfp",
+        "title": "RFP from URL",
+        "submission_deadline": "2026-02-28T00:00:00Z", # Mock acceptance
+        "source_url": rfp_url,
+        "reason_for_selection": [f"User explicitly provided URL: {rfp_url}"]
+    }
+
 def sales_agent(state: AgentState) -> AgentState:
     emit_event("AGENT_START", {"agent": "Sales Agent", "pipeline_id": state["pipeline_id"]})
     
@@ -14,13 +28,7 @@ def sales_agent(state: AgentState) -> AgentState:
         # For this demo, we assume if a URL is provided, it's a valid RFP found by the user.
         # We construct a "Selected Object" wrapper for it.
         
-        selected = {
-            "id": "url_based_rfp",
-            "title": "RFP from URL",
-            "submission_deadline": "2026-02-28T00:00:00Z", # Mock acceptance
-            "source_url": rfp_url,
-            "reason_for_selection": [f"User explicitly provided URL: {rfp_url}"]
-        }
+        selected = rfp_from_url(rfp_url)
         
         emit_event("AGENT_OUTPUT", {
             "agent": "Sales Agent",
@@ -36,11 +44,10 @@ def sales_agent(state: AgentState) -> AgentState:
             "selection_reason": selected["reason_for_selection"]
         }
 
-    # 2. Normal Scan / Fetch
-    raw_rfps = fetch_local_rfps(state.get("demo_mode", True))
-    
-    # 3. Filter (Within 3 months / 90 days)
-    valid_rfps = filter_rfps(raw_rfps)
+    # 2. Normal Scan / Fetch + 3. Filter (Within 3 months / 90 days)
+    # Served from the RFP registry's deadline index, earliest deadline first
+    window = deadline_window()
+    valid_rfps = fetch_open_rfps().rfps
     
     # Emit "detected_rfps" info
     emit_event("AGENT_OUTPUT", {
@@ -50,7 +57,7 @@ def sales_agent(state: AgentState) -> AgentState:
     })
     
     if not valid_rfps:
-        emit_event("ERROR", {"message": "No valid RFPs found due within 90 days."})
+        emit_event("ERROR", {"message": "No valid RFPs found due within 90 days."}, level="ERROR")
         return {**state, "error": "NO_RFP_FOUND"}
     
     # 3. Select
@@ -71,22 +78,38 @@ def sales_agent(state: AgentState) -> AgentState:
              # Fallback if ID not found? Or Error? Let's log warning and fallback to auto.
              emit_event("AGENT_OUTPUT", {"agent": "Sales Agent", "warning": f"Requested ID {manual_id} not found in valid set. Falling back to auto."})
     
-    # Default / Auto Selection (Earliest Deadline)
+    # Default / Auto Selection: pre-qualify every open RFP against the catalog
+    # and take the best bid by deadline, value and coverage
     if not selected:
-        valid_rfps.sort(key=lambda x: x["submission_deadline"])
-        selected = valid_rfps[0]
+        ranking, eligible = rank_rfps(valid_rfps, window, k=PREQUAL_TOP_K)
+        emit_event("AGENT_OUTPUT", {
+            "agent": "Sales Agent",
+            "stage": "Pre-qualification",
+            "evaluated": len(valid_rfps),
+            "eligible": eligible,
+            "top": [p.summary() for p in ranking]
+        })
+        if not ranking:
+            emit_event("ERROR", {"message": f"No RFP due within 90 days has {PREQUAL_MIN_COVERAGE:.0%} catalog coverage."}, level="ERROR")
+            return {**state, "error": "NO_QUALIFIED_RFP"}
+
+        best = ranking[0]
+        selected = best.rfp
+        value = selected.get("estimated_value")
         # Generate bullet points
         reason = [
-            f"Selected '{selected['title']}' due to earliest submission deadline ({selected['submission_deadline']})",
-            f"Estimated value of ₹{selected.get('estimated_value', 'N/A'):,} meets high-priority threshold",
-            "Scope aligns with confirmed technical capabilities"
+            f"Selected '{selected['title']}' as the best of {eligible} pre-qualified RFPs (score {best.score:.2f})",
+            f"Submission deadline {selected['submission_deadline']} ({best.days_left:.0f} days left)",
+            f"Estimated value of ₹{value:,}" if isinstance(value, (int, float)) else "Estimated value N/A",
+            f"Catalog covers {best.covered_items}/{best.line_items} line items at >= {PREQUAL_MATCH_THRESHOLD:.0f}% spec match"
         ]
     elif isinstance(reason, str):
          # If manual select produced a string, wrap it.
          reason = [reason]
     
     # Output format: {id, title, issuer, submission_deadline, scope_excerpt, link, estimated_value, reason_for_selection}
-    selected["reason_for_selection"] = reason
+    # Copy: the registry's RFP objects are shared across pipelines
+    selected = {**selected, "reason_for_selection": reason}
     
     emit_event("AGENT_OUTPUT", {
         "agent": "Sales Agent",
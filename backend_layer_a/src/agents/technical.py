@@ -1,42 +1,63 @@
+from collections import Counter
 from src.state import AgentState
-from src.data_layer.json_impl import JsonProductRepository
-from src.utils.spec_matcher import calculate_spec_match
+from src.data_layer.registry import get_repositories
+from src.data_layer.spec_index import MIN_CANDIDATES
+from src.utils.batch_matcher import scorer_for_repo
+from src.utils.ranking import select_top_k
+from src.utils.spec_matcher import compile_specs
 from src.utils.logger import emit_event
 
+# Number of OEM products recommended per line item (comparison table width):
+# TECHNICAL_TOP_K, parsed and clamped once in spec_index
+TOP_K = MIN_CANDIDATES
+
+DEPS = ("product_repo", "pricing_repo", "catalog_version")
+
 def technical_agent(state: AgentState) -> AgentState:
     emit_event("AGENT_START", {"agent": "Technical Agent", "pipeline_id": state["pipeline_id"]})
     
     # Dependency: Product Repository
     # In a real DI framework, this would be injected. 
-    # For now, we instantiate the default JSON impl if not in state.
-    repo = state.get("deps", {}).get("product_repo") or JsonProductRepository()
+    # For now, we use the shared (already loaded) repositories if not in state.
+    deps = dict(state.get("deps") or {})
+    missing = [name for name in DEPS if not deps.get(name)]
+    if missing:
+        # Filled from one registry snapshot and handed on to the Pricing
+        # Agent below, so a reload in between can't mix catalog versions
+        repos = get_repositories()
+        shared = {"product_repo": repos.product, "pricing_repo": repos.pricing, "catalog_version": repos.version}
+        deps.update((name, shared[name]) for name in missing)
+    repo = deps["product_repo"]
+    # Pricing is only consulted to break ties ("lower unit price wins")
+    pricing_repo = deps["pricing_repo"]
 
     tech_summary = state.get("tech_summary", [])
     response_items = []
     
-    for item in tech_summary:
-        # 1. Lookup Candidates (Top candidates from repo)
-        candidates = repo.find_by_specs(item["specs"])
-        
-        scored_candidates = []
-        for sku in candidates:
-            # 2. Calculate Spec Match (Equal weight)
-            match_details = calculate_spec_match(item["specs"], sku["specs"])
-            match_details["sku"] = sku
-            scored_candidates.append(match_details)
-        
-        # 3. Sort by Match % (desc), then Unit Price (as tie-breaker, though we might not have price loaded here, 
-        # we will rely on Order in repo or just match %. 
+    # Compile each line item's specs once (typed, unit-normalized values)
+    compiled_specs = [compile_specs(item["specs"]) for item in tech_summary]
+
+    # 1. Lookup Candidates (Top candidates from repo)
+    candidates_per_item = repo.find_by_specs_many([item["specs"] for item in tech_summary])
+
+    # 2. Calculate Spec Match (Equal weight) for the whole RFP in one vectorized pass
+    scorer = scorer_for_repo(repo, candidates_per_item)
+    item_scores = scorer.score_rfp(
+        compiled_specs,
+        [scorer.positions_for(candidates) for candidates in candidates_per_item]
+    )
+
+    for item, scores in zip(tech_summary, item_scores):
+        # 3. Rank by Match % (desc), then Unit Price (asc) as tie-breaker.
         # Requirement: "Tie-breaker: higher spec_match_percent -> if equal, lower unit price wins (price from pricing_lookup)"
-        # This implies Technical Agent needs to call `pricing_lookup` just for the tie breaker? 
-        # Or I can skip if I don't have ties.
-        # Let's perform a lightweight price sort if needed.
-        # For simplicity in this demo, strict Match % is usually distinguishable.
-        
-        scored_candidates.sort(key=lambda x: x["match_percent"], reverse=True)
-        
         # "Recommends the top 3 OEM products... Prepare a comparison table... Top1/Top2/Top3"
-        top_3 = scored_candidates[:3]
+        sku_ids = [scorer.products[pos]["sku_id"] for pos in scores.positions]
+        top_3 = []
+        for j in select_top_k(scores.match_percent, sku_ids, TOP_K, pricing_repo.get_prices_bulk):
+            # Mismatch reasons are only built for the candidates we keep
+            match_details = scores.details(j)
+            match_details["sku"] = scorer.products[scores.positions[j]]
+            top_3.append(match_details)
         
         # Select best
         winner = top_3[0]
@@ -85,11 +106,13 @@ def technical_agent(state: AgentState) -> AgentState:
         "output": {
             "message": "Completed technical spec matching.",
             "processed_items": len(response_items),
-            "status_flags": [r["status"] for r in response_items]
+            "status_counts": dict(Counter(r["status"] for r in response_items))
         }
     })
 
     return {
         **state,
-        "technical_response": response_items
+        "deps": deps,
+        "technical_response": response_items,
+        "catalog_version": deps["catalog_version"]
     }
@@ -0,0 +1,260 @@
+"""
+Columnar (struct-of-arrays) product catalog.
+
+Instead of keeping one dict-of-dicts per SKU, spec attributes are stored as
+typed columns: integer / float columns in `array` buffers, everything else
+dictionary-encoded (int32 codes into a small table of distinct values).
+SKU ids and product names live in a single UTF-8 string heap.
+Rows are exposed through lightweight read-only views.
+"""
+import json
+import math
+import os
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator, List, Optional
+from src.data_layer.protocols import ProductRepository
+from src.data_layer.json_impl import DATA_DIR
+from src.data_layer.spec_index import SpecIndex
+from src.utils.batch_matcher import BatchSpecScorer
+from src.utils.spec_matcher import SpecValue, compile_value
+
+INT_MISSING = -(2 ** 63)
+INT_MAX = 2 ** 63 - 1
+CODE_MISSING = -1
+_UNSET = object()
+
+
+class _JsonText(str):
+    """Marks dictionary values that hold JSON-encoded non-scalar specs."""
+
+
+class StringHeap:
+    """Append-only UTF-8 heap: string i is blob[offsets[i]:offsets[i + 1]]."""
+
+    def __init__(self):
+        self.blob = bytearray()
+        self.offsets = array("Q", [0])
+
+    def append(self, value: str):
+        self.blob += value.encode("utf-8")
+        self.offsets.append(len(self.blob))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+
+class Column:
+    """
+    One spec attribute across all SKUs.
+    kind: 'int' (int64, INT_MISSING), 'float' (float64, NaN) or 'dict' (int32 codes into `values`).
+    Ints outside int64 (or equal to INT_MISSING) make the column 'dict', so they round-trip exactly.
+    """
+    __slots__ = ("kind", "data", "values")
+
+    def __init__(self, kind: str, data, values: Optional[List[Any]] = None):
+        self.kind = kind
+        self.data = data
+        self.values = values
+
+    @classmethod
+    def build(cls, raw: List[Any]) -> "Column":
+        present = [v for v in raw if v is not None]
+        ints_fit = all(INT_MISSING < v <= INT_MAX for v in present if isinstance(v, int))
+        if present and ints_fit and all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+            return cls("int", array("q", (INT_MISSING if v is None else v for v in raw)))
+        if present and ints_fit and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+            return cls("float", array("d", (math.nan if v is None else float(v) for v in raw)))
+
+        values: List[Any] = []
+        # Strings and JSON text in separate namespaces: "3" and 3 get different codes
+        lookup: Dict[tuple, int] = {}
+        codes = array("i")
+        for v in raw:
+            if v is None:
+                codes.append(CODE_MISSING)
+                continue
+            # Non-string values (numbers in a mixed column, property lists) are stored as JSON text
+            text = v if isinstance(v, str) else json.dumps(v, sort_keys=True)
+            key = (isinstance(v, str), text)
+            code = lookup.get(key)
+            if code is None:
+                code = lookup[key] = len(values)
+                values.append(v if isinstance(v, str) else _JsonText(text))
+            codes.append(code)
+        return cls("dict", codes, values)
+
+    def is_missing(self, pos: int) -> bool:
+        v = self.data[pos]
+        if self.kind == "int":
+            return v == INT_MISSING
+        if self.kind == "float":
+            return math.isnan(v)
+        return v == CODE_MISSING
+
+    def get(self, pos: int) -> Any:
+        v = self.data[pos]
+        if self.kind == "int":
+            return None if v == INT_MISSING else v
+        if self.kind == "float":
+            return None if math.isnan(v) else v
+        if v == CODE_MISSING:
+            return None
+        return self._decode(self.values[v])
+
+    def _decode(self, value: Any) -> Any:
+        if isinstance(value, _JsonText):
+            return json.loads(value)
+        return value
+
+
+class ProductRow(Mapping):
+    """Read-only view of one SKU. `specs` is materialized on access."""
+    __slots__ = ("_catalog", "_pos")
+
+    _FIELDS = ("sku_id", "product_name", "specs")
+
+    def __init__(self, catalog: "ColumnarCatalog", pos: int):
+        self._catalog = catalog
+        self._pos = pos
+
+    @property
+    def position(self) -> int:
+        return self._pos
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "sku_id":
+            return self._catalog.sku_ids[self._pos]
+        if key == "product_name":
+            return self._catalog.product_names[self._pos]
+        if key == "specs":
+            return self._catalog.specs_at(self._pos)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._FIELDS)
+
+    def __len__(self) -> int:
+        return len(self._FIELDS)
+
+
+class ColumnarCatalog(Sequence):
+    """Sequence of ProductRow views over the columns."""
+
+    def __init__(self, sku_ids: StringHeap, product_names: StringHeap, columns: Dict[str, Column]):
+        self.sku_ids = sku_ids
+        self.product_names = product_names
+        self.columns = columns
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "ColumnarCatalog":
+        sku_ids, names = StringHeap(), StringHeap()
+        keys: List[str] = []
+        for sku in records:
+            sku_ids.append(sku["sku_id"])
+            names.append(sku.get("product_name", ""))
+            for key in sku.get("specs", {}):
+                if key not in keys:
+                    keys.append(key)
+        columns = {
+            key: Column.build([sku.get("specs", {}).get(key) for sku in records])
+            for key in keys
+        }
+        return cls(sku_ids, names, columns)
+
+    def __len__(self) -> int:
+        return len(self.sku_ids)
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [ProductRow(self, i) for i in range(*pos.indices(len(self)))]
+        if pos < 0:
+            pos += len(self)
+        if not 0 <= pos < len(self):
+            raise IndexError(pos)
+        return ProductRow(self, pos)
+
+    def specs_at(self, pos: int) -> Dict[str, Any]:
+        specs = {}
+        for key, column in self.columns.items():
+            val = column.get(pos)
+            if val is not None:
+                specs[key] = val
+        return specs
+
+
+class CompiledRows(Sequence):
+    """
+    Compiled specs per row, built on demand. Each distinct column value is
+    compiled once, so nothing per-SKU is retained.
+    """
+
+    def __init__(self, catalog: ColumnarCatalog):
+        self.catalog = catalog
+        self._memo: Dict[str, Dict[Any, SpecValue]] = {key: {} for key in catalog.columns}
+
+    def __len__(self) -> int:
+        return len(self.catalog)
+
+    def __getitem__(self, pos: int) -> Dict[str, SpecValue]:
+        compiled = {}
+        for key, column in self.catalog.columns.items():
+            # Before the memo: a missing float is NaN, which never equals itself as a key
+            if column.is_missing(pos):
+                continue
+            raw = column.data[pos]
+            memo = self._memo[key]
+            value = memo.get(raw, _UNSET)
+            if value is _UNSET:
+                value = memo[raw] = compile_value(key, column.get(pos))
+            compiled[key] = value
+        return compiled
+
+    def __iter__(self) -> Iterator[Dict[str, SpecValue]]:
+        for pos in range(len(self)):
+            yield self[pos]
+
+
+class ColumnarProductRepository(ProductRepository):
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.data_dir = data_dir
+        self._catalog: Optional[ColumnarCatalog] = None
+        self._compiled: Optional[CompiledRows] = None
+        self._index = None
+        self._scorer = None
+
+    def _load(self) -> ColumnarCatalog:
+        if self._catalog is not None:
+            return self._catalog
+
+        path = os.path.join(self.data_dir, "product_repo.json")
+        try:
+            with open(path, 'r') as f:
+                records = json.load(f)
+        except FileNotFoundError:
+            records = []
+        # The parsed records are dropped once the columns are built
+        self._catalog = ColumnarCatalog.from_records(records)
+        self._compiled = CompiledRows(self._catalog)
+        self._index = SpecIndex(self._compiled)
+        return self._catalog
+
+    def get_all(self) -> ColumnarCatalog:
+        return self._load()
+
+    def find_by_specs(self, specs: Dict) -> List[ProductRow]:
+        catalog = self._load()
+        return [catalog[pos] for pos in self._index.candidates(specs)]
+
+    def find_by_specs_many(self, specs_list: List[Dict]) -> List[List[ProductRow]]:
+        catalog = self._load()
+        return [[catalog[pos] for pos in self._index.candidates(specs)] for specs in specs_list]
+
+    def batch_scorer(self) -> BatchSpecScorer:
+        catalog = self._load()
+        if self._scorer is None:
+            self._scorer = BatchSpecScorer(catalog, self._compiled)
+        return self._scorer
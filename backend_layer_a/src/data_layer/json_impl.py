@@ -2,6 +2,10 @@ import json
 import os
 from typing import List, Dict, Any, Optional
 from src.data_layer.protocols import ProductRepository, PricingRepository
+from src.data_layer.spec_index import SpecIndex
+from src.data_layer.service_resolver import ServiceNameResolver
+from src.utils.batch_matcher import BatchSpecScorer
+from src.utils.spec_matcher import compile_specs
 
 # Configure path relative to this file, or we could pass it in. 
 # For this refactor we maintain the logic that was in src/tools/...
@@ -12,6 +16,9 @@ class JsonProductRepository(ProductRepository):
     def __init__(self, data_dir: str = DATA_DIR):
         self.data_dir = data_dir
         self._cache = None
+        self._compiled = None
+        self._index = None
+        self._scorer = None
 
     def _load(self) -> List[Dict]:
         if self._cache is not None:
@@ -23,6 +30,11 @@ class JsonProductRepository(ProductRepository):
                 self._cache = json.load(f)
         except FileNotFoundError:
             self._cache = []
+        # Compile specs and build the spec index once per load,
+        # so lookups never walk the catalog or re-parse spec strings
+        self._compiled = [compile_specs(sku.get("specs", {})) for sku in self._cache]
+        self._index = SpecIndex(self._compiled)
+        self._scorer = None
         return self._cache
 
     def get_all(self) -> List[Dict]:
@@ -30,27 +42,26 @@ class JsonProductRepository(ProductRepository):
 
     def find_by_specs(self, specs: Dict) -> List[Dict]:
         repo = self._load()
-        results = []
-        req_voltage = specs.get("voltage")
-        
-        for sku in repo:
-            if req_voltage:
-                # Logic ported from src/tools/product.py
-                if req_voltage.lower() in sku["specs"].get("voltage", "").lower():
-                    results.append(sku)
-            else:
-                results.append(sku)
-        
-        # Fallback if empty (as per original logic)
-        if not results:
-            return repo
-            
-        return results
+        return [repo[pos] for pos in self._index.candidates(specs)]
+
+    def find_by_specs_many(self, specs_list: List[Dict]) -> List[List[Dict]]:
+        repo = self._load()
+        return [[repo[pos] for pos in self._index.candidates(specs)] for specs in specs_list]
+
+    def batch_scorer(self) -> BatchSpecScorer:
+        """
+        Vectorized scorer over the whole catalog, encoded once per load.
+        """
+        repo = self._load()
+        if self._scorer is None:
+            self._scorer = BatchSpecScorer(repo, self._compiled)
+        return self._scorer
 
 class JsonPricingRepository(PricingRepository):
     def __init__(self, data_dir: str = DATA_DIR):
         self.data_dir = data_dir
         self._cache = None
+        self._resolver = None
         
     def _load(self) -> Dict:
         if self._cache is not None:
@@ -71,13 +82,32 @@ class JsonPricingRepository(PricingRepository):
             return {"price": db.get("avg_unit_price", 0.0), "is_estimate": True}
         return {"price": price, "is_estimate": False}
 
+    def get_prices_bulk(self, sku_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        db = self._load()
+        prices = db.get("prices", {})
+        avg = db.get("avg_unit_price", 0.0)
+        result = {}
+        for sku_id in sku_ids:
+            price = prices.get(sku_id)
+            if price is None:
+                result[sku_id] = {"price": avg, "is_estimate": True}
+            else:
+                result[sku_id] = {"price": price, "is_estimate": False}
+        return result
+
+    def _test_resolver(self) -> ServiceNameResolver:
+        db = self._load()
+        if self._resolver is None:
+            self._resolver = ServiceNameResolver(db.get("tests", {}))
+        return self._resolver
+
     def get_test_cost(self, test_name: str) -> Dict[str, Any]:
         db = self._load()
-        tests = db.get("tests", {})
-        
-        # Logic ported from src/tools/pricing.py: fuzzy match
-        for tid, details in tests.items():
-            if tid.lower() in test_name.lower() or test_name.lower() in tid.lower():
-                return details
-                
-        return {"cost": 0, "billing": "unknown"}
+        # Indexed resolver instead of substring-comparing every key (order dependent)
+        tid = self._test_resolver().resolve(test_name)
+        if tid is None:
+            return {"cost": 0, "billing": "unknown"}
+        return db["tests"][tid]
+
+    def get_test_costs_bulk(self, test_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        return {name: self.get_test_cost(name) for name in set(test_names)}
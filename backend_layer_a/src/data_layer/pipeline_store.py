@@ -0,0 +1,316 @@
+"""
+Bounded store for pipeline status/output records.
+
+Records live in memory in LRU order under a byte budget. When the budget is
+exceeded, the least recently used finished pipelines (COMPLETED / FAILED)
+are spilled to a local SQLite file as zlib-compressed JSON, or dropped if
+spill-over is disabled. Reads fall through to disk transparently. Records
+older than the TTL expire from memory and disk. In-flight pipelines
+(QUEUED / RUNNING) are never evicted.
+
+Writes come from the event loop (runner status updates), so __setitem__
+only does O(1) bookkeeping: finished records are JSON-encoded to measure
+them, and spilled and swept, on a background writer thread. get() falls
+through to SQLite on a miss; the API calls it in the threadpool and uses
+peek() (memory only) inline.
+
+Configuration (env):
+    PIPELINE_STORE_MAX_BYTES    in-memory budget (default 256 MiB)
+    PIPELINE_STORE_TTL          seconds a record is kept (default 86400)
+    PIPELINE_STORE_SPILL_PATH   SQLite file for spilled records
+                                (default data/pipelines.db, empty disables)
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional, Set
+
+# Not imported from json_impl: that pulls in the matcher (numpy) at API startup
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../../data")
+
+FINISHED = ("COMPLETED", "FAILED")
+SWEEP_INTERVAL = 30.0  # seconds between TTL sweeps
+SPILL_NAME = "pipelines.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pipelines (
+    pipeline_id TEXT PRIMARY KEY,
+    updated REAL NOT NULL,
+    data BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_pipelines_updated ON pipelines(updated);
+"""
+
+
+def _encode(record: Dict) -> bytes:
+    return json.dumps(record, default=str, separators=(",", ":")).encode("utf-8")
+
+
+# Charged for a record until the writer thread has measured it (and for
+# in-flight records, which are tiny)
+UNMEASURED_SIZE = 256
+
+
+class _Entry:
+    __slots__ = ("record", "size", "updated")  # updated: wall clock, also stored on disk
+
+    def __init__(self, record: Dict, size: int, updated: float):
+        self.record = record
+        self.size = size
+        self.updated = updated
+
+
+class PipelineStore(MutableMapping):
+    def __init__(self, max_bytes: Optional[int] = None, ttl: Optional[float] = None,
+                 spill_path: Optional[str] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            os.environ.get("PIPELINE_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+        self.ttl = ttl if ttl is not None else float(os.environ.get("PIPELINE_STORE_TTL", "86400"))
+        if spill_path is None:
+            spill_path = os.environ.get("PIPELINE_STORE_SPILL_PATH", os.path.join(DATA_DIR, SPILL_NAME))
+        self.spill_path = spill_path or None
+
+        self._lock = threading.RLock()  # memory bookkeeping only, never held for I/O or encoding
+        self._disk_lock = threading.Lock()
+        self._memory: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._spilling: Dict[str, _Entry] = {}  # evicted, being written to disk
+        self._unmeasured: Set[str] = set()
+        self._bytes = 0
+        self._next_sweep = time.time() + SWEEP_INTERVAL
+        self._conn: Optional[sqlite3.Connection] = None
+        self._wake = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+        self.counters = {"spills": 0, "drops": 0, "expired": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    # -- disk (callers hold self._disk_lock) --------------------------------
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        if self.spill_path is None:
+            return None
+        if self._conn is None:
+            # Guarded by self._disk_lock, so one connection is shared across threads
+            self._conn = sqlite3.connect(self.spill_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def _disk_get(self, pipeline_id: str) -> Optional[Dict]:
+        conn = self._disk()
+        if conn is None:
+            return None
+        row = conn.execute(
+            "SELECT updated, data FROM pipelines WHERE pipeline_id = ?", (pipeline_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        if time.time() - row[0] > self.ttl:
+            with conn:
+                conn.execute("DELETE FROM pipelines WHERE pipeline_id = ?", (pipeline_id,))
+            self.counters["expired"] += 1
+            return None
+        return json.loads(zlib.decompress(row[1]))
+
+    def _disk_delete(self, pipeline_id: str) -> bool:
+        conn = self._disk()
+        if conn is None:
+            return False
+        with conn:
+            return conn.execute("DELETE FROM pipelines WHERE pipeline_id = ?", (pipeline_id,)).rowcount > 0
+
+    # -- writer thread ------------------------------------------------------
+
+    def _start_writer(self):
+        if self._writer is None and not self._closed:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._run_writer, name="pipeline-store", daemon=True)
+                    self._writer.start()
+
+    def _run_writer(self):
+        while not self._closed:
+            self._wake.wait(SWEEP_INTERVAL)
+            self._wake.clear()
+            if self._closed:
+                break
+            try:
+                self.maintain()
+            except Exception as e:
+                print(f"[PipelineStore] Maintenance failed: {e}")
+
+    def maintain(self):
+        """Measure new finished records, expire old ones, spill over budget (writer thread)."""
+        with self._lock:
+            todo = [(pid, self._memory[pid]) for pid in self._unmeasured if pid in self._memory]
+            self._unmeasured.clear()
+        for pipeline_id, entry in todo:
+            # Outside the lock: records are replaced, never mutated, once stored
+            size = len(_encode(entry.record))
+            with self._lock:
+                if self._memory.get(pipeline_id) is entry:
+                    self._bytes += size - entry.size
+                    entry.size = size
+        self._sweep(time.time())
+        self._evict()
+
+    # -- eviction -----------------------------------------------------------
+
+    def _evict(self):
+        """Spill (or drop) least recently used finished records until under budget."""
+        with self._lock:
+            if self._bytes <= self.max_bytes:
+                return
+            spilled = []
+            for pipeline_id, entry in list(self._memory.items()):
+                if self._bytes <= self.max_bytes:
+                    break
+                if entry.record.get("status") not in FINISHED:
+                    continue
+                del self._memory[pipeline_id]
+                self._bytes -= entry.size
+                spilled.append((pipeline_id, entry))
+            if self.spill_path is None:
+                self.counters["drops"] += len(spilled)
+                return
+            # Still readable while they are compressed and written
+            self._spilling.update(spilled)
+
+        rows = [(pid, e.updated, zlib.compress(_encode(e.record))) for pid, e in spilled]
+        with self._disk_lock:
+            conn = self._disk()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO pipelines VALUES (?, ?, ?)", rows)
+        with self._lock:
+            for pid, entry in spilled:
+                if self._spilling.get(pid) is entry:
+                    del self._spilling[pid]
+            self.counters["spills"] += len(spilled)
+
+    def _sweep(self, now: float):
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + SWEEP_INTERVAL
+        with self._lock:
+            expired = [pid for pid, e in self._memory.items()
+                       if now - e.updated > self.ttl and e.record.get("status") in FINISHED]
+            for pid in expired:
+                self._bytes -= self._memory.pop(pid).size
+            self.counters["expired"] += len(expired)
+
+        with self._disk_lock:
+            conn = self._disk()
+            if conn is not None:
+                with conn:
+                    cur = conn.execute("DELETE FROM pipelines WHERE updated < ?", (now - self.ttl,))
+                self.counters["expired"] += cur.rowcount
+
+    # -- mapping ------------------------------------------------------------
+
+    def __setitem__(self, pipeline_id: str, record: Dict):
+        """O(1): sizing and spilling happen on the writer thread."""
+        finished = record.get("status") in FINISHED
+        with self._lock:
+            old = self._memory.pop(pipeline_id, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._memory[pipeline_id] = _Entry(record, UNMEASURED_SIZE, time.time())
+            self._bytes += UNMEASURED_SIZE
+            if finished:
+                self._unmeasured.add(pipeline_id)
+        self._start_writer()
+        if finished:
+            self._wake.set()
+
+    def peek(self, pipeline_id: str) -> Optional[Dict]:
+        """In-memory lookup only (no disk I/O): safe on the event loop."""
+        with self._lock:
+            entry = self._memory.get(pipeline_id)
+            if entry is not None:
+                if time.time() - entry.updated > self.ttl and entry.record.get("status") in FINISHED:
+                    self._bytes -= self._memory.pop(pipeline_id).size
+                    self.counters["expired"] += 1
+                else:
+                    self._memory.move_to_end(pipeline_id)
+                    self.counters["memory_hits"] += 1
+                    return entry.record
+            entry = self._spilling.get(pipeline_id)
+            return entry.record if entry is not None else None
+
+    def get(self, pipeline_id: str, default: Any = None) -> Any:
+        """Memory, then disk. Blocking on a miss: call it off the event loop."""
+        record = self.peek(pipeline_id)
+        if record is not None:
+            return record
+        with self._disk_lock:
+            record = self._disk_get(pipeline_id)
+        if record is None:
+            self.counters["misses"] += 1
+            return default
+        self.counters["disk_hits"] += 1
+        return record
+
+    def __getitem__(self, pipeline_id: str) -> Dict:
+        record = self.get(pipeline_id)
+        if record is None:
+            raise KeyError(pipeline_id)
+        return record
+
+    def __delitem__(self, pipeline_id: str):
+        with self._lock:
+            entry = self._memory.pop(pipeline_id, None)
+            if entry is not None:
+                self._bytes -= entry.size
+        with self._disk_lock:
+            deleted = self._disk_delete(pipeline_id)
+        if not deleted and entry is None:
+            raise KeyError(pipeline_id)
+
+    def __contains__(self, pipeline_id) -> bool:
+        return self.get(pipeline_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        # In-memory pipelines only; spilled ones are reachable by id
+        with self._lock:
+            return iter(list(self._memory))
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def stats(self) -> Dict[str, Any]:
+        """Includes a disk query: call it off the event loop."""
+        spilled_entries = spilled_bytes = 0
+        with self._disk_lock:
+            conn = self._disk()
+            if conn is not None:
+                spilled_entries, spilled_bytes = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM pipelines"
+                ).fetchone()
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "spill_path": self.spill_path,
+                "spilled_entries": spilled_entries,
+                "spilled_bytes": spilled_bytes,
+                "unmeasured": len(self._unmeasured),
+                **self.counters,
+            }
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        if self._writer is not None:
+            self._writer.join(timeout=5)
+            self._writer = None
+        with self._disk_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
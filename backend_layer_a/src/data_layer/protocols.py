@@ -6,6 +6,12 @@ class ProductRepository(Protocol):
         Find candidates matching specific technical specifications.
         """
         ...
+
+    def find_by_specs_many(self, specs_list: List[Dict]) -> List[List[Dict]]:
+        """
+        Bulk find_by_specs: one candidate list per specs dict, in order.
+        """
+        ...
         
     def get_all(self) -> List[Dict]:
         """
@@ -20,6 +26,13 @@ class PricingRepository(Protocol):
         Returns dict with keys: 'price' (float), 'is_estimate' (bool)
         """
         ...
+
+    def get_prices_bulk(self, sku_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get base price details for many SKUs in one call.
+        Returns {sku_id: {'price': float, 'is_estimate': bool}}
+        """
+        ...
         
     def get_test_cost(self, test_name: str) -> Dict[str, Any]:
         """
@@ -27,3 +40,10 @@ class PricingRepository(Protocol):
         Returns dict with keys: 'cost' (float), 'billing' (str)
         """
         ...
+
+    def get_test_costs_bulk(self, test_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get cost details for many tests/services in one call.
+        Returns {test_name: {'cost': float, 'billing': str}}
+        """
+        ...
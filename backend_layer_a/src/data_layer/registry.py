@@ -0,0 +1,115 @@
+"""
+Process-wide repository registry.
+
+Hands out shared, already-loaded repository instances so pipelines don't
+re-read and re-parse the data files on every run. Source files are watched by
+mtime/size; when they change, a new repository set is loaded and swapped in
+atomically. A pipeline keeps one set for its whole run by passing it along
+in its state's "deps" (product_repo, pricing_repo, catalog_version).
+
+Configuration (env):
+    DATA_BACKEND           json (default) | columnar | snapshot | sqlite
+    REPO_RELOAD_INTERVAL   seconds between source file checks (default 2)
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+from src.data_layer.protocols import ProductRepository, PricingRepository
+from src.data_layer.json_impl import DATA_DIR, JsonProductRepository, JsonPricingRepository
+from src.data_layer.columnar_impl import ColumnarProductRepository
+from src.data_layer.snapshot import SnapshotProductRepository, SnapshotPricingRepository
+from src.data_layer.sqlite_impl import SqliteProductRepository, SqlitePricingRepository
+
+SOURCES = ("product_repo.json", "pricing_db.json")
+
+BACKENDS: Dict[str, Tuple[Callable[[str], ProductRepository], Callable[[str], PricingRepository]]] = {
+    "json": (JsonProductRepository, JsonPricingRepository),
+    "columnar": (ColumnarProductRepository, JsonPricingRepository),
+    "snapshot": (SnapshotProductRepository, SnapshotPricingRepository),
+    "sqlite": (SqliteProductRepository, SqlitePricingRepository),
+}
+
+
+class RepositorySet(NamedTuple):
+    product: ProductRepository
+    pricing: PricingRepository
+    version: str       # catalog version, changes whenever a source file changes
+    loaded_at: float
+
+
+def _source_stamp(data_dir: str) -> Tuple:
+    stamp = []
+    for name in SOURCES:
+        try:
+            st = os.stat(os.path.join(data_dir, name))
+            stamp.append((name, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stamp.append((name, None, None))
+    return tuple(stamp)
+
+
+class RepositoryRegistry:
+    def __init__(self, data_dir: str = DATA_DIR, backend: Optional[str] = None,
+                 check_interval: Optional[float] = None):
+        self.data_dir = data_dir
+        self.backend = backend or os.environ.get("DATA_BACKEND", "json")
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown DATA_BACKEND '{self.backend}'. Options: {', '.join(BACKENDS)}")
+        self.check_interval = (
+            check_interval if check_interval is not None
+            else float(os.environ.get("REPO_RELOAD_INTERVAL", "2"))
+        )
+        self._lock = threading.Lock()
+        self._current: Optional[RepositorySet] = None
+        self._stamp = None
+        self._next_check = 0.0
+
+    def get(self) -> RepositorySet:
+        current = self._current
+        if current is not None and time.monotonic() < self._next_check:
+            return current
+
+        with self._lock:
+            now = time.monotonic()
+            if self._current is not None and now < self._next_check:
+                return self._current
+            # Callers arriving while we (re)load keep getting the current set
+            self._next_check = now + self.check_interval
+            stamp = _source_stamp(self.data_dir)
+            if self._current is None or stamp != self._stamp:
+                self._current = self._load(stamp)
+                self._stamp = stamp
+            return self._current
+
+    def _load(self, stamp: Tuple) -> RepositorySet:
+        product_cls, pricing_cls = BACKENDS[self.backend]
+        product, pricing = product_cls(self.data_dir), pricing_cls(self.data_dir)
+
+        # Load fully before the swap so no pipeline pays for the parse
+        product.get_all()
+        pricing.get_prices_bulk([])
+        if hasattr(product, "batch_scorer"):
+            product.batch_scorer()
+
+        version = hashlib.sha1(repr(stamp).encode("utf-8")).hexdigest()[:12]
+        return RepositorySet(product, pricing, version, time.time())
+
+
+_registry: Optional[RepositoryRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> RepositoryRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = RepositoryRegistry()
+    return _registry
+
+
+def get_repositories() -> RepositorySet:
+    """Shared, already-loaded repositories for the current catalog version."""
+    return get_registry().get()
@@ -0,0 +1,247 @@
+"""
+Indexed registry of the open RFPs on disk.
+
+Every JSON file in RFP_DIR matching RFP_GLOB (a list of RFPs or a single
+one) is loaded once; on later scans only files whose mtime/size changed are
+re-read, and RFPs of deleted files are dropped. Deadlines are parsed once
+at load and kept in a sorted (deadline, id) index, so a deadline window,
+its first RFP and each page of it are bisect lookups instead of a parse
+and a sort of every RFP.
+
+Pages are addressed by an opaque cursor (the position after the last
+(deadline, id) returned), which stays valid while files are added or
+removed.
+
+Configuration (env):
+    RFP_DIR              directory of RFP files (default data/)
+    RFP_GLOB             file name pattern (default *rfp*.json)
+    RFP_SCAN_INTERVAL    seconds between directory checks (default 2)
+"""
+import base64
+import fnmatch
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../../data")
+
+RFP_DIR = os.environ.get("RFP_DIR", DATA_DIR)
+RFP_GLOB = os.environ.get("RFP_GLOB", "*rfp*.json")
+
+# Sorts after any id, so (deadline, MAX_ID) closes a window inclusively
+MAX_ID = "\U0010ffff"
+
+
+class RfpPage(NamedTuple):
+    rfps: List[Dict]
+    next_cursor: Optional[str]  # None on the last page
+    total: int                  # RFPs in the deadline window (before filters)
+
+
+def parse_deadline(value) -> Optional[datetime]:
+    # Naive UTC: a trailing Z is dropped, other offsets (e.g. +05:30) are
+    # converted, so every key in the index compares with every other
+    try:
+        deadline = datetime.fromisoformat(str(value).replace("Z", ""))
+    except ValueError:
+        return None
+    if deadline.tzinfo is not None:
+        deadline = deadline.astimezone(timezone.utc).replace(tzinfo=None)
+    return deadline
+
+
+def utc_now() -> datetime:
+    """The current time as naive UTC, comparable with parse_deadline's results."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def encode_cursor(key: Tuple[datetime, str]) -> str:
+    raw = f"{key[0].isoformat()}|{key[1]}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        deadline, rfp_id = raw.split("|", 1)
+        return datetime.fromisoformat(deadline), rfp_id
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor '{cursor}'")
+
+
+class RfpRegistry:
+    def __init__(self, directory: str = RFP_DIR, pattern: str = RFP_GLOB,
+                 check_interval: Optional[float] = None):
+        self.directory = directory
+        self.pattern = pattern
+        self.check_interval = (
+            check_interval if check_interval is not None
+            else float(os.environ.get("RFP_SCAN_INTERVAL", "2"))
+        )
+        self._lock = threading.RLock()
+        self._files: Dict[str, Tuple[int, int, List[str]]] = {}  # path -> (mtime_ns, size, ids)
+        self._rfps: Dict[str, Dict] = {}
+        self._owner: Dict[str, str] = {}  # id -> file it was last loaded from
+        self._keys: List[Tuple[datetime, str]] = []  # sorted (deadline, id)
+        self._deadlines: Dict[str, datetime] = {}
+        self._next_check = 0.0
+        self.counters = {"scans": 0, "files_read": 0}
+
+    # --- Loading ---
+
+    def refresh(self, force: bool = False):
+        """Pick up added, changed and deleted files (at most every check_interval seconds)."""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return
+        with self._lock:
+            if not force and now < self._next_check:
+                return
+            self._next_check = now + self.check_interval
+            self.counters["scans"] += 1
+
+            seen = set()
+            try:
+                entries = sorted(os.scandir(self.directory), key=lambda e: e.name)
+            except FileNotFoundError:
+                entries = []
+            for entry in entries:
+                if not entry.is_file() or not fnmatch.fnmatch(entry.name, self.pattern):
+                    continue
+                seen.add(entry.path)
+                st = entry.stat()
+                known = self._files.get(entry.path)
+                if known is None or known[:2] != (st.st_mtime_ns, st.st_size):
+                    self._load_file(entry.path, st)
+
+            for path in [p for p in self._files if p not in seen]:
+                self._drop_file(path)
+
+    def _load_file(self, path: str, st: os.stat_result):
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            # Possibly mid-write: keep what we had, retry on the next scan
+            print(f"[RfpRegistry] Skipping {path}: {e}")
+            return
+        self.counters["files_read"] += 1
+        rfps = data if isinstance(data, list) else [data]
+
+        old_ids = set(self._files[path][2]) if path in self._files else set()
+        ids = []
+        for rfp in rfps:
+            if not isinstance(rfp, dict) or "id" not in rfp:
+                continue
+            rfp_id = str(rfp["id"])
+            self._put(rfp_id, rfp, path)
+            ids.append(rfp_id)
+            old_ids.discard(rfp_id)
+        for rfp_id in old_ids:
+            self._remove(rfp_id, path)
+        self._files[path] = (st.st_mtime_ns, st.st_size, ids)
+
+    def _drop_file(self, path: str):
+        for rfp_id in self._files.pop(path)[2]:
+            self._remove(rfp_id, path)
+
+    def _put(self, rfp_id: str, rfp: Dict, path: str):
+        deadline = parse_deadline(rfp.get("submission_deadline"))
+        self._unindex(rfp_id)
+        # Index first: if the key can't be placed, nothing else has changed
+        if deadline is not None:
+            insort(self._keys, (deadline, rfp_id))
+            self._deadlines[rfp_id] = deadline
+        self._rfps[rfp_id] = rfp
+        self._owner[rfp_id] = path
+
+    def _remove(self, rfp_id: str, path: str):
+        # Only if no other file has since provided the same id
+        if self._owner.get(rfp_id) != path:
+            return
+        self._unindex(rfp_id)
+        del self._rfps[rfp_id]
+        del self._owner[rfp_id]
+
+    def _unindex(self, rfp_id: str):
+        deadline = self._deadlines.pop(rfp_id, None)
+        if deadline is not None:
+            i = bisect_left(self._keys, (deadline, rfp_id))
+            if i < len(self._keys) and self._keys[i] == (deadline, rfp_id):
+                del self._keys[i]
+
+    # --- Queries ---
+
+    def all(self) -> List[Dict]:
+        self.refresh()
+        with self._lock:
+            return list(self._rfps.values())
+
+    def get(self, rfp_id: str) -> Optional[Dict]:
+        self.refresh()
+        return self._rfps.get(rfp_id)
+
+    def deadline(self, rfp_id: str) -> Optional[datetime]:
+        return self._deadlines.get(rfp_id)
+
+    def _bounds(self, start: datetime, end: datetime) -> Tuple[int, int]:
+        return bisect_left(self._keys, (start, "")), bisect_right(self._keys, (end, MAX_ID))
+
+    def count_window(self, start: datetime, end: datetime) -> int:
+        self.refresh()
+        with self._lock:
+            lo, hi = self._bounds(start, end)
+            return hi - lo
+
+    def earliest(self, start: datetime, end: datetime) -> Optional[Dict]:
+        """The RFP with the earliest deadline in [start, end]."""
+        self.refresh()
+        with self._lock:
+            lo, hi = self._bounds(start, end)
+            return self._rfps[self._keys[lo][1]] if lo < hi else None
+
+    def window(self, start: datetime, end: datetime, cursor: Optional[str] = None,
+               limit: Optional[int] = None, predicate: Optional[Callable[[Dict], bool]] = None) -> RfpPage:
+        """
+        RFPs with start <= deadline <= end, earliest first, resuming after
+        `cursor`. With `predicate`, non-matching RFPs are skipped (and
+        don't count towards `limit`).
+        """
+        self.refresh()
+        with self._lock:
+            lo, hi = self._bounds(start, end)
+            total = hi - lo
+            if cursor:
+                lo = max(lo, bisect_right(self._keys, decode_cursor(cursor)))
+
+            rfps: List[Dict] = []
+            i = lo
+            while i < hi and (limit is None or len(rfps) < limit):
+                rfp = self._rfps[self._keys[i][1]]
+                if predicate is None or predicate(rfp):
+                    rfps.append(rfp)
+                i += 1
+            # Another page if we stopped early and something is left to look at
+            next_cursor = encode_cursor(self._keys[i - 1]) if i < hi and rfps else None
+            return RfpPage(rfps, next_cursor, total)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"files": len(self._files), "rfps": len(self._rfps), "indexed": len(self._keys), **self.counters}
+
+
+_registry: Optional[RfpRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_rfp_registry() -> RfpRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = RfpRegistry()
+    return _registry
@@ -0,0 +1,159 @@
+"""
+Test/service name resolver for the pricing DB.
+
+Built once per pricing load. Resolves free-text test names from RFPs
+("Type Test", "High Voltage test", "Routine Test.") to pricing DB keys
+("TEST-TYPE", "TEST-HV", "TEST-ROUTINE") without scanning every key:
+
+1. Alias table: order-insensitive content tokens of each key -> key.
+2. Multi-pattern (Aho-Corasick) scan of the name for alias phrases.
+3. Token index: best token overlap with a key.
+
+Ties are broken deterministically (coverage, match length, earliest
+position, key), and resolved names are memoized.
+"""
+import re
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Words that carry no meaning for picking a test
+STOPWORDS = {"test", "tests", "testing", "and", "of", "the", "as", "per", "for", "on"}
+
+# Abbreviations used in pricing keys, with the phrases RFPs tend to use
+EXPANSIONS = {
+    "hv": ["high voltage"],
+    "fr": ["fire resistant", "fire resistance"],
+    "pd": ["partial discharge"],
+}
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+MEMO_LIMIT = 10000
+
+
+def normalize(name: str) -> str:
+    return _NON_WORD.sub(" ", name.lower()).strip()
+
+
+def content_tokens(text: str) -> List[str]:
+    return [t for t in normalize(text).split() if t not in STOPWORDS]
+
+
+class AhoCorasick:
+    """Multi-pattern matcher; patterns are matched on word boundaries."""
+
+    def __init__(self, patterns: Dict[str, Any]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[Tuple[int, Any]]] = [[]]
+
+        for phrase, value in patterns.items():
+            # Pad with spaces so matches only happen on whole words
+            padded = f" {phrase} "
+            state = 0
+            for ch in padded:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append((len(padded), value))
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                # Depth-1 states fail back to the root, not to themselves
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yield (start, length, value) for every pattern occurrence in normalized text."""
+        padded = f" {text} "
+        state = 0
+        for i, ch in enumerate(padded):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for length, value in self.out[state]:
+                yield i + 1 - length, length, value
+
+
+class ServiceNameResolver:
+    def __init__(self, tests: Dict[str, Dict]):
+        self.aliases: Dict[str, str] = {}
+        self.token_index: Dict[str, List[str]] = {}
+        self.key_tokens: Dict[str, List[str]] = {}
+        phrases: Dict[str, str] = {}
+
+        # Sorted so that alias collisions always resolve to the same key
+        for tid in sorted(tests):
+            names = [tid] + list(tests[tid].get("aliases", [])) if isinstance(tests[tid], dict) else [tid]
+            tokens = content_tokens(tid)
+            self.key_tokens[tid] = tokens
+            for token in set(tokens):
+                self.token_index.setdefault(token, []).append(tid)
+
+            for name in names:
+                toks = content_tokens(name)
+                if not toks:
+                    continue
+                self.aliases.setdefault(" ".join(sorted(toks)), tid)
+                phrases.setdefault(" ".join(toks), tid)
+                for tok in toks:
+                    for expansion in EXPANSIONS.get(tok, []):
+                        phrases.setdefault(expansion, tid)
+
+        self.matcher = AhoCorasick(phrases)
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Pricing DB key for a free-text test name, or None."""
+        try:
+            return self._memo[name]
+        except KeyError:
+            pass
+        tid = self._resolve(name)
+        if len(self._memo) >= MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[name] = tid
+        return tid
+
+    def _resolve(self, name: str) -> Optional[str]:
+        tokens = content_tokens(name)
+        if not tokens:
+            return None
+
+        # 1. Exact alias (order-insensitive): "Type Test" / "TEST-TYPE"
+        tid = self.aliases.get(" ".join(sorted(tokens)))
+        if tid:
+            return tid
+
+        # 2. Alias phrases anywhere in the name
+        best = None
+        for start, length, tid in self.matcher.iter_matches(normalize(name)):
+            rank = (-self._coverage(tid, tokens), -length, start, tid)
+            if best is None or rank < best:
+                best = rank
+        if best is not None:
+            return best[3]
+
+        # 3. Token overlap
+        candidates = {tid for tok in tokens for tid in self.token_index.get(tok, [])}
+        if not candidates:
+            return None
+        return min(candidates, key=lambda tid: (-self._coverage(tid, tokens), tid))
+
+    def _coverage(self, tid: str, tokens: List[str]) -> float:
+        key_tokens = self.key_tokens[tid]
+        if not key_tokens:
+            return 0.0
+        return sum(1 for t in key_tokens if t in tokens) / len(key_tokens)
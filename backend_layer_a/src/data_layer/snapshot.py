@@ -0,0 +1,375 @@
+"""
+Memory-mapped binary catalog snapshot.
+
+Compiles product_repo.json + pricing_db.json into one versioned, checksummed
+file holding fixed-width columns, string tables, the prebuilt spec index and
+the batch scorer's encoded spec columns.
+Repositories open it with mmap, so worker processes share the OS page cache
+and cold start doesn't depend on catalog size.
+
+Layout (little-endian):
+    magic (8) | format version u32 | header length u32 | payload crc32 u32 | reserved u32
+    header JSON (section table, column/index metadata, source file stats)
+    payload: 8-byte aligned sections
+
+Compile manually with:
+    python -m src.data_layer.snapshot [--data-dir data] [--out data/catalog.snap]
+Repositories also rebuild it automatically when a source JSON changes.
+
+Opening a snapshot only checks the preamble, that the payload covers every
+section, and the source files' size/mtime, so it stays O(1) in catalog
+size. The payload CRC is checked after the CLI writes a snapshot, or on
+every open with SNAPSHOT_VERIFY=1.
+
+Configuration (env):
+    SNAPSHOT_VERIFY    1 to CRC-check the whole payload when repositories open it (default 0)
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Any, Dict, List, Optional, Tuple
+from src.data_layer.json_impl import DATA_DIR, JsonPricingRepository
+from src.data_layer.columnar_impl import (
+    Column,
+    ColumnarCatalog,
+    ColumnarProductRepository,
+    CompiledRows,
+    StringHeap,
+    _JsonText,
+)
+from src.data_layer.spec_index import BUCKET_KEYS, SpecIndex
+from src.utils.batch_matcher import BatchSpecScorer
+
+# Optional dependency, like in batch_matcher: without it there are no scorer columns
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b"RFPSNAP\0"
+FORMAT_VERSION = 2
+_PREAMBLE = struct.Struct("<8sIII4x")
+SNAPSHOT_NAME = "catalog.snap"
+SOURCES = ("product_repo.json", "pricing_db.json")
+
+SNAPSHOT_VERIFY = os.environ.get("SNAPSHOT_VERIFY", "0") == "1"
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class _SnapshotWriter:
+    def __init__(self):
+        self.payload = bytearray()
+        self.sections: Dict[str, Tuple[int, int, str]] = {}
+
+    def add(self, name: str, data, typecode: str = "B"):
+        raw = data.tobytes() if isinstance(data, array) else bytes(data)
+        self.payload += b"\0" * (_pad8(len(self.payload)) - len(self.payload))
+        self.sections[name] = (len(self.payload), len(raw), typecode)
+        self.payload += raw
+
+    def add_heap(self, name: str, values: List[str]):
+        heap = StringHeap()
+        for v in values:
+            heap.append(v)
+        self.add(f"{name}.blob", heap.blob)
+        self.add(f"{name}.offsets", heap.offsets, "Q")
+
+
+def _source_stats(data_dir: str) -> Dict[str, List[float]]:
+    stats = {}
+    for name in SOURCES:
+        path = os.path.join(data_dir, name)
+        if os.path.exists(path):
+            st = os.stat(path)
+            stats[name] = [st.st_mtime, st.st_size]
+    return stats
+
+
+def snapshot_path(data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, SNAPSHOT_NAME)
+
+
+def compile_snapshot(data_dir: str = DATA_DIR, out_path: Optional[str] = None) -> str:
+    """Build the snapshot from the JSON sources. Written atomically (tmp + rename)."""
+    out_path = out_path or snapshot_path(data_dir)
+    sources = _source_stats(data_dir)
+
+    try:
+        with open(os.path.join(data_dir, "product_repo.json"), 'r') as f:
+            records = json.load(f)
+    except FileNotFoundError:
+        records = []
+    pricing = JsonPricingRepository(data_dir)._load()
+
+    writer = _SnapshotWriter()
+    catalog = ColumnarCatalog.from_records(records)
+    del records
+
+    writer.add("sku_ids.blob", catalog.sku_ids.blob)
+    writer.add("sku_ids.offsets", catalog.sku_ids.offsets, "Q")
+    writer.add("product_names.blob", catalog.product_names.blob)
+    writer.add("product_names.offsets", catalog.product_names.offsets, "Q")
+
+    columns_meta = {}
+    for key, column in catalog.columns.items():
+        typecode = {"int": "q", "float": "d", "dict": "i"}[column.kind]
+        writer.add(f"col.{key}", column.data, typecode)
+        meta = {"kind": column.kind, "typecode": typecode}
+        if column.kind == "dict":
+            writer.add_heap(f"col.{key}.values", column.values)
+            meta["json_codes"] = [i for i, v in enumerate(column.values) if isinstance(v, _JsonText)]
+        columns_meta[key] = meta
+
+    # Prebuilt spec index: CSR postings per bucket key + sorted size arrays
+    compiled = CompiledRows(catalog)
+    index = SpecIndex(compiled)
+    index_meta = {}
+    for key in BUCKET_KEYS:
+        postings = array("i")
+        entries = []
+        for bkey, plist in index.buckets[key].items():
+            entries.append([bkey, len(postings), len(postings) + len(plist)])
+            postings.extend(plist)
+        writer.add(f"index.{key}", postings, "i")
+        index_meta[key] = entries
+    writer.add("index.sizes", index.sizes, "d")
+    writer.add("index.size_positions", index.size_positions, "i")
+
+    # Batch scorer columns: numeric values + categorical codes per spec key, vocab in the header
+    scorer_meta = None
+    if np is not None:
+        scorer = BatchSpecScorer(catalog, compiled)
+        scorer_meta = {}
+        for key, vocab in scorer.vocab.items():
+            writer.add(f"scorer.{key}.numeric", scorer.numeric[key].tobytes(), "d")
+            writer.add(f"scorer.{key}.codes", scorer.codes[key].tobytes(), "i")
+            scorer_meta[key] = sorted(vocab, key=vocab.get)
+
+    # Pricing: SKU ids sorted for binary search, prices as float64
+    prices = sorted(pricing.get("prices", {}).items())
+    writer.add_heap("prices.ids", [sku_id for sku_id, _ in prices])
+    writer.add("prices.values", array("d", (float(p) for _, p in prices)), "d")
+
+    header = json.dumps({
+        "sources": sources,
+        "sections": writer.sections,
+        "columns": columns_meta,
+        "index": index_meta,
+        "scorer": scorer_meta,
+        "rows": len(catalog),
+        "pricing": {
+            "tests": pricing.get("tests", {}),
+            "avg_unit_price": pricing.get("avg_unit_price", 0.0),
+        },
+    }).encode("utf-8")
+
+    preamble = _PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header), zlib.crc32(writer.payload))
+    head = preamble + header
+    head += b"\0" * (_pad8(len(head)) - len(head))
+
+    tmp_path = f"{out_path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(head)
+        f.write(writer.payload)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class _MappedHeap(Sequence):
+    """StringHeap-compatible view over mmap'd blob/offsets sections."""
+
+    def __init__(self, blob: memoryview, offsets: memoryview):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+
+class CatalogSnapshot:
+    """An opened (mmap'd) snapshot file."""
+
+    def __init__(self, path: str, verify: bool = False):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mm) < _PREAMBLE.size:
+            raise SnapshotError(f"Truncated snapshot: {path}")
+        magic, version, header_len, crc = _PREAMBLE.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"Not a catalog snapshot: {path}")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"Snapshot format {version}, expected {FORMAT_VERSION}")
+
+        start = _PREAMBLE.size
+        self.header = json.loads(self._mm[start:start + header_len].decode("utf-8"))
+        self._payload = memoryview(self._mm)[_pad8(start + header_len):]
+        # Cheap structural check on every open; the CRC reads the whole payload
+        end = max((offset + length for offset, length, _ in self.header["sections"].values()), default=0)
+        if len(self._payload) < end:
+            raise SnapshotError(f"Truncated snapshot: {path}")
+        if verify and zlib.crc32(self._payload) != crc:
+            raise SnapshotError(f"Checksum mismatch: {path}")
+
+    def section(self, name: str) -> memoryview:
+        offset, length, typecode = self.header["sections"][name]
+        view = self._payload[offset:offset + length]
+        return view if typecode == "B" else view.cast(typecode)
+
+    def heap(self, name: str) -> _MappedHeap:
+        return _MappedHeap(self.section(f"{name}.blob"), self.section(f"{name}.offsets"))
+
+    def is_stale(self, data_dir: str) -> bool:
+        return self.header.get("sources") != _source_stats(data_dir)
+
+    def catalog(self) -> ColumnarCatalog:
+        columns = {}
+        for key, meta in self.header["columns"].items():
+            values = None
+            if meta["kind"] == "dict":
+                json_codes = set(meta["json_codes"])
+                heap = self.heap(f"col.{key}.values")
+                values = [_JsonText(v) if i in json_codes else v for i, v in enumerate(heap)]
+            columns[key] = Column(meta["kind"], self.section(f"col.{key}"), values)
+        return ColumnarCatalog(self.heap("sku_ids"), self.heap("product_names"), columns)
+
+    def spec_index(self) -> SpecIndex:
+        buckets = {}
+        for key, entries in self.header["index"].items():
+            postings = self.section(f"index.{key}")
+            buckets[key] = {bkey: postings[start:end] for bkey, start, end in entries}
+        return SpecIndex.from_parts(
+            buckets,
+            self.section("index.sizes"),
+            self.section("index.size_positions"),
+            self.header["rows"],
+        )
+
+    def batch_scorer(self, catalog: ColumnarCatalog, compiled: CompiledRows) -> Optional[BatchSpecScorer]:
+        """Scorer over the stored columns; None if the snapshot was written without NumPy."""
+        meta = self.header.get("scorer")
+        if meta is None or np is None:
+            return None
+        numeric, codes, vocab = {}, {}, {}
+        for key, tokens in meta.items():
+            # Zero-copy, read-only views of the mapping
+            numeric[key] = np.frombuffer(self.section(f"scorer.{key}.numeric"), dtype=np.float64)
+            codes[key] = np.frombuffer(self.section(f"scorer.{key}.codes"), dtype=np.int32)
+            vocab[key] = {token: code for code, token in enumerate(tokens)}
+        return BatchSpecScorer.from_parts(catalog, compiled, numeric, codes, vocab)
+
+
+def open_snapshot(data_dir: str = DATA_DIR, path: Optional[str] = None, verify: bool = SNAPSHOT_VERIFY) -> CatalogSnapshot:
+    """
+    Open the snapshot for `data_dir`, (re)building it first when it is
+    missing, unreadable, or older than the source JSON files.
+    """
+    path = path or snapshot_path(data_dir)
+    if os.path.exists(path):
+        try:
+            snap = CatalogSnapshot(path, verify=verify)
+            if not snap.is_stale(data_dir):
+                return snap
+        except (SnapshotError, ValueError, KeyError):
+            pass
+    compile_snapshot(data_dir, path)
+    # Just written from memory: nothing to verify
+    return CatalogSnapshot(path)
+
+
+class SnapshotProductRepository(ColumnarProductRepository):
+    def __init__(self, data_dir: str = DATA_DIR, path: Optional[str] = None, verify: bool = SNAPSHOT_VERIFY):
+        super().__init__(data_dir)
+        self.path = path
+        self.verify = verify
+        self._snapshot: Optional[CatalogSnapshot] = None
+
+    def _load(self) -> ColumnarCatalog:
+        if self._catalog is not None:
+            return self._catalog
+        snap = open_snapshot(self.data_dir, self.path, self.verify)
+        self._catalog = snap.catalog()
+        self._compiled = CompiledRows(self._catalog)
+        self._index = snap.spec_index()
+        self._snapshot = snap
+        return self._catalog
+
+    def batch_scorer(self) -> BatchSpecScorer:
+        catalog = self._load()
+        if self._scorer is None:
+            # Stored columns instead of re-encoding every row
+            self._scorer = self._snapshot.batch_scorer(catalog, self._compiled) or super().batch_scorer()
+        return self._scorer
+
+
+class SnapshotPricingRepository(JsonPricingRepository):
+    """
+    Prices are binary-searched in the mmap'd snapshot; the (small) tests table
+    and the average unit price come from the snapshot header.
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR, path: Optional[str] = None, verify: bool = SNAPSHOT_VERIFY):
+        super().__init__(data_dir)
+        self.path = path
+        self.verify = verify
+        self._ids = None
+        self._prices = None
+
+    def _load(self) -> Dict:
+        if self._cache is not None:
+            return self._cache
+        snap = open_snapshot(self.data_dir, self.path, self.verify)
+        self._ids = snap.heap("prices.ids")
+        self._prices = snap.section("prices.values")
+        pricing = snap.header["pricing"]
+        self._cache = {"tests": pricing["tests"], "avg_unit_price": pricing["avg_unit_price"]}
+        return self._cache
+
+    def _lookup(self, sku_id: str) -> Optional[float]:
+        i = bisect_left(self._ids, sku_id)
+        if i < len(self._ids) and self._ids[i] == sku_id:
+            return self._prices[i]
+        return None
+
+    def get_price_for_sku(self, sku_id: str) -> Dict[str, Any]:
+        db = self._load()
+        price = self._lookup(sku_id)
+        if price is None:
+            return {"price": db.get("avg_unit_price", 0.0), "is_estimate": True}
+        return {"price": price, "is_estimate": False}
+
+    def get_prices_bulk(self, sku_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        self._load()
+        return {sku_id: self.get_price_for_sku(sku_id) for sku_id in set(sku_ids)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the binary catalog snapshot.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    path = compile_snapshot(args.data_dir, args.out)
+    # Verified once here, as written to disk
+    snap = CatalogSnapshot(path, verify=True)
+    print(f"Wrote {path}: {snap.header['rows']} SKUs, {os.path.getsize(path)} bytes")
+
+
+if __name__ == "__main__":
+    main()
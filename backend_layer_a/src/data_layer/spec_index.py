@@ -0,0 +1,151 @@
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from src.utils.spec_matcher import SpecValue, compile_specs, tolerance_for
+
+# Categorical attributes that get a hash bucket (canonical value -> SKU positions)
+BUCKET_KEYS = ("voltage", "conductor_material", "insulation", "cores")
+SIZE_KEY = "conductor_size_mm2"
+
+# Candidate generation walks the rungs in order, collecting the union of
+# their results, and stops once it has MIN_CANDIDATES (so an exact match
+# doesn't hide the near matches of the comparison table). Rungs only
+# constrain the attributes the RFP actually specifies, so identical
+# effective rungs are skipped.
+RELAXATION_LADDER = (
+    ("voltage", "conductor_material", "insulation", "cores", SIZE_KEY),
+    ("voltage", "conductor_material", "cores", SIZE_KEY),
+    ("voltage", SIZE_KEY),
+    ("voltage",),
+    (SIZE_KEY,),
+)
+
+# Enough to fill the Technical Agent's comparison table (TECHNICAL_TOP_K)
+MIN_CANDIDATES = max(1, int(os.environ.get("TECHNICAL_TOP_K", "3")))
+
+# Last resort when every rung comes back empty: a bounded slice of the catalog
+# (in catalog order) so the Technical Agent still has something to flag as
+# MADE_TO_ORDER_REQUIRED, instead of scoring the whole repo.
+FALLBACK_LIMIT = 25
+
+
+def bucket_key(value: Optional[SpecValue]) -> Any:
+    """
+    Key used by the hash buckets: the unit-normalized number when there is one
+    (kV for voltage, whose tolerance is 0), else the canonical token.
+    """
+    if value is None or value.raw is None:
+        return None
+    return value.number if value.number is not None else value.token
+
+
+class SpecIndex:
+    """
+    Multi-attribute inverted index over a product catalog.
+    Positions refer to the order of the products passed in.
+    """
+
+    def __init__(self, compiled: Iterable[Dict[str, SpecValue]], fallback_limit: int = FALLBACK_LIMIT,
+                 min_candidates: int = MIN_CANDIDATES):
+        self.tolerance = tolerance_for(SIZE_KEY)
+        self.fallback_limit = fallback_limit
+        self.min_candidates = min_candidates
+        self.buckets: Dict[str, Dict[Any, List[int]]] = {k: {} for k in BUCKET_KEYS}
+        sized: List[Tuple[float, int]] = []
+        self.size = 0
+
+        for pos, specs in enumerate(compiled):
+            for key in BUCKET_KEYS:
+                bkey = bucket_key(specs.get(key))
+                if bkey is not None:
+                    self.buckets[key].setdefault(bkey, []).append(pos)
+            size = specs.get(SIZE_KEY)
+            if size is not None and size.number is not None:
+                sized.append((size.number, pos))
+            self.size = pos + 1
+
+        # Compact typed buffers instead of lists of Python ints/floats
+        self.buckets = {
+            key: {bkey: array("i", plist) for bkey, plist in buckets.items()}
+            for key, buckets in self.buckets.items()
+        }
+        sized.sort()
+        self.sizes = array("d", (s for s, _ in sized))
+        self.size_positions = array("i", (p for _, p in sized))
+
+    @classmethod
+    def from_parts(cls, buckets: Dict[str, Dict[Any, Sequence[int]]], sizes: Sequence[float],
+                   size_positions: Sequence[int], size: int, fallback_limit: int = FALLBACK_LIMIT,
+                   min_candidates: int = MIN_CANDIDATES) -> "SpecIndex":
+        """Rebuild an index from prebuilt parts (e.g. buffers of a catalog snapshot)."""
+        index = cls.__new__(cls)
+        index.tolerance = tolerance_for(SIZE_KEY)
+        index.fallback_limit = fallback_limit
+        index.min_candidates = min_candidates
+        index.buckets = buckets
+        index.sizes = sizes
+        index.size_positions = size_positions
+        index.size = size
+        return index
+
+    def _size_window(self, req_size: float) -> List[int]:
+        # Same predicate as spec_matcher.values_match: |sku - req| <= req * tol
+        delta = req_size * self.tolerance
+        lo = bisect_left(self.sizes, req_size - abs(delta))
+        hi = bisect_right(self.sizes, req_size + abs(delta))
+        return [
+            self.size_positions[i] for i in range(lo, hi)
+            if abs(self.sizes[i] - req_size) <= delta
+        ]
+
+    def _postings(self, key: str, specs: Dict[str, SpecValue]) -> Optional[Sequence[int]]:
+        if key == SIZE_KEY:
+            req_size = specs[SIZE_KEY]
+            return self._size_window(req_size.number) if req_size.numeric else None
+        bkey = bucket_key(specs[key])
+        if bkey is None:
+            return None
+        return self.buckets[key].get(bkey, [])
+
+    def _lookup(self, keys: Sequence[str], specs: Dict[str, SpecValue]) -> List[int]:
+        postings = []
+        for key in keys:
+            plist = self._postings(key, specs)
+            if plist is not None:
+                if not plist:
+                    return []
+                postings.append(plist)
+        if not postings:
+            return []
+
+        # Intersect smallest-first so the cost is bounded by the rarest attribute
+        postings.sort(key=len)
+        result = set(postings[0])
+        for plist in postings[1:]:
+            result.intersection_update(plist)
+            if not result:
+                return []
+        return sorted(result)
+
+    def candidates(self, specs: Dict) -> List[int]:
+        """
+        Return catalog positions (catalog order) from the relaxation ladder:
+        rungs are merged until at least min_candidates are found. Specs may
+        be raw or precompiled.
+        """
+        specs = compile_specs(specs)
+        tried = set()
+        found = set()
+        for rung in RELAXATION_LADDER:
+            effective = tuple(k for k in rung if k in specs and specs[k].raw is not None)
+            if not effective or effective in tried:
+                continue
+            tried.add(effective)
+            found.update(self._lookup(effective, specs))
+            if len(found) >= self.min_candidates:
+                break
+        if found:
+            return sorted(found)
+
+        return list(range(min(self.size, self.fallback_limit)))
@@ -0,0 +1,341 @@
+"""
+SQLite-backed product and pricing repositories.
+
+The catalog lives on disk with indexed columns for voltage, conductor
+material, insulation, cores and conductor size, so multi-million-SKU catalogs
+run with bounded memory and indexed range queries. Each thread gets its own
+pooled connection (WAL mode); statements use fixed SQL per query shape so
+sqlite3's statement cache keeps them prepared.
+
+Import the JSON data with:
+    python -m src.data_layer.sqlite_impl [--data-dir data] [--db data/catalog.db]
+Select with DATA_BACKEND=sqlite (SQLITE_DB_PATH overrides the db location).
+The database is (re)imported automatically when it doesn't exist or a
+source JSON in data_dir is newer.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, Optional
+from src.data_layer.protocols import ProductRepository, PricingRepository
+from src.data_layer.json_impl import DATA_DIR
+from src.data_layer.service_resolver import ServiceNameResolver
+from src.data_layer.spec_index import (
+    BUCKET_KEYS,
+    FALLBACK_LIMIT,
+    MIN_CANDIDATES,
+    RELAXATION_LADDER,
+    SIZE_KEY,
+    bucket_key,
+)
+from src.utils.spec_matcher import compile_specs, tolerance_for
+
+DB_NAME = "catalog.db"
+SCHEMA_VERSION = "1"
+IMPORT_BATCH = 5000
+IN_CHUNK = 500  # max bound parameters per IN (...) query
+
+# Indexed column per bucketed spec. Columns are untyped so numeric keys
+# (kV, cores) and canonical string tokens keep their type.
+KEY_COLUMNS = {
+    "voltage": "voltage_key",
+    "conductor_material": "material_key",
+    "insulation": "insulation_key",
+    "cores": "cores_key",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    pos INTEGER PRIMARY KEY,
+    sku_id TEXT NOT NULL UNIQUE,
+    product_name TEXT,
+    specs TEXT NOT NULL,
+    voltage_key,
+    material_key,
+    insulation_key,
+    cores_key,
+    size_mm2 REAL
+);
+CREATE INDEX IF NOT EXISTS idx_products_voltage ON products(voltage_key);
+CREATE INDEX IF NOT EXISTS idx_products_material ON products(material_key);
+CREATE INDEX IF NOT EXISTS idx_products_insulation ON products(insulation_key);
+CREATE INDEX IF NOT EXISTS idx_products_cores ON products(cores_key);
+CREATE INDEX IF NOT EXISTS idx_products_size ON products(size_mm2);
+CREATE TABLE IF NOT EXISTS prices (
+    sku_id TEXT PRIMARY KEY,
+    price REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tests (
+    test_id TEXT PRIMARY KEY,
+    details TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+
+def db_path_for(data_dir: str = DATA_DIR) -> str:
+    return os.environ.get("SQLITE_DB_PATH") or os.path.join(data_dir, DB_NAME)
+
+
+class ConnectionPool:
+    """One connection per thread, opened lazily, shared per db path."""
+
+    _pools: Dict[str, "ConnectionPool"] = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    @classmethod
+    def for_path(cls, path: str) -> "ConnectionPool":
+        path = os.path.abspath(path)
+        with cls._pools_lock:
+            if path not in cls._pools:
+                cls._pools[path] = cls(path)
+            return cls._pools[path]
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+def import_json(data_dir: str = DATA_DIR, db_path: Optional[str] = None) -> str:
+    """(Re)import product_repo.json and pricing_db.json into the SQLite db."""
+    db_path = db_path or db_path_for(data_dir)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        with conn:
+            conn.execute("DELETE FROM products")
+            conn.execute("DELETE FROM prices")
+            conn.execute("DELETE FROM tests")
+
+            try:
+                with open(os.path.join(data_dir, "product_repo.json"), 'r') as f:
+                    records = json.load(f)
+            except FileNotFoundError:
+                records = []
+            batch = []
+            for pos, sku in enumerate(records):
+                specs = sku.get("specs", {})
+                compiled = compile_specs(specs)
+                size = compiled.get(SIZE_KEY)
+                batch.append((
+                    pos, sku["sku_id"], sku.get("product_name"), json.dumps(specs),
+                    *(bucket_key(compiled.get(key)) for key in BUCKET_KEYS),
+                    size.number if size is not None else None,
+                ))
+                if len(batch) >= IMPORT_BATCH:
+                    conn.executemany("INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                    batch = []
+            conn.executemany("INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+            del records
+
+            try:
+                with open(os.path.join(data_dir, "pricing_db.json"), 'r') as f:
+                    pricing = json.load(f)
+            except FileNotFoundError:
+                pricing = {"tests": {}, "prices": {}, "avg_unit_price": 0.0}
+            conn.executemany("INSERT INTO prices VALUES (?, ?)", pricing.get("prices", {}).items())
+            conn.executemany(
+                "INSERT INTO tests VALUES (?, ?)",
+                ((tid, json.dumps(details)) for tid, details in pricing.get("tests", {}).items()),
+            )
+            conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                ("schema_version", SCHEMA_VERSION),
+                ("avg_unit_price", json.dumps(pricing.get("avg_unit_price", 0.0))),
+            ])
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    return db_path
+
+
+def _ensure_db(data_dir: str, db_path: str):
+    # Import when the db is missing or a source JSON was modified after it
+    db_mtime = os.path.getmtime(db_path) if os.path.exists(db_path) else None
+    for name in ("product_repo.json", "pricing_db.json"):
+        src = os.path.join(data_dir, name)
+        if db_mtime is None or (os.path.exists(src) and os.path.getmtime(src) > db_mtime):
+            import_json(data_dir, db_path)
+            return
+
+
+def _row_to_sku(row) -> Dict:
+    return {"sku_id": row[0], "product_name": row[1], "specs": json.loads(row[2])}
+
+
+class SqliteCatalog(Sequence):
+    """Lazy view of the products table (catalog order), for get_all()."""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+
+    def __len__(self) -> int:
+        return self.pool.connection().execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self[i] for i in range(*pos.indices(len(self)))]
+        if pos < 0:
+            pos += len(self)
+        row = self.pool.connection().execute(
+            "SELECT sku_id, product_name, specs FROM products WHERE pos = ?", (pos,)
+        ).fetchone()
+        if row is None:
+            raise IndexError(pos)
+        return _row_to_sku(row)
+
+    def __iter__(self) -> Iterator[Dict]:
+        cursor = self.pool.connection().execute("SELECT sku_id, product_name, specs FROM products ORDER BY pos")
+        for row in cursor:
+            yield _row_to_sku(row)
+
+
+class SqliteProductRepository(ProductRepository):
+    def __init__(self, data_dir: str = DATA_DIR, db_path: Optional[str] = None,
+                 fallback_limit: int = FALLBACK_LIMIT):
+        self.data_dir = data_dir
+        self.db_path = db_path or db_path_for(data_dir)
+        self.fallback_limit = fallback_limit
+        self._pool = None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._pool is None:
+            _ensure_db(self.data_dir, self.db_path)
+            self._pool = ConnectionPool.for_path(self.db_path)
+        return self._pool.connection()
+
+    def get_all(self) -> SqliteCatalog:
+        self._conn()
+        return SqliteCatalog(self._pool)
+
+    def _query(self, conn: sqlite3.Connection, keys, specs) -> List[tuple]:
+        where, params = [], []
+        for key in keys:
+            if key == SIZE_KEY:
+                req = specs[SIZE_KEY]
+                if not req.numeric:
+                    continue
+                delta = req.number * tolerance_for(SIZE_KEY)
+                # BETWEEN uses the index, ABS keeps the exact matcher predicate
+                where.append("size_mm2 BETWEEN ? AND ? AND ABS(size_mm2 - ?) <= ?")
+                params += [req.number - abs(delta), req.number + abs(delta), req.number, delta]
+            else:
+                where.append(f"{KEY_COLUMNS[key]} = ?")
+                params.append(bucket_key(specs[key]))
+        if not where:
+            return []
+        sql = f"SELECT pos, sku_id, product_name, specs FROM products WHERE {' AND '.join(where)}"
+        return conn.execute(sql, params).fetchall()
+
+    def _find(self, conn: sqlite3.Connection, specs: Dict) -> List[Dict]:
+        # Same relaxation ladder as the in-memory SpecIndex: rungs merged
+        # until there are MIN_CANDIDATES, returned in catalog order
+        specs = compile_specs(specs)
+        tried = set()
+        found: Dict[int, Any] = {}
+        for rung in RELAXATION_LADDER:
+            effective = tuple(k for k in rung if k in specs and specs[k].raw is not None)
+            if not effective or effective in tried:
+                continue
+            tried.add(effective)
+            for row in self._query(conn, effective, specs):
+                found[row[0]] = row[1:]
+            if len(found) >= MIN_CANDIDATES:
+                break
+        if found:
+            return [_row_to_sku(found[pos]) for pos in sorted(found)]
+
+        cursor = conn.execute(
+            "SELECT sku_id, product_name, specs FROM products ORDER BY pos LIMIT ?", (self.fallback_limit,)
+        )
+        return [_row_to_sku(row) for row in cursor]
+
+    def find_by_specs(self, specs: Dict) -> List[Dict]:
+        return self._find(self._conn(), specs)
+
+    def find_by_specs_many(self, specs_list: List[Dict]) -> List[List[Dict]]:
+        conn = self._conn()
+        return [self._find(conn, specs) for specs in specs_list]
+
+
+class SqlitePricingRepository(PricingRepository):
+    def __init__(self, data_dir: str = DATA_DIR, db_path: Optional[str] = None):
+        self.data_dir = data_dir
+        self.db_path = db_path or db_path_for(data_dir)
+        self._pool = None
+        self._tests = None
+        self._avg = None
+        self._resolver = None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._pool is None:
+            _ensure_db(self.data_dir, self.db_path)
+            self._pool = ConnectionPool.for_path(self.db_path)
+        return self._pool.connection()
+
+    def _load_small_tables(self):
+        # The tests table and average price are tiny; keep them in memory
+        if self._tests is not None:
+            return
+        conn = self._conn()
+        self._tests = {tid: json.loads(d) for tid, d in conn.execute("SELECT test_id, details FROM tests")}
+        row = conn.execute("SELECT value FROM meta WHERE key = 'avg_unit_price'").fetchone()
+        self._avg = json.loads(row[0]) if row else 0.0
+        self._resolver = ServiceNameResolver(self._tests)
+
+    def get_price_for_sku(self, sku_id: str) -> Dict[str, Any]:
+        return self.get_prices_bulk([sku_id])[sku_id]
+
+    def get_prices_bulk(self, sku_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        self._load_small_tables()
+        conn = self._conn()
+        unique = list(dict.fromkeys(sku_ids))
+        found = {}
+        for start in range(0, len(unique), IN_CHUNK):
+            chunk = unique[start:start + IN_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(conn.execute(f"SELECT sku_id, price FROM prices WHERE sku_id IN ({placeholders})", chunk))
+        return {
+            sku_id: {"price": found[sku_id], "is_estimate": False} if sku_id in found
+            else {"price": self._avg, "is_estimate": True}
+            for sku_id in unique
+        }
+
+    def get_test_cost(self, test_name: str) -> Dict[str, Any]:
+        self._load_small_tables()
+        tid = self._resolver.resolve(test_name)
+        if tid is None:
+            return {"cost": 0, "billing": "unknown"}
+        return self._tests[tid]
+
+    def get_test_costs_bulk(self, test_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        return {name: self.get_test_cost(name) for name in set(test_names)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the JSON catalog/pricing data into SQLite.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--db", default=None)
+    args = parser.parse_args()
+    path = import_json(args.data_dir, args.db)
+    count = sqlite3.connect(path).execute("SELECT COUNT(*) FROM products").fetchone()[0]
+    print(f"Imported {count} SKUs into {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
+import threading
 from langgraph.graph import StateGraph, END
 from src.state import AgentState
 from src.agents.sales import sales_agent
 from src.agents.main_agent import main_agent_start, main_agent_end
-from src.agents.technical import technical_agent
-from src.agents.pricing import pricing_agent
+from src.agents.line_items import fan_out_line_items, line_item_worker
+
+def route_after_sales(state: AgentState):
+    # Nothing to bid on (NO_RFP_FOUND / NO_QUALIFIED_RFP): end without a response
+    return END if state.get("error") else "main_agent_start"
 
 def create_graph():
     workflow = StateGraph(AgentState)
@@ -11,19 +15,34 @@ def create_graph():
     # Add Nodes
     workflow.add_node("sales_agent", sales_agent)
     workflow.add_node("main_agent_start", main_agent_start)
-    workflow.add_node("technical_agent", technical_agent)
-    workflow.add_node("pricing_agent", pricing_agent)
+    # Technical + Pricing run per chunk of line items (map), main_agent_end reduces
+    workflow.add_node("line_item_worker", line_item_worker)
     workflow.add_node("main_agent_end", main_agent_end)
     
     # Add Edges
     workflow.set_entry_point("sales_agent")
     
-    workflow.add_edge("sales_agent", "main_agent_start")
-    workflow.add_edge("main_agent_start", "technical_agent")
-    workflow.add_edge("technical_agent", "pricing_agent")
-    workflow.add_edge("pricing_agent", "main_agent_end")
+    workflow.add_conditional_edges("sales_agent", route_after_sales, ["main_agent_start", END])
+    workflow.add_conditional_edges("main_agent_start", fan_out_line_items, ["line_item_worker", "main_agent_end"])
+    workflow.add_edge("line_item_worker", "main_agent_end")
     workflow.add_edge("main_agent_end", END)
     
     return workflow.compile()
 
-app_graph = create_graph()
+# Compiled on first use (or by the warm-up hook), not at import time
+_app_graph = None
+_app_graph_lock = threading.Lock()
+
+def get_app_graph():
+    global _app_graph
+    if _app_graph is None:
+        with _app_graph_lock:
+            if _app_graph is None:
+                _app_graph = create_graph()
+    return _app_graph
+
+def __getattr__(name):
+    # `from src.graph import app_graph` still works, lazily
+    if name == "app_graph":
+        return get_app_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
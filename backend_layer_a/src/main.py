@@ -1,14 +1,22 @@
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
+import json
 import os
 
 load_dotenv() # Load variables from .env
 from pydantic import BaseModel
 import uuid
 import asyncio
+from typing import List, Optional
 from src.state import AgentState
-from src.graph import app_graph
-from src.tools.fetch import fetch_local_rfps, filter_rfps, scan_urls
+from src.runner import PipelineRunner, QueueFullError
+from src.data_layer.pipeline_store import PipelineStore
+from src.utils.logger import TERMINAL_STATUSES, event_bus, is_terminal
+from src.data_layer.rfp_registry import get_rfp_registry
+from src.tools.fetch import WINDOW_DAYS, deadline_window, fetch_open_rfps, rfp_filter
+from src.tools.url_scan import iter_scan
 
 app = FastAPI(title="Layer A: RFP Backend")
 
@@ -21,44 +29,118 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory store for demo
-pipelines = {}
+# Pipeline status/output records: bounded in memory, finished ones spill to disk
+pipelines = PipelineStore()
+
+# Graph runs happen on a bounded worker pool, never on the event loop
+runner = PipelineRunner(pipelines)
+
+# Compile the graph and load the catalog in the background right after start-up,
+# instead of on the first pipeline (or call /api/v1/warmup, e.g. as a readiness probe)
+WARMUP_ON_STARTUP = os.environ.get("WARMUP_ON_STARTUP", "0") == "1"
+
+_warmup_task = None
+
+async def _warmup_in_background():
+    try:
+        result = await runner.warmup()
+        print(f"Warm-up done: {result['seconds']}")
+    except Exception as e:
+        print(f"Warm-up failed: {e}")
+
+@app.on_event("startup")
+async def warmup_runner():
+    global _warmup_task
+    if WARMUP_ON_STARTUP:
+        _warmup_task = asyncio.create_task(_warmup_in_background())
+
+@app.on_event("shutdown")
+def shutdown_runner():
+    runner.shutdown()
+    pipelines.close()
+
+async def _get_record(pipeline_id: str) -> Optional[dict]:
+    # Memory hits answer inline; spilled records are read from SQLite off the loop
+    record = pipelines.peek(pipeline_id)
+    if record is None:
+        record = await run_in_threadpool(pipelines.get, pipeline_id)
+    return record
 
 class ScanRequest(BaseModel):
     urls: list = []
     demo: bool = True
+    # URL scan only: fetch pages concurrently and stream one NDJSON record per URL
+    stream: bool = False
+    # Local scan only: page through the deadline window, optionally filtered
+    cursor: Optional[str] = None
+    limit: Optional[int] = None
+    days: int = WINDOW_DAYS
+    issuer: Optional[str] = None
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    query: Optional[str] = None
 
 class TriggerRequest(BaseModel):
     rfp_id: str = None
     rfp_url: str = None
     rfp_url: str = None
 
+# RFPs accepted per /api/v1/trigger/batch request
+BATCH_MAX_RFPS = int(os.environ.get("BATCH_MAX_RFPS", "500"))
+
+class BatchTriggerRequest(BaseModel):
+    rfp_ids: List[str] = []
+    rfp_urls: List[str] = []
+
+async def _stream_scan(urls: list):
+    scan_id = str(uuid.uuid4())
+    async for record in iter_scan(urls, deadline_window()):
+        record["scan_id"] = scan_id
+        yield json.dumps(record, default=str) + "\n"
+
 @app.post("/api/v1/scan")
 async def scan_rfps(request: ScanRequest):
     """
     Trigger Sales Agent scan.
-    If URLs are provided, simulates web scanning.
+    If URLs are provided, the pages are fetched concurrently and scanned
+    for RFPs; with "stream": true each URL's result is streamed back as an
+    NDJSON line as soon as it is ready, then a summary line, otherwise the
+    detected RFPs come back in one response.
     Otherwise fetches local demo files.
     """
+    next_cursor = None
+    if request.urls and request.stream:
+        return StreamingResponse(_stream_scan(request.urls), media_type="application/x-ndjson")
     if request.urls:
-        # 1. Scan URLs
-        raw_rfps = scan_urls(request.urls)
-        # 2. Filter 90 days
-        rfps = filter_rfps(raw_rfps)
+        # Same scan as the stream, collected: RFPs due within the window
+        rfps = []
+        async for record in iter_scan(request.urls, deadline_window()):
+            if record["type"] == "rfp":
+                rfps.append(record["rfp"])
+            elif record["type"] == "summary":
+                summary = record
         source = "web_scan"
+        detected_count, total_scanned = summary["detected_count"], summary["total_scanned"]
     else:
-        # Default Demo Mode
-        raw_rfps = fetch_local_rfps(request.demo)
-        rfps = filter_rfps(raw_rfps)
+        # Default Demo Mode: one page of the RFP registry's deadline window.
+        # Off the loop too: the registry re-stats the RFP directory when due.
+        predicate = rfp_filter(request.issuer, request.min_value, request.max_value, request.query)
+        try:
+            page = await run_in_threadpool(fetch_open_rfps, request.days, request.cursor, request.limit, predicate)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        rfps, next_cursor = page.rfps, page.next_cursor
         source = "local_demo"
+        detected_count, total_scanned = page.total, get_rfp_registry().stats()["rfps"]
 
     scan_id = str(uuid.uuid4())
     return {
         "scan_id": scan_id,
         "source": source,
-        "detected_count": len(rfps),
-        "total_scanned": len(raw_rfps),
-        "rfps": rfps
+        "detected_count": detected_count,
+        "total_scanned": total_scanned,
+        "rfps": rfps,
+        "next_cursor": next_cursor
     }
 
 @app.post("/api/v1/trigger")
@@ -78,67 +160,146 @@ async def trigger_pipeline(request: TriggerRequest):
         "selection_reason": None 
     }
     
-    # Run the graph in background (thread pool) or await it if fast enough. 
-    # For this demo, we can just run it. LangGraph is sync or async. 
-    # `app_graph.invoke` is sync.
-    
-    # Store future result ?
-    # Better: Perform the run and store the result.
-    # To return immediately, we should use background tasks.
-    
-    # But wait, looking at requirements: "GET... returns pipeline status".
-    # So we should run async.
-    
-    pipelines[pipeline_id] = {"status": "RUNNING", "output": None}
-    
-    # Launch async task
-    asyncio.create_task(run_graph(pipeline_id, initial_state))
+    # Runs in the background on the runner's worker pool.
+    # Status goes QUEUED -> RUNNING -> COMPLETED / FAILED in `pipelines`.
+    try:
+        runner.submit(pipeline_id, initial_state)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     
     return {"pipeline_id": pipeline_id, "status": "STARTED"}
 
-async def run_graph(pipeline_id, initial_state):
+@app.post("/api/v1/trigger/batch")
+async def trigger_batch(request: BatchTriggerRequest):
+    """
+    Run many RFPs as one job: repositories loaded once, identical line-item
+    specs matched once across all of them. Every RFP gets its own
+    pipeline_id (same status / final endpoints as /api/v1/trigger);
+    GET /api/v1/trigger/batch/{batch_id} shows them all.
+    """
+    # Repeated IDs / URLs in one request run once
+    entries = [{"rfp_id": rfp_id} for rfp_id in dict.fromkeys(request.rfp_ids)]
+    entries += [{"rfp_url": rfp_url} for rfp_url in dict.fromkeys(request.rfp_urls)]
+    if not entries:
+        raise HTTPException(status_code=400, detail="Provide rfp_ids and/or rfp_urls")
+    if len(entries) > BATCH_MAX_RFPS:
+        raise HTTPException(status_code=400, detail=f"{len(entries)} RFPs in one batch (limit {BATCH_MAX_RFPS})")
+
+    batch_id = str(uuid.uuid4())
+    for entry in entries:
+        entry["pipeline_id"] = str(uuid.uuid4())
     try:
-        # We need to adapt the graph for the specific demo RFP if the user passed one?
-        # The Sales Agent scans ALL. 
-        # If we want to demo "Partial Match", we might simply delete the "Ideal Match" file?
-        # Or simpler: The Sales Agent Picks the *Earliest*.
-        # Ideal RFP deadline: 2026-03-15.
-        # Partial RFP deadline: 2026-02-20.
-        # So Partial (rfp_002) will ALWAYS be picked by current logic.
-        # This might be an issue if we want to show Ideal first.
-        # I should modify Sales Agent to respect `selected_rfp_id` if provided in initial state?
-        # Let's fix Sales Agent logic slightly to prefer an input ID if present.
-        
-        # But wait, I can't easily modify the running code again and again. 
-        # I'll just accept that for the demo, I might need to "Force" the selection via the `demo_mode` or similar.
-        # Actually, let's just use the `tools` logic.
-        
-        output = app_graph.invoke(initial_state)
-        pipelines[pipeline_id] = {"status": "COMPLETED", "output": output}
+        runner.submit_batch(batch_id, entries)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {"batch_id": batch_id, "status": "STARTED", "pipelines": [{**entry, "status": "QUEUED"} for entry in entries]}
+
+def _batch_pipelines(entries: list) -> list:
+    return [{**entry, "status": pipelines.get(entry["pipeline_id"], {"status": "NOT_FOUND"})["status"]}
+            for entry in entries]
+
+@app.get("/api/v1/trigger/batch/{batch_id}")
+async def get_batch_status(batch_id: str):
+    record = await _get_record(batch_id)
+    if not record or "batch" not in record:
+        return {"status": "NOT_FOUND"}
+    # Up to BATCH_MAX_RFPS lookups, some possibly on disk
+    batch_pipelines = await run_in_threadpool(_batch_pipelines, record["batch"])
+    response = {"batch_id": batch_id, "status": record["status"], "pipelines": batch_pipelines}
+    for key in ("stats", "error"):
+        if key in record:
+            response[key] = record[key]
+    return response
+
+@app.get("/api/v1/warmup")
+async def warmup():
+    try:
+        return await runner.warmup()
     except Exception as e:
-        print(f"Error running pipeline: {e}")
-        pipelines[pipeline_id] = {"status": "FAILED", "error": str(e)}
+        raise HTTPException(status_code=500, detail=f"Warm-up failed: {e}")
+
+@app.get("/api/v1/metrics")
+async def get_metrics():
+    return {"runner": runner.stats(), "pipeline_store": await run_in_threadpool(pipelines.stats)}
 
 @app.get("/api/v1/pipeline/{pipeline_id}")
 async def get_pipeline_status(pipeline_id: str):
-    return pipelines.get(pipeline_id, {"status": "NOT_FOUND"})
+    return await _get_record(pipeline_id) or {"status": "NOT_FOUND"}
 
 @app.get("/api/v1/pipeline/{pipeline_id}/final")
 async def get_pipeline_final(pipeline_id: str):
-    data = pipelines.get(pipeline_id)
+    data = await _get_record(pipeline_id)
     if not data or data["status"] != "COMPLETED":
         return {"error": "Not ready or failed"}
-    return data["output"].get("final_response")
+    output = data["output"]
+    if output.get("final_response") is None and output.get("error"):
+        # Ended early, e.g. no RFP qualified
+        return {"error": output["error"]}
+    return output.get("final_response")
+
+# Events per WebSocket frame, and how long to wait for a burst to fill one
+WS_BATCH_MAX = int(os.environ.get("WS_BATCH_MAX", "100"))
+WS_BATCH_WINDOW = float(os.environ.get("WS_BATCH_WINDOW", "0.05"))
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    # Clients don't send anything; reading is how a disconnect is noticed while no events flow
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    except Exception:
+        pass
 
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, pipeline_id: Optional[str] = None, policy: str = "drop_oldest"):
+    """
+    Live agent events. With ?pipeline_id= the client gets that pipeline's
+    buffered events first, then new ones until it completes or fails;
+    without it, events of every pipeline. Frames: {"events": [...], "dropped": n}.
+    Unknown (or expired) pipeline ids are rejected.
+    """
     await websocket.accept()
-    # Mock stream: Just keep connection open. 
-    # Real integration would subscribe to the event_bus.
-    # For the demo script, we probably won't use the websocket, but it's part of the spec.
+    # Before subscribing: a subscription would create a channel that never gets events
+    if pipeline_id and not event_bus.has_events(pipeline_id) and await _get_record(pipeline_id) is None:
+        await websocket.close(code=1008, reason=f"Unknown pipeline '{pipeline_id}'")
+        return
+    try:
+        subscription = event_bus.subscribe(pipeline_id, policy=policy)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+
+    disconnected = asyncio.create_task(_wait_for_disconnect(websocket))
     try:
+        # Finished before we subscribed and its events are no longer buffered
+        if pipeline_id and not event_bus.has_events(pipeline_id):
+            record = await _get_record(pipeline_id)
+            if record and record["status"] in TERMINAL_STATUSES:
+                await websocket.send_json({"events": [{
+                    "type": "PIPELINE_STATUS",
+                    "pipeline_id": pipeline_id,
+                    "payload": {"pipeline_id": pipeline_id, "status": record["status"]},
+                }], "dropped": 0})
+                return
+
         while True:
-            # Echo or heartbeat
-            await websocket.receive_text()
-    except:
+            next_batch = asyncio.ensure_future(subscription.next_batch(WS_BATCH_MAX, WS_BATCH_WINDOW))
+            await asyncio.wait({next_batch, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_batch.done():
+                next_batch.cancel()
+                break  # client went away while no events were flowing
+            events = next_batch.result()
+            if not events:
+                break  # subscription closed (slow consumer with the "disconnect" policy)
+            await websocket.send_json({"events": events, "dropped": subscription.dropped})
+            if pipeline_id and any(is_terminal(e) for e in events):
+                break
+    except WebSocketDisconnect:
         pass
+    finally:
+        disconnected.cancel()
+        subscription.close()
+        try:
+            await websocket.close()
+        except Exception:
+            pass
@@ -0,0 +1,288 @@
+"""
+Pipeline runner.
+
+Graph runs are blocking (regex parsing, matching, pricing, the HTTP fetch in
+ingest), so they are dispatched to a worker pool instead of running on the
+event loop. At most PIPELINE_WORKERS pipelines run at once; up to
+PIPELINE_QUEUE_LIMIT more wait for a worker, and further submissions are
+rejected with QueueFullError. A batch of RFPs (submit_batch) is one job:
+it takes one worker and one queue place.
+
+With the process executor, agent events emitted in a worker are sent back
+over a multiprocessing queue and published on this process's event bus, so
+/ws subscribers see them as with threads. A run's status only changes to
+COMPLETED/FAILED once its events have arrived (or after
+PIPELINE_EVENT_DRAIN_TIMEOUT if the worker died).
+
+Configuration (env):
+    PIPELINE_EXECUTOR              thread (default) | process
+    PIPELINE_WORKERS               pipelines running at once (default 4)
+    PIPELINE_QUEUE_LIMIT           pipelines allowed to wait for a worker (default 200)
+    PIPELINE_EVENT_DRAIN_TIMEOUT   seconds to wait for a process worker's events (default 5)
+
+The graph and the agents' dependencies are imported on the first run, so
+the API starts fast; warmup() (the /api/v1/warmup hook) does it ahead of
+the first pipeline.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, MutableMapping, Optional
+from src.utils.logger import emit_event, event_bus, pipeline_context
+
+EXECUTORS = ("thread", "process")
+EVENT_DRAIN_TIMEOUT = float(os.environ.get("PIPELINE_EVENT_DRAIN_TIMEOUT", "5"))
+
+# In a process worker: the queue its events go back to the parent on
+_worker_events = None
+
+
+class QueueFullError(Exception):
+    pass
+
+
+def invoke_graph(initial_state: Dict) -> Dict:
+    # Module-level so process workers can pickle it; each worker compiles the graph once
+    from src.graph import get_app_graph
+    app_graph = get_app_graph()
+    # Agent events without a pipeline_id are attributed to this pipeline
+    with pipeline_context(initial_state["pipeline_id"]):
+        return app_graph.invoke(initial_state)
+
+
+def invoke_batch(batch_id: str, entries: List[Dict]) -> Dict:
+    # Module-level for the same reason as invoke_graph
+    from src.agents.batch import run_batch
+    return run_batch(batch_id, entries)
+
+
+def _init_worker(events):
+    # ProcessPoolExecutor initializer
+    global _worker_events
+    _worker_events = events
+    event_bus.forward_to(events)
+
+
+def _call_in_worker(marker: str, fn, *args):
+    try:
+        return fn(*args)
+    finally:
+        # After the run's last event on the same queue: tells the parent they've all arrived
+        _worker_events.put((None, marker))
+
+
+def warmup() -> Dict[str, float]:
+    """
+    Pay the first pipeline's start-up costs now: import the agents
+    (langgraph, langchain, numpy), compile the graph and load the catalog.
+    Returns seconds per step (near zero once warm).
+    """
+    timings = {}
+    start = time.perf_counter()
+    from src.graph import get_app_graph
+    get_app_graph()
+    timings["graph"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    from src.data_layer.registry import get_repositories
+    get_repositories()
+    timings["repositories"] = time.perf_counter() - start
+    return timings
+
+
+class PipelineRunner:
+    def __init__(self, store: MutableMapping[str, Dict], executor: Optional[str] = None,
+                 max_workers: Optional[int] = None, queue_limit: Optional[int] = None):
+        self.store = store
+        self.executor_kind = executor or os.environ.get("PIPELINE_EXECUTOR", "thread")
+        if self.executor_kind not in EXECUTORS:
+            raise ValueError(f"Unknown PIPELINE_EXECUTOR '{self.executor_kind}'. Options: {', '.join(EXECUTORS)}")
+        self.max_workers = max_workers or int(os.environ.get("PIPELINE_WORKERS", "4"))
+        self.queue_limit = queue_limit if queue_limit is not None else int(os.environ.get("PIPELINE_QUEUE_LIMIT", "200"))
+
+        self._executor: Optional[Executor] = None
+        # Process executor only: worker events, the task relaying them, runs waiting on their events
+        self._events = None
+        self._drainer: Optional[asyncio.Task] = None
+        self._markers: Dict[str, asyncio.Future] = {}
+        # Created on first submit, inside the running event loop
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks = set()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.warm = False
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._events = multiprocessing.Queue()
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                                     initargs=(self._events,))
+                self._drainer = asyncio.get_running_loop().create_task(self._drain_events())
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline")
+        return self._executor
+
+    async def _drain_events(self):
+        loop = asyncio.get_running_loop()
+        events = self._events
+        while True:
+            event, level = await loop.run_in_executor(None, events.get)
+            if event is not None:
+                event_bus.relay(event, level)
+                continue
+            if level is None:
+                # shutdown()
+                return
+            waiter = self._markers.pop(level, None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
+
+    async def _call(self, fn, *args):
+        """Run fn(*args) on the pool; with processes, also wait for the run's events."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        if self.executor_kind != "process":
+            return await loop.run_in_executor(executor, fn, *args)
+        marker = uuid.uuid4().hex
+        waiter = self._markers[marker] = loop.create_future()
+        try:
+            return await loop.run_in_executor(executor, _call_in_worker, marker, fn, *args)
+        finally:
+            await asyncio.wait({waiter}, timeout=EVENT_DRAIN_TIMEOUT)
+            self._markers.pop(marker, None)
+
+    def _set(self, pipeline_id: str, record: Dict):
+        self.store[pipeline_id] = record
+        payload = {"pipeline_id": pipeline_id, "status": record["status"]}
+        if "error" in record:
+            payload["error"] = record["error"]
+        emit_event("PIPELINE_STATUS", payload)
+
+    def submit(self, pipeline_id: str, initial_state: Dict) -> asyncio.Task:
+        """Queue a graph run. Must be called from the event loop."""
+        if self.queued >= self.queue_limit:
+            raise QueueFullError(f"{self.queued} pipelines already waiting (limit {self.queue_limit})")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        self.queued += 1
+        self._set(pipeline_id, {"status": "QUEUED", "output": None})
+        task = asyncio.create_task(self._run(pipeline_id, initial_state))
+        # Keep a reference so the task isn't garbage collected mid-run
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, pipeline_id: str, initial_state: Dict):
+        try:
+            async with self._slots:
+                self.queued -= 1
+                self.running += 1
+                self._set(pipeline_id, {"status": "RUNNING", "output": None})
+                try:
+                    output = await self._call(invoke_graph, initial_state)
+                    self._set(pipeline_id, {"status": "COMPLETED", "output": output})
+                    self.completed += 1
+                finally:
+                    self.running -= 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error running pipeline: {e}")
+            self._set(pipeline_id, {"status": "FAILED", "error": str(e)})
+            self.failed += 1
+
+    def submit_batch(self, batch_id: str, entries: List[Dict]) -> asyncio.Task:
+        """
+        Queue a batch run (see src.agents.batch): one job on one worker slot.
+        Each entry {"pipeline_id", "rfp_id" or "rfp_url"} gets its own
+        pipeline record; the batch record under batch_id lists them.
+        Must be called from the event loop.
+        """
+        if self.queued >= self.queue_limit:
+            raise QueueFullError(f"{self.queued} pipelines already waiting (limit {self.queue_limit})")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        self.queued += 1
+        for entry in entries:
+            self._set(entry["pipeline_id"], {"status": "QUEUED", "output": None})
+        self._set(batch_id, {"status": "QUEUED", "batch": entries})
+        task = asyncio.create_task(self._run_batch(batch_id, entries))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run_batch(self, batch_id: str, entries: List[Dict]):
+        try:
+            async with self._slots:
+                self.queued -= 1
+                self.running += 1
+                for entry in entries:
+                    self._set(entry["pipeline_id"], {"status": "RUNNING", "output": None})
+                self._set(batch_id, {"status": "RUNNING", "batch": entries})
+                try:
+                    result = await self._call(invoke_batch, batch_id, entries)
+                finally:
+                    self.running -= 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error running batch: {e}")
+            for entry in entries:
+                self._set(entry["pipeline_id"], {"status": "FAILED", "error": str(e)})
+            self.failed += len(entries)
+            self._set(batch_id, {"status": "FAILED", "batch": entries, "error": str(e)})
+            return
+
+        for entry in entries:
+            record = result["results"][entry["pipeline_id"]]
+            self._set(entry["pipeline_id"], record)
+            if record["status"] == "COMPLETED":
+                self.completed += 1
+            else:
+                self.failed += 1
+        self._set(batch_id, {"status": "COMPLETED", "batch": entries, "stats": result["stats"]})
+
+    async def warmup(self) -> Dict[str, Any]:
+        """Run warmup() where pipelines run: here for threads, in each worker for processes."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        if self.executor_kind == "process":
+            # Best effort: one call per worker slot, the pool decides which process takes it
+            results = await asyncio.gather(*[loop.run_in_executor(executor, warmup) for _ in range(self.max_workers)])
+            timings = {step: max(r[step] for r in results) for step in results[0]}
+        else:
+            timings = await loop.run_in_executor(executor, warmup)
+        self.warm = True
+        return {"warm": True, "executor": self.executor_kind, "seconds": timings}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "executor": self.executor_kind,
+            "workers": self.max_workers,
+            "running": self.running,
+            "queued": self.queued,
+            "queue_limit": self.queue_limit,
+            "completed": self.completed,
+            "failed": self.failed,
+            "warm": self.warm,
+        }
+
+    def shutdown(self, wait: bool = False):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+        if self._events is not None:
+            # Unblocks the drainer's get()
+            self._events.put((None, None))
+            self._events = None
+            self._drainer = None
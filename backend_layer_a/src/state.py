@@ -1,4 +1,5 @@
-from typing import TypedDict, List, Dict, Any, Optional
+import operator
+from typing import Annotated, TypedDict, List, Dict, Any, Optional
 
 class AgentState(TypedDict):
     # Pipeline metadata
@@ -18,8 +19,12 @@ class AgentState(TypedDict):
     tech_summary: List[Dict] # List of line items with specs
     pricing_summary: List[Dict] # List of items with test reqs
     
+    # Per-chunk results from the line item workers (map step), concatenated
+    line_item_results: Annotated[List[Dict], operator.add]
+    
     # Technical Agent Outputs
     technical_response: List[Dict] # "The final table" with recommendations
+    catalog_version: Optional[str] # Version of the product/pricing data used
     
     # Pricing Agent Outputs
     pricing_response: List[Dict] # Consolidated price table
@@ -1,21 +1,52 @@
-import json
 import os
-from datetime import datetime, timedelta
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+from src.data_layer.rfp_registry import RfpPage, get_rfp_registry, parse_deadline, utc_now
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "../../data")
+WINDOW_DAYS = 90
 
 def fetch_local_rfps(demo_mode: bool = True):
     """
-    Reads local JSON files for demo purposes.
+    All RFPs from the local RFP directory (see rfp_registry: files are
+    only re-read when they change).
     """
-    rfps = []
-    files = ["ideal_match_rfp.json", "partial_match_rfp.json"]
-    for f in files:
-        path = os.path.join(DATA_DIR, f)
-        if os.path.exists(path):
-            with open(path, "r") as json_file:
-                rfps.extend(json.load(json_file))
-    return rfps
+    return get_rfp_registry().all()
+
+def rfp_filter(issuer: Optional[str] = None, min_value: Optional[float] = None,
+               max_value: Optional[float] = None, query: Optional[str] = None) -> Optional[Callable[[Dict], bool]]:
+    """Predicate for the scan filters, or None when no filter is set."""
+    if issuer is None and min_value is None and max_value is None and not query:
+        return None
+    issuer = issuer.lower() if issuer else None
+    query = query.lower() if query else None
+
+    def matches(rfp: Dict) -> bool:
+        if issuer and issuer not in str(rfp.get("issuer", "")).lower():
+            return False
+        value = rfp.get("estimated_value")
+        if min_value is not None and (value is None or value < min_value):
+            return False
+        if max_value is not None and (value is None or value > max_value):
+            return False
+        if query and query not in f"{rfp.get('title', '')} {rfp.get('scope_excerpt', '')}".lower():
+            return False
+        return True
+    return matches
+
+def deadline_window(days: int = WINDOW_DAYS):
+    """(now, now + days) in naive UTC, like the registry's deadlines: the ones we can still bid on."""
+    today = utc_now()
+    return today, today + timedelta(days=days)
+
+def fetch_open_rfps(days: int = WINDOW_DAYS, cursor: Optional[str] = None, limit: Optional[int] = None,
+                    predicate: Optional[Callable[[Dict], bool]] = None) -> RfpPage:
+    """
+    Local RFPs due within `days` from now, earliest deadline first, one
+    page at a time (same window as filter_rfps, served from the deadline index).
+    """
+    start, end = deadline_window(days)
+    return get_rfp_registry().window(start, end, cursor, limit, predicate)
 
 def filter_rfps(rfps: list):
     """
@@ -30,49 +61,13 @@ def filter_rfps(rfps: list):
     # Wait, Dec 2025 to Feb 2026 is ~60-70 days. It should pass.
     
     valid_rfps = []
-    today = datetime.now()
+    today = utc_now()
     cutoff = today + timedelta(days=90)
     
     for rfp in rfps:
-        try:
-            deadline = datetime.fromisoformat(rfp["submission_deadline"].replace("Z", ""))
-            if today <= deadline <= cutoff:
-                valid_rfps.append(rfp)
-        except ValueError:
-            pass # Invalid date format
+        # Same rule as the registry's index (naive UTC); None for an invalid date format
+        deadline = parse_deadline(rfp.get("submission_deadline"))
+        if deadline is not None and today <= deadline <= cutoff:
+            valid_rfps.append(rfp)
             
     return valid_rfps
-
-def scan_urls(urls: list[str]) -> list[dict]:
-    """
-    Simulates scanning a list of URLs.
-    Generates mock RFP objects with deadlines.
-    Some will be within 90 days, some outside.
-    """
-    scanned_rfps = []
-    today = datetime.now()
-    
-    import random
-    
-    for i, url in enumerate(urls):
-        # Generate a random deadline relative to today
-        # Chance to be valid (10-80 days) or invalid (100-200 days)
-        is_valid_date = random.choice([True, True, False]) # 66% chance valid
-        
-        days_offset = random.randint(10, 85) if is_valid_date else random.randint(95, 200)
-        deadline = today + timedelta(days=days_offset)
-        
-        # Create a mock RFP
-        rfp = {
-            "id": f"scan_{i}_{int(today.timestamp())}",
-            "title": f"RFP Detected from {url[:30]}...",
-            "issuer": "Online Source",
-            "submission_deadline": deadline.isoformat(),
-            "scope_excerpt": f"This is an RFP extracted from {url}. It requires high voltage cabling and switchgear...",
-            "estimated_value": random.randint(50000, 500000),
-            "source_url": url,
-            "status": "detected"
-        }
-        scanned_rfps.append(rfp)
-        
-    return scanned_rfps
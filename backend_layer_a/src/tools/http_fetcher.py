@@ -0,0 +1,271 @@
+"""
+Pooled async HTTP fetcher with an on-disk conditional-GET cache.
+
+One httpx.AsyncClient (keep-alive connection pool) runs on a dedicated
+event loop thread, so pipelines on worker threads and coroutines on the
+API loop share the same connections. Per-host semaphores cap concurrent
+requests to any one portal. Bodies are streamed with a size cap.
+
+Responses carrying an ETag or Last-Modified are cached on disk, keyed by
+URL. Repeat fetches send If-None-Match / If-Modified-Since, and a 304
+serves the cached body. The cache directory can be shared by workers.
+
+Configuration (env):
+    HTTP_CACHE_DIR         cache directory (default data/http_cache, empty disables)
+    HTTP_CACHE_MAX_BYTES   cache size before the oldest entries are evicted (default 512 MiB)
+    HTTP_MAX_BYTES         largest body accepted (default 50 MiB)
+    HTTP_PER_HOST          concurrent requests per host (default 4)
+    HTTP_MAX_CONNECTIONS   pool size (default 64)
+    HTTP_TIMEOUT           seconds per request (default 10)
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../../data")
+
+HTTP_CACHE_DIR = os.environ.get("HTTP_CACHE_DIR", os.path.join(DATA_DIR, "http_cache"))
+HTTP_CACHE_MAX_BYTES = int(os.environ.get("HTTP_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+HTTP_MAX_BYTES = int(os.environ.get("HTTP_MAX_BYTES", str(50 * 1024 * 1024)))
+HTTP_PER_HOST = int(os.environ.get("HTTP_PER_HOST", "4"))
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "64"))
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "10"))
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+class FetchError(Exception):
+    pass
+
+
+class FetchTooLarge(FetchError):
+    pass
+
+
+class FetchResult(NamedTuple):
+    url: str
+    status: int
+    content: bytes
+    content_type: str
+    from_cache: bool  # body served from disk (after a 304)
+
+    @property
+    def text(self) -> str:
+        charset = "utf-8"
+        for part in self.content_type.split(";")[1:]:
+            key, _, value = part.strip().partition("=")
+            if key.lower() == "charset" and value:
+                charset = value.strip('"')
+        try:
+            return self.content.decode(charset, errors="replace")
+        except LookupError:
+            return self.content.decode("utf-8", errors="replace")
+
+
+class DiskCache:
+    """<sha256(url)>.json (validators, content type) + <sha256(url)>.body, written atomically."""
+
+    def __init__(self, directory: str, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".body"
+
+    def get(self, url: str) -> Optional[Dict]:
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return meta if meta.get("url") == url else None
+
+    def body(self, url: str) -> Optional[bytes]:
+        _, body_path = self._paths(url)
+        try:
+            with open(body_path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, url: str, meta: Dict, content: bytes):
+        meta_path, body_path = self._paths(url)
+        suffix = f".tmp.{os.getpid()}.{threading.get_ident()}"
+        # Body first: a reader that sees the new metadata always finds its body
+        with open(body_path + suffix, "wb") as f:
+            f.write(content)
+        os.replace(body_path + suffix, body_path)
+        with open(meta_path + suffix, "w") as f:
+            json.dump({**meta, "url": url, "size": len(content), "stored_at": time.time()}, f)
+        os.replace(meta_path + suffix, meta_path)
+        self._evict()
+
+    def touch(self, url: str):
+        meta_path, _ = self._paths(url)
+        try:
+            os.utime(meta_path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".body"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path[:-5] + ".json")
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, path, size))
+            total += size
+        if total <= self.max_bytes:
+            return
+        # Least recently fetched/revalidated first
+        for _, path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for p in (path[:-5] + ".json", path):
+                try:
+                    os.remove(p)
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+
+class AsyncFetcher:
+    def __init__(self, cache_dir: Optional[str] = HTTP_CACHE_DIR, per_host: int = HTTP_PER_HOST,
+                 max_bytes: int = HTTP_MAX_BYTES, timeout: float = HTTP_TIMEOUT,
+                 max_connections: int = HTTP_MAX_CONNECTIONS):
+        self.cache = DiskCache(cache_dir) if cache_dir else None
+        self.per_host = per_host
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self.counters = {"requests": 0, "not_modified": 0, "downloaded_bytes": 0}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={"User-Agent": USER_AGENT},
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections // 2),
+                follow_redirects=True,
+            )
+        return self._client
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._hosts[host]
+
+    async def fetch(self, url: str) -> FetchResult:
+        cached = self.cache.get(url) if self.cache else None
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        async with self._host_slot(url):
+            self.counters["requests"] += 1
+            async with self._get_client().stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and cached:
+                    content = self.cache.body(url)
+                    if content is not None:
+                        self.counters["not_modified"] += 1
+                        self.cache.touch(url)
+                        return FetchResult(url, 200, content, cached.get("content_type", ""), True)
+                    # Body went missing; fall through and refetch without validators
+                    return await self._refetch(url)
+                response.raise_for_status()
+                content = await self._read_capped(response)
+
+        content_type = response.headers.get("Content-Type", "")
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        if self.cache and (etag or last_modified):
+            self.cache.put(url, {"etag": etag, "last_modified": last_modified, "content_type": content_type}, content)
+        return FetchResult(url, response.status_code, content, content_type, False)
+
+    async def _refetch(self, url: str) -> FetchResult:
+        async with self._get_client().stream("GET", url) as response:
+            response.raise_for_status()
+            content = await self._read_capped(response)
+        return FetchResult(url, response.status_code, content, response.headers.get("Content-Type", ""), False)
+
+    async def _read_capped(self, response: httpx.Response) -> bytes:
+        declared = response.headers.get("Content-Length")
+        if declared and declared.isdigit() and int(declared) > self.max_bytes:
+            raise FetchTooLarge(f"{response.url}: {declared} bytes exceeds limit of {self.max_bytes}")
+        chunks: List[bytes] = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > self.max_bytes:
+                raise FetchTooLarge(f"{response.url}: body exceeds limit of {self.max_bytes} bytes")
+            chunks.append(chunk)
+        self.counters["downloaded_bytes"] += size
+        return b"".join(chunks)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class _FetcherLoop:
+    """Runs one AsyncFetcher on a background event loop thread."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.fetcher = AsyncFetcher()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="http-fetcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, url: str):
+        return asyncio.run_coroutine_threadsafe(self.fetcher.fetch(url), self.loop)
+
+
+_shared: Optional[_FetcherLoop] = None
+_shared_lock = threading.Lock()
+
+
+def _get_shared() -> _FetcherLoop:
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = _FetcherLoop()
+    return _shared
+
+
+def fetch_url(url: str, timeout: Optional[float] = None) -> FetchResult:
+    """Blocking fetch through the shared pool, for worker threads."""
+    return _get_shared().submit(url).result(timeout)
+
+
+async def fetch_url_async(url: str) -> FetchResult:
+    """Fetch through the shared pool from any event loop."""
+    return await asyncio.wrap_future(_get_shared().submit(url))
+
+
+def fetcher_stats() -> Dict[str, int]:
+    return dict(_shared.fetcher.counters) if _shared else {}
@@ -0,0 +1,246 @@
+"""
+LLM extraction of the RFP structure, chunked for long documents.
+
+Documents up to LLM_CHUNK_CHARS go to the model in one call. Longer ones
+are split on section and line-item boundaries into overlapping chunks,
+extracted concurrently (chain.abatch, max LLM_MAX_CONCURRENCY in flight,
+all calls sharing one rate limiter) and merged: header fields come from
+the first chunk that has them, scope_items are de-duplicated by item_id
+and raw text. Nothing is truncated.
+
+The model is pluggable. EXTRACTION_LLM selects:
+    gemini              ChatGoogleGenerativeAI, needs GEMINI_API_KEY (default)
+    stub                offline stand-in built on the local lexer (see stub_llm)
+    package.mod:factory any callable returning a LangChain chat model
+
+Configuration (env):
+    EXTRACTION_LLM            see above (default gemini)
+    LLM_CHUNK_CHARS           max characters per chunk (default 30000)
+    LLM_CHUNK_OVERLAP         trailing characters repeated at the start of the next chunk (default 2000)
+    LLM_MAX_CONCURRENCY       chunk extractions in flight (default 4)
+    LLM_REQUESTS_PER_SECOND   rate limit shared by all extraction calls (default 2)
+    LLM_RETRIES               attempts per chunk (default 2)
+"""
+import asyncio
+import importlib
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.tools.rfp_lexer import ITEM_MARKER
+
+GEMINI_MODEL = "gemini-2.0-flash"
+
+EXTRACTION_LLM = os.environ.get("EXTRACTION_LLM", "gemini")
+LLM_CHUNK_CHARS = int(os.environ.get("LLM_CHUNK_CHARS", "30000"))
+LLM_CHUNK_OVERLAP = int(os.environ.get("LLM_CHUNK_OVERLAP", "2000"))
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "4"))
+LLM_REQUESTS_PER_SECOND = float(os.environ.get("LLM_REQUESTS_PER_SECOND", "2"))
+LLM_RETRIES = int(os.environ.get("LLM_RETRIES", "2"))
+
+# "Section 4", "Annexure B", "4.2 Technical Requirements", "SCOPE OF SUPPLY"
+SECTION_HEADING = re.compile(
+    r"^\s*(?:(?i:section|part|annex(?:ure)?|schedule|appendix)\b"
+    r"|\d+(?:\.\d+)*\.?\s+[A-Z]"
+    r"|[A-Z][A-Z0-9 &/,()-]{3,}$)"
+)
+
+EXTRACTION_PROMPT = """
+            You are an expert RFP Analyst. Extract the "Scope of Supply" or "Bill of Materials" from the following text into a structured JSON format.
+
+            The JSON structure must be:
+            {{
+                "id": "extracted_rfp_id",
+                "title": "Title of the RFP (inferred)",
+                "issuer": "Issuer Name (inferred)",
+                "submission_deadline": "YYYY-MM-DDTHH:MM:SSZ",
+                "scope_items": [
+                    {{
+                        "item_id": "1",
+                        "raw_text": "Original text line",
+                        "product_name": "Short descriptive name",
+                        "quantity": 1000,
+                        "specs": {{
+                            "voltage": "e.g. 11kV",
+                            "conductor_size_mm2": 123,
+                            "cores": 3,
+                            "insulation": "XLPE",
+                            "conductor_material": "Copper/Aluminum"
+                        }},
+                        "tests_required": ["Test 1", "Test 2"]
+                    }}
+                ]
+            }}
+
+            If specific specs are missing, omit them from the "specs" dictionary.
+            If the text contains no clear items, return an empty "scope_items" list.
+
+            RFP TEXT CONTENT:
+            {text}
+            """
+
+
+def extraction_model_name(api_key: Optional[str] = None) -> Optional[str]:
+    """Name of the configured model (part of the parse cache key), or None when no LLM is usable."""
+    if EXTRACTION_LLM == "gemini":
+        return GEMINI_MODEL if api_key else None
+    return EXTRACTION_LLM
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    # One bucket per process, so concurrent pipelines share the provider quota
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                from langchain_core.rate_limiters import InMemoryRateLimiter
+                _rate_limiter = InMemoryRateLimiter(
+                    requests_per_second=LLM_REQUESTS_PER_SECOND,
+                    check_every_n_seconds=0.05,
+                    max_bucket_size=max(1, LLM_MAX_CONCURRENCY),
+                )
+    return _rate_limiter
+
+
+def get_extraction_llm(api_key: Optional[str] = None):
+    """A fresh chat model for EXTRACTION_LLM. Raises if none is usable."""
+    if EXTRACTION_LLM == "gemini":
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY is required for EXTRACTION_LLM=gemini")
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        # Flash for speed/cost
+        return ChatGoogleGenerativeAI(model=GEMINI_MODEL, google_api_key=api_key, temperature=0,
+                                      rate_limiter=get_rate_limiter())
+    if EXTRACTION_LLM == "stub":
+        from src.tools.stub_llm import StubExtractionLLM
+        return StubExtractionLLM(rate_limiter=get_rate_limiter())
+    module_name, _, attr = EXTRACTION_LLM.partition(":")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+def _blocks(text: str) -> Iterator[str]:
+    # Each block starts at a section heading or a line item marker
+    block: List[str] = []
+    for line in text.splitlines(keepends=True):
+        if block and (SECTION_HEADING.match(line) or ITEM_MARKER.search(line)):
+            yield "".join(block)
+            block = []
+        block.append(line)
+    if block:
+        yield "".join(block)
+
+
+def _split_long(block: str, max_chars: int) -> Iterator[str]:
+    # A block bigger than a chunk is cut at line boundaries (or mid-line as a last resort)
+    part: List[str] = []
+    size = 0
+    for line in block.splitlines(keepends=True):
+        while len(line) > max_chars:
+            if part:
+                yield "".join(part)
+                part, size = [], 0
+            yield line[:max_chars]
+            line = line[max_chars:]
+        if part and size + len(line) > max_chars:
+            yield "".join(part)
+            part, size = [], 0
+        part.append(line)
+        size += len(line)
+    if part:
+        yield "".join(part)
+
+
+def split_into_chunks(text: str, max_chars: int = LLM_CHUNK_CHARS,
+                      overlap: int = LLM_CHUNK_OVERLAP) -> List[str]:
+    """
+    Chunks of at most max_chars, cut between sections / line items. Each
+    chunk starts with the trailing blocks (up to `overlap` characters) of
+    the previous one, so a heading or item near a cut is seen with context.
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for block in _blocks(text):
+        for piece in ([block] if len(block) <= max_chars else _split_long(block, max_chars)):
+            if current and size + len(piece) > max_chars:
+                chunks.append("".join(current))
+                carry: List[str] = []
+                carried = 0
+                for prev in reversed(current):
+                    if carried + len(prev) > overlap:
+                        break
+                    carry.insert(0, prev)
+                    carried += len(prev)
+                if carried + len(piece) > max_chars:
+                    carry, carried = [], 0
+                current, size = carry, carried
+            current.append(piece)
+            size += len(piece)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def _item_key(item: Dict) -> Tuple[str, str]:
+    return str(item.get("item_id", "")).strip(), " ".join(str(item.get("raw_text", "")).split()).lower()
+
+
+def merge_extractions(results: List[Dict]) -> Dict:
+    """Header fields from the first chunk that has them; scope_items in order without overlap duplicates."""
+    merged: Dict = {}
+    for result in results:
+        for key, value in result.items():
+            if key != "scope_items" and value and key not in merged:
+                merged[key] = value
+
+    # An item repeated because of the overlap shows up once per chunk; keep as many
+    # copies as any single chunk has, so genuinely repeated lines survive.
+    items: List[Dict] = []
+    kept: Counter = Counter()
+    for result in results:
+        seen: Counter = Counter()
+        for item in result.get("scope_items") or []:
+            key = _item_key(item)
+            seen[key] += 1
+            if seen[key] > kept[key]:
+                kept[key] += 1
+                items.append(item)
+    merged["scope_items"] = items
+    return merged
+
+
+def build_chain(llm):
+    from langchain_core.prompts import PromptTemplate
+    from langchain_core.output_parsers import JsonOutputParser
+
+    prompt = PromptTemplate(template=EXTRACTION_PROMPT, input_variables=["text"])
+    return (prompt | llm | JsonOutputParser()).with_retry(stop_after_attempt=max(1, LLM_RETRIES))
+
+
+def extract_with_llm(raw_content: str, llm, max_chars: int = LLM_CHUNK_CHARS,
+                     overlap: int = LLM_CHUNK_OVERLAP, max_concurrency: int = LLM_MAX_CONCURRENCY) -> Dict:
+    chain = build_chain(llm)
+    chunks = split_into_chunks(raw_content, max_chars, overlap)
+    if len(chunks) == 1:
+        return chain.invoke({"text": chunks[0]})
+
+    print(f"[Ingest] Extracting {len(chunks)} chunks ({max_concurrency} concurrent)...")
+    inputs = [{"text": chunk} for chunk in chunks]
+    config = {"max_concurrency": max_concurrency}
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        results = asyncio.run(chain.abatch(inputs, config=config))
+    else:
+        # Already on an event loop thread: the threaded batch keeps the same concurrency cap
+        results = chain.batch(inputs, config=config)
+    return merge_extractions(results)
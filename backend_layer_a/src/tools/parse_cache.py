@@ -0,0 +1,156 @@
+"""
+Content-addressed cache for parsed RFP structures.
+
+Parses are keyed by SHA-256 of (parser version, model name, normalized
+raw text), so the same document parsed by the same parser is never sent
+to the LLM twice, whichever URL or worker it came from. A URL alias table
+maps a source URL to the key of its last parse; within PARSE_CACHE_URL_TTL
+a hit on the alias skips the network fetch too.
+
+Entries live in a local SQLite file (safe to share between worker
+processes) as zlib-compressed JSON. The least recently used entries are
+evicted beyond PARSE_CACHE_MAX_BYTES.
+
+Configuration (env):
+    PARSE_CACHE_PATH        SQLite file (default data/parse_cache.db, empty disables)
+    PARSE_CACHE_MAX_BYTES   compressed size budget (default 64 MiB)
+    PARSE_CACHE_URL_TTL     seconds a URL alias is trusted without refetching (default 3600)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../../data")
+
+PARSE_CACHE_PATH = os.environ.get("PARSE_CACHE_PATH", os.path.join(DATA_DIR, "parse_cache.db"))
+PARSE_CACHE_MAX_BYTES = int(os.environ.get("PARSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PARSE_CACHE_URL_TTL = float(os.environ.get("PARSE_CACHE_URL_TTL", "3600"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parses (
+    key TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_parses_last_used ON parses(last_used);
+CREATE TABLE IF NOT EXISTS url_aliases (
+    url TEXT NOT NULL,
+    model TEXT NOT NULL,
+    key TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (url, model)
+) WITHOUT ROWID;
+"""
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace-insensitive form of the raw text: trimmed, collapsed, no blank lines."""
+    return "\n".join(" ".join(line.split()) for line in text.splitlines() if line.strip())
+
+
+def content_key(raw_text: str, parser_version: str, model: str) -> str:
+    h = hashlib.sha256()
+    h.update(f"{parser_version}\0{model}\0".encode("utf-8"))
+    h.update(normalize_text(raw_text).encode("utf-8"))
+    return h.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, path: str = PARSE_CACHE_PATH, max_bytes: int = PARSE_CACHE_MAX_BYTES,
+                 url_ttl: float = PARSE_CACHE_URL_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.url_ttl = url_ttl
+        self._local = threading.local()
+        self.counters = {"hits": 0, "url_hits": 0, "misses": 0, "evictions": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _load(self, key: str) -> Optional[Dict]:
+        conn = self._conn()
+        row = conn.execute("SELECT data FROM parses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute("UPDATE parses SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(zlib.decompress(row[0]))
+
+    def get(self, raw_text: str, parser_version: str, model: str) -> Optional[Dict]:
+        result = self._load(content_key(raw_text, parser_version, model))
+        self.counters["hits" if result is not None else "misses"] += 1
+        return result
+
+    def get_by_url(self, url: str, parser_version: str, model: str) -> Optional[Dict]:
+        """Parse last stored for `url`, if recent enough to skip fetching it."""
+        row = self._conn().execute(
+            "SELECT key, stored_at FROM url_aliases WHERE url = ? AND model = ?",
+            (url, f"{parser_version}/{model}"),
+        ).fetchone()
+        if row is None or time.time() - row[1] > self.url_ttl:
+            return None
+        result = self._load(row[0])
+        if result is not None:
+            self.counters["url_hits"] += 1
+        return result
+
+    def put(self, raw_text: str, parser_version: str, model: str, result: Dict, url: Optional[str] = None):
+        key = content_key(raw_text, parser_version, model)
+        data = zlib.compress(json.dumps(result, default=str).encode("utf-8"))
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO parses VALUES (?, ?, ?, ?)", (key, data, len(data), now))
+            if url:
+                conn.execute("INSERT OR REPLACE INTO url_aliases VALUES (?, ?, ?, ?)",
+                             (url, f"{parser_version}/{model}", key, now))
+        self._evict()
+
+    def _evict(self):
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM parses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        with conn:
+            evicted = 0
+            for key, size in conn.execute("SELECT key, size FROM parses ORDER BY last_used").fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM parses WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+            conn.execute("DELETE FROM url_aliases WHERE key NOT IN (SELECT key FROM parses)")
+        self.counters["evictions"] += evicted
+
+    def stats(self) -> Dict:
+        entries, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parses").fetchone()
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes, **self.counters}
+
+
+_cache: Optional[ParseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> Optional[ParseCache]:
+    """Shared cache for this process, or None when PARSE_CACHE_PATH is empty."""
+    global _cache
+    if not PARSE_CACHE_PATH:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ParseCache()
+    return _cache
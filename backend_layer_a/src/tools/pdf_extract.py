@@ -0,0 +1,209 @@
+"""
+Page-streaming PDF text extraction.
+
+iter_pdf_pages() yields one page of text at a time, in order, so callers
+can start on early pages before the rest of the document is extracted.
+Large documents are split into page ranges and extracted on a process
+pool. Page text is cached on disk, keyed by the SHA-256 of the document,
+so a re-fetched unchanged PDF is never parsed twice. Once the cache grows
+past PDF_CACHE_MAX_BYTES, the least recently used documents are evicted.
+
+Configuration (env):
+    PDF_CACHE_DIR            per-page text cache (default data/pdf_cache, empty disables)
+    PDF_CACHE_MAX_BYTES      cache size before the oldest documents are evicted (default 256 MiB)
+    PDF_WORKERS              extraction processes (default min(4, CPUs); 0 extracts in-process)
+    PDF_PAGES_PER_TASK       pages per process pool task (default 16)
+    PDF_PARALLEL_MIN_PAGES   smaller documents are extracted in-process (default 32)
+"""
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+
+# Optional dependency, like in ingest
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../../data")
+
+PDF_CACHE_DIR = os.environ.get("PDF_CACHE_DIR", os.path.join(DATA_DIR, "pdf_cache"))
+PDF_CACHE_MAX_BYTES = int(os.environ.get("PDF_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PAGES_PER_TASK = int(os.environ.get("PDF_PAGES_PER_TASK", "16"))
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", "32"))
+
+
+class PageCache:
+    """
+    <dir>/<sha[:2]>/<sha>/<page>.txt plus meta.json with the page count.
+    The mtime of meta.json is the document's last use.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _doc_dir(self, doc_hash: str) -> str:
+        return os.path.join(self.directory, doc_hash[:2], doc_hash)
+
+    def page_count(self, doc_hash: str) -> Optional[int]:
+        meta_path = os.path.join(self._doc_dir(doc_hash), "meta.json")
+        try:
+            with open(meta_path, "r") as f:
+                pages = json.load(f)["pages"]
+            os.utime(meta_path)
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+        return pages
+
+    def set_page_count(self, doc_hash: str, pages: int):
+        self._write(doc_hash, "meta.json", json.dumps({"pages": pages}))
+
+    def get(self, doc_hash: str, page: int) -> Optional[str]:
+        try:
+            with open(os.path.join(self._doc_dir(doc_hash), f"{page}.txt"), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, doc_hash: str, page: int, text: str):
+        self._write(doc_hash, f"{page}.txt", text)
+
+    def _write(self, doc_hash: str, name: str, data: str):
+        doc_dir = self._doc_dir(doc_hash)
+        os.makedirs(doc_dir, exist_ok=True)
+        path = os.path.join(doc_dir, name)
+        tmp = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def evict(self, keep: Optional[str] = None):
+        """Remove whole documents, least recently used first, until under max_bytes."""
+        entries = []
+        total = 0
+        try:
+            shards = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        for shard in shards:
+            shard_dir = os.path.join(self.directory, shard)
+            try:
+                doc_hashes = os.listdir(shard_dir)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            for doc_hash in doc_hashes:
+                doc_dir = os.path.join(shard_dir, doc_hash)
+                try:
+                    size = sum(entry.stat().st_size for entry in os.scandir(doc_dir))
+                    last_used = os.stat(os.path.join(doc_dir, "meta.json")).st_mtime
+                except FileNotFoundError:
+                    # Being written (no meta.json yet) or removed by another process
+                    continue
+                total += size
+                if doc_hash != keep:
+                    entries.append((last_used, doc_dir, size))
+        if total <= self.max_bytes:
+            return
+        for _, doc_dir, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(doc_dir, ignore_errors=True)
+            total -= size
+
+
+def _extract_range(path: str, start: int, end: int) -> List[str]:
+    # Runs in a pool process: open the document once per range
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _pool
+
+
+def iter_pdf_pages(content: bytes, cache_dir: Optional[str] = PDF_CACHE_DIR,
+                   workers: int = PDF_WORKERS, max_pages: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the text of each page in order. With max_pages, only the first
+    pages are extracted (a single page never goes to the process pool).
+    """
+    if PdfReader is None:
+        raise ImportError("pypdf library not installed. Cannot parse PDF.")
+
+    cache = PageCache(cache_dir) if cache_dir else None
+    doc_hash = hashlib.sha256(content).hexdigest()
+
+    page_count = cache.page_count(doc_hash) if cache else None
+    if page_count is not None:
+        wanted = page_count if max_pages is None else min(page_count, max_pages)
+        cached = [cache.get(doc_hash, i) for i in range(wanted)]
+        if all(text is not None for text in cached):
+            yield from cached
+            return
+
+    reader = PdfReader(io.BytesIO(content))
+    page_count = len(reader.pages)
+    if cache:
+        cache.set_page_count(doc_hash, page_count)
+    if max_pages is not None:
+        page_count = min(page_count, max_pages)
+    try:
+        yield from _extract_pages(reader, content, page_count, cache, doc_hash, workers)
+    finally:
+        # Once per newly extracted document, not per page
+        if cache:
+            cache.evict(keep=doc_hash)
+
+
+def _extract_pages(reader, content: bytes, page_count: int, cache: Optional[PageCache],
+                   doc_hash: str, workers: int) -> Iterator[str]:
+    def emit(i: int, text: str) -> str:
+        if cache:
+            cache.put(doc_hash, i, text)
+        return text
+
+    if workers <= 0 or page_count < PDF_PARALLEL_MIN_PAGES:
+        for i in range(page_count):
+            text = cache.get(doc_hash, i) if cache else None
+            yield text if text is not None else emit(i, reader.pages[i].extract_text() or "")
+        return
+
+    # Pool workers read the document from a temp file instead of getting the bytes per task
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        pool = _get_pool()
+        ranges = [(start, min(start + PDF_PAGES_PER_TASK, page_count))
+                  for start in range(0, page_count, PDF_PAGES_PER_TASK)]
+        futures = [pool.submit(_extract_range, path, start, end) for start, end in ranges]
+        try:
+            # In order: early pages are yielded while later ranges are still extracting
+            for (start, _), future in zip(ranges, futures):
+                for offset, text in enumerate(future.result()):
+                    yield emit(start + offset, text)
+        finally:
+            for future in futures:
+                future.cancel()
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -1,13 +1,9 @@
-import json
-import os
 from typing import List, Dict
-
-DATA_DIR = os.path.join(os.path.dirname(__file__), "../../data")
+from src.data_layer.registry import get_repositories
 
 def get_product_repo() -> List[Dict]:
-    path = os.path.join(DATA_DIR, "product_repo.json")
-    with open(path, 'r') as f:
-        return json.load(f)
+    # Shares the registry's loaded catalog instead of re-reading the file
+    return get_repositories().product.get_all()
 
 def product_lookup(query_specs: Dict) -> List[Dict]:
     """
@@ -16,31 +12,9 @@ def product_lookup(query_specs: Dict) -> List[Dict]:
     Or we could do a naive pre-filter.
     For the assignment: "returns matching SKUs (use exact & simple fuzzy rules); deterministic ordering."
     
-    Since we have a dedicated spec_matcher logic in the Agent, 
-    the tool can just return ALL distinct candidates relevant to the "product_name" or "voltage".
-    Let's filter by voltage if present to reduce noise, else return top 5.
+    Since we have a dedicated spec_matcher logic in the Agent, the tool only
+    narrows the field. Candidates come from the spec index (see src/data_layer/spec_index.py),
+    relaxing constraints step by step instead of returning the whole repo.
     """
-    repo = get_product_repo()
-    results = []
-    
-    req_voltage = query_specs.get("voltage")
-    
-    for sku in repo:
-        # Simple heuristic: if voltage matches or isn't specified, include it.
-        if req_voltage:
-            # simple string match "132kV" vs "132kV"
-            if req_voltage.lower() in sku["specs"].get("voltage", "").lower():
-                results.append(sku)
-            # fallback: if no voltage match, don't include? 
-            # Let's include everything if voltage check fails so the agent can see mismatches.
-            # Actually, returning *everything* is safer for the "Technical Agent" to do the detailed math.
-            # But "product_repo_lookup" implies some search.
-            # Let's return all for this small demo scale (10 items).
-        else:
-             results.append(sku)
-    
-    # If filtered list is empty, return everything (fallback)
-    if not results:
-        results = repo
-        
-    return results
+    # Delegates to the indexed repository so the catalog isn't walked per lookup
+    return get_repositories().product.find_by_specs(query_specs)
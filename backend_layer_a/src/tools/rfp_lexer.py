@@ -0,0 +1,164 @@
+"""
+Single-pass line-item lexer for RFP scope text.
+
+Shared by the local parser (main_agent.parse_line_items) and the heuristic
+fallback of ingest.llm_parse_rfp, so both modes extract the same items.
+Text is streamed line by line (a string or any iterable of chunks, e.g.
+PDF pages) and each line is scanned once with one precompiled pattern;
+item raw text is joined once per item, so parsing time is linear in the
+input size.
+
+Per item (first value wins unless noted):
+    item marker     "Item 3:", "Line Item 3:", "No. 3."
+    voltage         "11kV", "1.1 kV"
+    size / cores    "3x300mm2", "3 x 300 sqmm", "300mm2", "3x300"
+    material        copper / cu, aluminum / aluminium / al / acsr (aluminum wins on a line with both)
+    insulation      xlpe, pvc, mica ("Mica Tape + XLPE"); later lines may refine XLPE
+    quantity        "Quantity: 500", "Qty 2,000" (last wins)
+    tests           "Tests required: A, B" (last wins)
+"""
+import io
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+SIZE_UNIT = r"(?:mm2|mm²|sq\.?\s*mm)"
+ITEM_PATTERN = r"(?:Line\s+)?(?:Item|No\.)\s*(?P<item_id>\d+)\s*[:.]"
+MAX_CORES = 100  # "600x400" is a tray dimension, not a core count
+
+# Every token starts a word with one of these characters. Checking that
+# first lets the scanner skip most positions without trying each alternative.
+TOKEN_START = r"\b(?=[\dlinqtcapxm])"
+
+TOKEN = re.compile(
+    TOKEN_START +
+    rf"(?:(?P<item>{ITEM_PATTERN})"
+    r"|(?P<voltage>\d+(?:\.\d+)?\s*kV)"
+    rf"|(?P<cores>\d+)\s*[xX×]\s*(?P<core_size>\d+)(?:\.\d+)?\s*(?P<core_unit>{SIZE_UNIT})?"
+    rf"|(?P<size>\d+)\s*{SIZE_UNIT}"
+    r"|\b(?:Qty|Quantity)\b\.?\s*:?\s*(?P<qty>\d[\d,]*)"
+    r"|(?P<tests>Tests?\s+required\s*:)"
+    r"|(?P<copper>copper|\bcu\b)"
+    r"|(?P<aluminum>alumin(?:um|ium)|\bal\b|acsr)"
+    r"|(?P<insulation>xlpe|pvc|mica))",
+    re.IGNORECASE,
+)
+ITEM_MARKER = re.compile(ITEM_PATTERN, re.IGNORECASE)
+QUANTITY_TAIL = re.compile(r"\b(?:Qty|Quantity)\b.*", re.IGNORECASE)
+
+INSULATION = {"xlpe": "XLPE", "pvc": "PVC", "mica": "Mica Tape + XLPE"}
+
+
+def iter_lines(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    """Lines of a string, or of a stream of chunks whose lines may span chunk boundaries."""
+    if isinstance(source, str):
+        yield from io.StringIO(source)
+        return
+    pending = ""
+    for chunk in source:
+        lines = (pending + chunk).split("\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+class _Item:
+    __slots__ = ("item_id", "lines", "specs", "quantity", "tests", "product_name")
+
+    def __init__(self, item_id: str):
+        self.item_id = item_id
+        self.lines: List[str] = []
+        self.specs: Dict = {}
+        self.quantity: Optional[int] = None
+        self.tests: Optional[List[str]] = None
+        self.product_name: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        item = {"item_id": self.item_id, "raw_text": " ".join(self.lines), "specs": self.specs}
+        if self.quantity is not None:
+            item["quantity"] = self.quantity
+        if self.tests is not None:
+            item["tests_required"] = self.tests
+        item["product_name"] = self.product_name
+        return item
+
+
+class LineItemLexer:
+    """Feed lines one at a time; finish() returns the items."""
+
+    def __init__(self):
+        self.items: List[Dict] = []
+        self.current: Optional[_Item] = None
+
+    def feed(self, line: str):
+        line = line.strip()
+        if not line:
+            return
+
+        matches = list(TOKEN.finditer(line))
+        marker = next((m for m in matches if m.group("item")), None)
+        if marker is not None:
+            if self.current is not None:
+                self.items.append(self.current.to_dict())
+            self.current = _Item(marker.group("item_id"))
+        item = self.current
+        if item is None:
+            return  # preamble before the first item
+
+        item.lines.append(line)
+        if item.product_name is None:
+            name = line if marker is None else line[:marker.start()] + line[marker.end():]
+            item.product_name = QUANTITY_TAIL.sub("", name).strip().strip(".,")
+        elif len(item.product_name) < 10 and 10 < len(line) < 100 and ("cable" in line.lower() or "conductor" in line.lower()):
+            # Only a marker on the first line: take a descriptive follow-up line
+            item.product_name = line
+
+        specs = item.specs
+        copper = aluminum = False
+        insulation = set()
+        for m in matches:
+            kind = m.lastgroup
+            if m.group("cores") is not None:
+                cores = int(m.group("cores"))
+                if cores <= MAX_CORES:
+                    specs.setdefault("cores", cores)
+                    specs.setdefault("conductor_size_mm2", int(m.group("core_size")))
+            elif kind == "voltage":
+                specs.setdefault("voltage", "".join(m.group("voltage").split()))
+            elif kind == "size":
+                specs.setdefault("conductor_size_mm2", int(m.group("size")))
+            elif kind == "qty":
+                item.quantity = int(m.group("qty").replace(",", ""))
+            elif kind == "tests":
+                item.tests = [t.strip() for t in line[m.end():].split(",")]
+            elif kind == "copper":
+                copper = True
+            elif kind == "aluminum":
+                aluminum = True
+            elif kind == "insulation":
+                insulation.add(m.group("insulation").lower())
+
+        if "conductor_material" not in specs and (copper or aluminum):
+            specs["conductor_material"] = "Aluminum" if aluminum else "Copper"
+        if insulation and specs.get("insulation") in (None, "XLPE"):
+            for token in ("xlpe", "pvc", "mica"):
+                if token in insulation:
+                    specs["insulation"] = INSULATION[token]
+
+    def finish(self) -> List[Dict]:
+        if self.current is not None:
+            self.items.append(self.current.to_dict())
+            self.current = None
+        return self.items
+
+
+def extract_line_items(source: Union[str, Iterable[str]]) -> List[Dict]:
+    """
+    Line items of a scope text. `source` is a string or an iterable of text
+    chunks (lines may span chunks). Each item: item_id, raw_text, specs,
+    product_name, and quantity / tests_required when present.
+    """
+    lexer = LineItemLexer()
+    for line in iter_lines(source):
+        lexer.feed(line)
+    return lexer.finish()
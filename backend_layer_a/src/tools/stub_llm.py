@@ -0,0 +1,58 @@
+"""
+Offline stand-in for the extraction LLM.
+
+A LangChain chat model that answers the extraction prompt with JSON built
+by the local lexer, so the chunked LLM path (prompting, batching, rate
+limiting, JSON parsing, merging) can be run without an API key.
+Select it with EXTRACTION_LLM=stub.
+
+Configuration (env):
+    STUB_LLM_DELAY   simulated seconds per call (default 0)
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.tools.rfp_lexer import extract_line_items
+
+STUB_LLM_DELAY = float(os.environ.get("STUB_LLM_DELAY", "0"))
+TEXT_MARKER = "RFP TEXT CONTENT:"
+
+
+class StubExtractionLLM(BaseChatModel):
+    delay: float = STUB_LLM_DELAY
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-extraction"
+
+    def _answer(self, messages: List[BaseMessage]) -> ChatResult:
+        self.calls += 1
+        prompt = messages[-1].content
+        text = prompt.split(TEXT_MARKER, 1)[-1]
+        result = {
+            "id": "stub_rfp",
+            "title": "RFP (stub extraction)",
+            "issuer": "Extracted",
+            "scope_items": extract_line_items(text),
+        }
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=json.dumps(result)))])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.delay:
+            time.sleep(self.delay)
+        return self._answer(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self._answer(messages)
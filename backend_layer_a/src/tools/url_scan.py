@@ -0,0 +1,183 @@
+"""
+Concurrent URL scanning.
+
+Fetches tender portal pages concurrently through the shared pooled fetcher
+(see http_fetcher) and turns each page into a detected-RFP record: title,
+issuer host, submission deadline, estimated value and a scope excerpt read
+from the page text. Results are yielded as soon as each URL finishes, so
+/api/v1/scan can stream them, followed by a summary record.
+
+Record types (one dict per URL, then the summary):
+    {"type": "rfp", "url", "rfp"}                  deadline within the scan window
+    {"type": "skipped", "url", "rfp", "reason"}    no deadline found, or outside the window
+    {"type": "error", "url", "error"}              fetch failed or timed out
+    {"type": "summary", "total_scanned", "detected_count", "skipped", "errors", "elapsed_s"}
+
+Configuration (env):
+    SCAN_CONCURRENCY    URLs in flight per scan (default 32)
+    SCAN_PER_HOST       URLs in flight per host per scan (default 4)
+    SCAN_URL_TIMEOUT    seconds per URL, fetch and extraction (default 15)
+"""
+import asyncio
+import hashlib
+import html
+import os
+import re
+import time
+from collections import Counter
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+SCAN_CONCURRENCY = int(os.environ.get("SCAN_CONCURRENCY", "32"))
+SCAN_PER_HOST = int(os.environ.get("SCAN_PER_HOST", "4"))
+SCAN_URL_TIMEOUT = float(os.environ.get("SCAN_URL_TIMEOUT", "15"))
+
+SCOPE_EXCERPT_CHARS = 4000
+
+TITLE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+SCRIPT_STYLE = re.compile(r"<(script|style|title)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+BLOCK_TAG = re.compile(r"<\s*(?:br|/p|/div|/li|/tr|/h\d|/td|/th)\b[^>]*>", re.IGNORECASE)
+TAG = re.compile(r"<[^>]+>")
+
+DEADLINE_HINT = re.compile(r"deadline|due date|closing date|last date|submission", re.IGNORECASE)
+MONTHS = {m: i + 1 for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"])}
+DATE = re.compile(
+    r"(?P<iso>\d{4}-\d{2}-\d{2})(?:[T ](?P<time>\d{2}:\d{2}(?::\d{2})?))?"
+    r"|(?P<d>\d{1,2})[./-](?P<m>\d{1,2})[./-](?P<y>\d{4})"  # day first, as on Indian portals
+    r"|(?P<d2>\d{1,2})\s+(?P<mon>[A-Za-z]{3,9})\.?,?\s+(?P<y2>\d{4})"
+)
+VALUE = re.compile(
+    r"(?:estimated|tender|contract)\s+(?:cost|value)[^\d\n]{0,20}?(?P<amount>\d[\d,]*(?:\.\d+)?)\s*(?P<unit>crores?|cr\b|lakhs?|lacs?|million|mn\b)?",
+    re.IGNORECASE,
+)
+MULTIPLIERS = {"crore": 1e7, "cr": 1e7, "lakh": 1e5, "lac": 1e5, "million": 1e6, "mn": 1e6}
+
+
+def page_text(content: str) -> str:
+    """Visible text of an HTML page (plain text passes through), one block per line."""
+    text = SCRIPT_STYLE.sub(" ", content)
+    text = BLOCK_TAG.sub("\n", text)
+    text = html.unescape(TAG.sub(" ", text))
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _to_date(m: re.Match) -> Optional[datetime]:
+    try:
+        if m.group("iso"):
+            return datetime.fromisoformat(f"{m.group('iso')}T{m.group('time') or '00:00'}")
+        if m.group("d"):
+            return datetime(int(m.group("y")), int(m.group("m")), int(m.group("d")))
+        month = MONTHS.get(m.group("mon")[:3].lower())
+        return datetime(int(m.group("y2")), month, int(m.group("d2"))) if month else None
+    except ValueError:
+        return None
+
+
+def find_deadline(text: str) -> Optional[datetime]:
+    """First date shortly after a deadline keyword, else None."""
+    for hint in DEADLINE_HINT.finditer(text):
+        for m in DATE.finditer(text, hint.end(), hint.end() + 120):
+            date = _to_date(m)
+            if date is not None:
+                return date
+    return None
+
+
+def find_value(text: str) -> Optional[int]:
+    m = VALUE.search(text)
+    if not m:
+        return None
+    amount = float(m.group("amount").replace(",", ""))
+    unit = (m.group("unit") or "").lower().rstrip("s")
+    return int(amount * MULTIPLIERS.get(unit, 1))
+
+
+def detect_rfp(url: str, content: str, window: Tuple[datetime, datetime]) -> Dict:
+    """Scan record for one fetched page."""
+    title_match = TITLE.search(content)
+    text = page_text(content)
+    title = " ".join(html.unescape(title_match.group(1)).split()) if title_match else ""
+    if not title:
+        title = text.split("\n", 1)[0][:120] if text else f"RFP Detected from {url[:30]}..."
+    deadline = find_deadline(text)
+
+    rfp = {
+        "id": f"scan_{hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]}",
+        "title": title,
+        "issuer": urlsplit(url).netloc,
+        "submission_deadline": deadline.strftime("%Y-%m-%dT%H:%M:%SZ") if deadline else None,
+        "scope_excerpt": text[:SCOPE_EXCERPT_CHARS],
+        "estimated_value": find_value(text),
+        "source_url": url,
+        "status": "detected",
+    }
+    if deadline is None:
+        return {"type": "skipped", "url": url, "rfp": rfp, "reason": "no submission deadline found"}
+    start, end = window
+    if not start <= deadline <= end:
+        return {"type": "skipped", "url": url, "rfp": rfp, "reason": "deadline outside the scan window"}
+    return {"type": "rfp", "url": url, "rfp": rfp}
+
+
+async def _fetch_text(url: str) -> str:
+    from src.tools.http_fetcher import fetch_url_async
+
+    result = await fetch_url_async(url)
+    if "pdf" in result.content_type.lower() or url.lower().endswith(".pdf"):
+        # First page is enough for the title, deadline and value: extracted
+        # in-process, so large PDFs don't fan out to the PDF process pool
+        from src.tools.pdf_extract import iter_pdf_pages
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: next(iter_pdf_pages(result.content, max_pages=1), ""))
+    return result.text
+
+
+async def scan_url(url: str, window: Tuple[datetime, datetime]) -> Dict:
+    return detect_rfp(url, await _fetch_text(url), window)
+
+
+async def iter_scan(urls: Sequence[str], window: Tuple[datetime, datetime],
+                    concurrency: int = SCAN_CONCURRENCY, per_host: int = SCAN_PER_HOST,
+                    timeout: float = SCAN_URL_TIMEOUT) -> AsyncIterator[Dict]:
+    """Scan records in completion order, then a summary record."""
+    started = time.perf_counter()
+    slots = asyncio.Semaphore(concurrency)
+    hosts: Dict[str, asyncio.Semaphore] = {}
+
+    async def run(url: str) -> Dict:
+        host = urlsplit(url).netloc.lower()
+        if host not in hosts:
+            hosts[host] = asyncio.Semaphore(per_host)
+        # Host slot first, so URLs queued behind a busy host don't hold global slots
+        async with hosts[host], slots:
+            try:
+                # The timeout starts once the URL has its slots
+                return await asyncio.wait_for(scan_url(url, window), timeout)
+            except asyncio.TimeoutError:
+                return {"type": "error", "url": url, "error": f"timed out after {timeout:g}s"}
+            except Exception as e:
+                return {"type": "error", "url": url, "error": str(e) or type(e).__name__}
+
+    tasks: List[asyncio.Task] = [asyncio.create_task(run(url)) for url in urls]
+    counts: Counter = Counter()
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            record = await next_done
+            counts[record["type"]] += 1
+            yield record
+    finally:
+        # Client went away mid-stream: stop the remaining fetches
+        for task in tasks:
+            task.cancel()
+
+    yield {
+        "type": "summary",
+        "total_scanned": len(urls),
+        "detected_count": counts["rfp"],
+        "skipped": counts["skipped"],
+        "errors": counts["error"],
+        "elapsed_s": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,185 @@
+"""
+Vectorized spec scoring.
+
+Encodes catalog specs once into NumPy columns (categorical codes + numeric
+values, NaN/-1 for missing) and scores a whole RFP's line items against their
+candidates in one pass. Results are identical to `calculate_spec_match`, which
+is also used as the fallback when NumPy isn't installed.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+from src.utils.spec_matcher import (
+    DEFAULT_TOLERANCE,
+    SpecValue,
+    calculate_spec_match,
+    compile_specs,
+    tolerance_for,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MISSING = -1
+UNKNOWN = -2  # requirement value never seen in the catalog
+
+# Line items scored per block, keeps the (items x candidates) matrices bounded
+BLOCK_SIZE = 256
+
+
+class ItemScores:
+    """Scores of one line item against its candidate positions."""
+
+    def __init__(self, scorer: "BatchSpecScorer", specs: Dict, positions: List[int], match_percent, matched, total: int):
+        self.scorer = scorer
+        self.specs = specs
+        self.positions = positions
+        self.match_percent = match_percent
+        self.matched = matched
+        self.total = total
+
+    def details(self, j: int) -> Dict[str, Any]:
+        """Full match details (incl. mismatch reasons) for candidate j."""
+        return calculate_spec_match(self.specs, self.scorer.compiled[self.positions[j]])
+
+
+class BatchSpecScorer:
+    def __init__(self, products: Sequence[Dict], compiled: Optional[Sequence[Dict[str, SpecValue]]] = None,
+                 tolerance: float = DEFAULT_TOLERANCE):
+        self.products = products
+        # Compiled specs are shared with the repository when it already has them
+        self.compiled = compiled if compiled is not None else [compile_specs(sku.get("specs", {})) for sku in products]
+        self.tolerance = tolerance
+        self._positions: Optional[Dict[str, int]] = None
+        self.numeric: Dict[str, Any] = {}
+        self.codes: Dict[str, Any] = {}
+        self.vocab: Dict[str, Dict[str, int]] = {}
+        if np is not None:
+            self._encode()
+
+    @classmethod
+    def from_parts(cls, products: Sequence[Dict], compiled: Sequence[Dict[str, SpecValue]],
+                   numeric: Dict[str, Any], codes: Dict[str, Any], vocab: Dict[str, Dict[str, int]],
+                   tolerance: float = DEFAULT_TOLERANCE) -> "BatchSpecScorer":
+        """Rebuild a scorer from already encoded columns (e.g. arrays of a catalog snapshot)."""
+        scorer = cls.__new__(cls)
+        scorer.products = products
+        scorer.compiled = compiled
+        scorer.tolerance = tolerance
+        scorer._positions = None
+        scorer.numeric = numeric
+        scorer.codes = codes
+        scorer.vocab = vocab
+        return scorer
+
+    def _encode(self):
+        keys = []
+        for specs in self.compiled:
+            for key in specs:
+                if key not in self.vocab:
+                    self.vocab[key] = {}
+                    keys.append(key)
+
+        n = len(self.products)
+        for key in keys:
+            vocab = self.vocab[key]
+            numeric = np.full(n, np.nan, dtype=np.float64)
+            codes = np.full(n, MISSING, dtype=np.int32)
+            for pos, specs in enumerate(self.compiled):
+                val = specs.get(key)
+                if val is None or val.raw is None:
+                    continue
+                if val.number is not None:
+                    numeric[pos] = val.number
+                codes[pos] = vocab.setdefault(val.token, len(vocab))
+            self.numeric[key] = numeric
+            self.codes[key] = codes
+
+    def position_of(self, sku) -> int:
+        # Row views from columnar catalogs know their position already
+        pos = getattr(sku, "position", None)
+        if pos is not None:
+            return pos
+        if self._positions is None:
+            self._positions = {p["sku_id"]: i for i, p in enumerate(self.products)}
+        return self._positions[sku["sku_id"]]
+
+    def positions_for(self, skus: Sequence[Dict]) -> List[int]:
+        return [self.position_of(sku) for sku in skus]
+
+    def score_rfp(self, specs_list: Sequence[Dict], positions_list: Sequence[List[int]]) -> List[ItemScores]:
+        """
+        Score every line item against its own candidate positions.
+        Line item specs may be raw or precompiled.
+        """
+        specs_list = [compile_specs(specs) for specs in specs_list]
+        if np is None:
+            return [self._score_scalar(specs, positions) for specs, positions in zip(specs_list, positions_list)]
+
+        results: List[ItemScores] = []
+        for start in range(0, len(specs_list), BLOCK_SIZE):
+            block_specs = specs_list[start:start + BLOCK_SIZE]
+            block_positions = positions_list[start:start + BLOCK_SIZE]
+            results.extend(self._score_block(block_specs, block_positions))
+        return results
+
+    def _score_scalar(self, specs: Dict, positions: List[int]) -> ItemScores:
+        scored = [calculate_spec_match(specs, self.compiled[pos]) for pos in positions]
+        return ItemScores(
+            self, specs, positions,
+            [s["match_percent"] for s in scored],
+            [s["matched_params"] for s in scored],
+            len(specs),
+        )
+
+    def _score_block(self, specs_list: Sequence[Dict], positions_list: Sequence[List[int]]) -> List[ItemScores]:
+        # Score the block against the union of candidates, then slice per item
+        union = np.unique(np.fromiter((p for ps in positions_list for p in ps), dtype=np.int64))
+        n_items = len(specs_list)
+        matched = np.zeros((n_items, len(union)), dtype=np.int32)
+
+        keys = {key for specs in specs_list for key in specs}
+        for key in keys:
+            rows = [i for i, specs in enumerate(specs_list) if key in specs]
+            if key not in self.codes:
+                continue  # no SKU has this param: always "Missing"
+
+            col_num = self.numeric[key][union]
+            col_codes = self.codes[key][union]
+            vocab = self.vocab[key]
+
+            req_num = np.full(len(rows), np.nan, dtype=np.float64)
+            req_codes = np.empty(len(rows), dtype=np.int32)
+            for r, i in enumerate(rows):
+                req = specs_list[i][key]
+                if req.numeric:
+                    req_num[r] = req.number
+                req_codes[r] = vocab.get(req.token, UNKNOWN)
+
+            tolerance = tolerance_for(key, self.tolerance)
+            with np.errstate(invalid="ignore"):
+                numeric_ok = np.abs(col_num[None, :] - req_num[:, None]) <= (req_num * tolerance)[:, None]
+            categorical_ok = col_codes[None, :] == req_codes[:, None]
+            present = (col_codes != MISSING)[None, :]
+            matched[rows] += (present & (numeric_ok | categorical_ok)).astype(np.int32)
+
+        results = []
+        for i, (specs, positions) in enumerate(zip(specs_list, positions_list)):
+            total = len(specs)
+            cols = np.searchsorted(union, positions)
+            item_matched = matched[i, cols]
+            # Round through Python so percentages are bit-identical to the scalar path
+            table = np.array(
+                [round(m / total * 100, 2) for m in range(total + 1)] if total else [0.0],
+                dtype=np.float64,
+            )
+            results.append(ItemScores(self, specs, list(positions), table[item_matched].tolist(), item_matched.tolist(), total))
+        return results
+
+
+def scorer_for_repo(repo, candidates_per_item: Sequence[Sequence[Dict]]) -> BatchSpecScorer:
+    if hasattr(repo, "batch_scorer"):
+        return repo.batch_scorer()
+    # Repos without a catalog-wide scorer: encode just these candidates
+    unique = {sku["sku_id"]: sku for candidates in candidates_per_item for sku in candidates}
+    return BatchSpecScorer(list(unique.values()))
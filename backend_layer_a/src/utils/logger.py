@@ -1,22 +1,339 @@
+import asyncio
+import atexit
+import contextvars
 import json
+import os
+import queue
+import random
+import sys
+import threading
 import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, List, Optional, Set, TextIO
+
+# Events kept per pipeline for replay to late subscribers
+EVENT_BUFFER_SIZE = int(os.environ.get("EVENT_BUFFER_SIZE", "256"))
+# Pipelines with a replay buffer; the least recently used idle ones are dropped
+EVENT_MAX_CHANNELS = int(os.environ.get("EVENT_MAX_CHANNELS", "1000"))
+
+# What a subscriber does when its queue is full
+DROP_POLICIES = ("drop_oldest", "drop_newest", "disconnect")
+TERMINAL_STATUSES = ("COMPLETED", "FAILED")
+
+# Pipeline the current thread/task is running, for events without a pipeline_id
+_current_pipeline: contextvars.ContextVar = contextvars.ContextVar("pipeline_id", default=None)
+
+
+@contextmanager
+def pipeline_context(pipeline_id: str):
+    token = _current_pipeline.set(pipeline_id)
+    try:
+        yield
+    finally:
+        _current_pipeline.reset(token)
+
+
+# Stdout sink configuration: minimum level, per-type sampling, on/off
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+EVENT_LOG_LEVEL = os.environ.get("EVENT_LOG_LEVEL", "INFO").upper()
+EVENT_STDOUT = os.environ.get("EVENT_STDOUT", "1") not in ("0", "false", "no")
+# e.g. "AGENT_OUTPUT=0.1,PIPELINE_STATUS=0.5": fraction of those events that get logged
+EVENT_SAMPLE_RATES = os.environ.get("EVENT_SAMPLE_RATES", "")
+# Events waiting for the writer thread; beyond this they are dropped
+EVENT_SINK_MAX_PENDING = int(os.environ.get("EVENT_SINK_MAX_PENDING", "10000"))
+
+
+def _parse_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for part in spec.split(","):
+        if "=" in part:
+            event_type, rate = part.split("=", 1)
+            rates[event_type.strip()] = float(rate)
+    return rates
+
+
+_ts_cache = (None, "")
+
+def _timestamp() -> str:
+    # strftime once per second, not once per event
+    global _ts_cache
+    now = int(time.time())
+    cached = _ts_cache
+    if cached[0] != now:
+        cached = _ts_cache = (now, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)))
+    return cached[1]
+
+
+class EventSink:
+    """
+    Writes events to stdout from a background thread. Callers only filter
+    and enqueue; JSON serialization and the write happen on the writer
+    thread, batched. Events must not be mutated after submit().
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, level: str = EVENT_LOG_LEVEL,
+                 sample_rates: Optional[Dict[str, float]] = None, enabled: bool = EVENT_STDOUT,
+                 max_pending: int = EVENT_SINK_MAX_PENDING):
+        self.stream = stream  # None: whatever sys.stdout is at write time
+        self.level = LEVELS.get(level, LEVELS["INFO"])
+        self.sample_rates = sample_rates if sample_rates is not None else _parse_rates(EVENT_SAMPLE_RATES)
+        self.enabled = enabled
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, event: Dict, level: str = "INFO"):
+        if not self.enabled or LEVELS.get(level, 20) < self.level:
+            return
+        rate = self.sample_rates.get(event["type"])
+        if rate is not None and random.random() >= rate:
+            return
+        if self._queue.qsize() >= self.max_pending:
+            self.dropped += 1
+            return
+        self._queue.put(event)
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 512:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            markers = []
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    lines.append(f"[EVENT] {json.dumps(item, default=str)}\n")
+            try:
+                if lines:
+                    stream = self.stream or sys.stdout
+                    stream.write("".join(lines))
+                    stream.flush()
+            except Exception:
+                pass
+            for marker in markers:
+                marker.set()
+
+    def flush(self, timeout: float = 2.0):
+        """Block until everything submitted so far has been written."""
+        if self._thread is None:
+            return
+        marker = threading.Event()
+        self._queue.put(marker)
+        marker.wait(timeout)
+
+
+def is_terminal(event: Dict) -> bool:
+    return event["type"] == "PIPELINE_STATUS" and event["payload"].get("status") in TERMINAL_STATUSES
+
+
+class Subscription:
+    """
+    One consumer's view of a topic. Lives on an event loop; the bus hands it
+    events from any thread. Bounded, with a drop policy for slow consumers.
+    """
+
+    def __init__(self, bus: "EventBus", topic: Optional[str], loop: asyncio.AbstractEventLoop,
+                 maxsize: int, policy: str):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{policy}'. Options: {', '.join(DROP_POLICIES)}")
+        self.bus = bus
+        self.topic = topic
+        self.loop = loop
+        self.maxsize = maxsize
+        self.policy = policy
+        self.queue: Deque[Dict] = deque()
+        self.dropped = 0
+        self.closed = False
+        self._waiter: Optional[asyncio.Future] = None
+
+    def _offer(self, event: Dict):
+        # Runs on self.loop
+        if self.closed:
+            return
+        if len(self.queue) >= self.maxsize:
+            self.dropped += 1
+            if self.policy == "drop_newest":
+                return
+            if self.policy == "disconnect":
+                self.close()
+                return
+            self.queue.popleft()
+        self.queue.append(event)
+        self._wake()
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def next_batch(self, max_events: int = 100, window: float = 0.05) -> List[Dict]:
+        """
+        Wait for at least one event, then linger up to `window` seconds so
+        bursts go out together. Returns [] once the subscription is closed.
+        """
+        while not self.queue and not self.closed:
+            self._waiter = self.loop.create_future()
+            await self._waiter
+        if window and self.queue and len(self.queue) < max_events and not self.closed:
+            await asyncio.sleep(window)
+        batch = []
+        while self.queue and len(batch) < max_events:
+            batch.append(self.queue.popleft())
+        return batch
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.bus.unsubscribe(self)
+            self._wake()
+
+
+class _Channel:
+    __slots__ = ("buffer", "subscribers", "seq")
 
-class MockEventBus:
     def __init__(self):
-        self.listeners = []
+        self.buffer: Deque[Dict] = deque(maxlen=EVENT_BUFFER_SIZE)
+        self.subscribers: Set[Subscription] = set()
+        self.seq = 0
+
 
-    def emit(self, event_type: str, payload: dict):
+class EventBus:
+    """
+    In-process pub/sub with one topic per pipeline. emit() is safe to call
+    from agent threads; delivery to subscribers happens on their event loop.
+    """
+
+    def __init__(self, sink: Optional[EventSink] = None):
+        self.sink = sink or EventSink()
+        # Re-entrant: a "disconnect" subscriber unsubscribes while replay holds the lock
+        self._lock = threading.RLock()
+        self._channels: "OrderedDict[str, _Channel]" = OrderedDict()
+        self._global: Set[Subscription] = set()  # subscribed to every pipeline
+        # In a pipeline worker process: queue to the parent's bus (see forward_to)
+        self._forward = None
+
+    def emit(self, event_type: str, payload: dict, level: str = "INFO"):
         event = {
-            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "timestamp": _timestamp(),
             "type": event_type,
             "payload": payload
         }
-        # In a real app, this would push to a websocket.
-        # Here we just print to stdout for the demo capture or append to a log list.
-        print(f"[EVENT] {json.dumps(event)}")
+        pipeline_id = payload.get("pipeline_id") or _current_pipeline.get()
+        if pipeline_id:
+            event["pipeline_id"] = pipeline_id
+        if self._forward is not None:
+            # The parent publishes and logs it (relay); nobody subscribes in a worker
+            self._forward.put((event, level))
+            return event
+        if pipeline_id:
+            self.publish(pipeline_id, event)
+        # Logged (serialized) later on the sink's thread; publish has already set "seq"
+        self.sink.submit(event, level)
         return event
 
-event_bus = MockEventBus()
+    def forward_to(self, forward_queue):
+        """
+        Called in a worker process: emit() puts (event, level) on
+        forward_queue (a multiprocessing queue) instead of publishing here.
+        The parent passes each one to relay().
+        """
+        self._forward = forward_queue
+
+    def relay(self, event: Dict, level: str = "INFO"):
+        """Publish and log an event emitted in a worker process."""
+        pipeline_id = event.get("pipeline_id")
+        if pipeline_id:
+            self.publish(pipeline_id, event)
+        self.sink.submit(event, level)
+
+    def publish(self, pipeline_id: str, event: Dict):
+        with self._lock:
+            channel = self._channel(pipeline_id)
+            channel.seq += 1
+            event["seq"] = channel.seq
+            channel.buffer.append(event)
+            targets = list(channel.subscribers) + list(self._global)
+        for sub in targets:
+            self._deliver(sub, event)
+
+    def _channel(self, pipeline_id: str) -> _Channel:
+        channel = self._channels.get(pipeline_id)
+        if channel is None:
+            channel = self._channels[pipeline_id] = _Channel()
+            if len(self._channels) > EVENT_MAX_CHANNELS:
+                for pid, old in list(self._channels.items()):
+                    if len(self._channels) <= EVENT_MAX_CHANNELS:
+                        break
+                    if not old.subscribers and pid != pipeline_id:
+                        del self._channels[pid]
+        else:
+            self._channels.move_to_end(pipeline_id)
+        return channel
+
+    def _deliver(self, sub: Subscription, event: Dict):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is sub.loop:
+            sub._offer(event)
+            return
+        try:
+            sub.loop.call_soon_threadsafe(sub._offer, event)
+        except RuntimeError:
+            # Subscriber's loop is gone
+            self.unsubscribe(sub)
+
+    def subscribe(self, pipeline_id: Optional[str] = None, replay: bool = True,
+                  maxsize: int = 1000, policy: str = "drop_oldest") -> Subscription:
+        """
+        Subscribe to one pipeline (or to all when pipeline_id is None) from
+        the running event loop. Buffered events are replayed first.
+        """
+        sub = Subscription(self, pipeline_id, asyncio.get_running_loop(), maxsize, policy)
+        with self._lock:
+            if pipeline_id is None:
+                self._global.add(sub)
+                return sub
+            channel = self._channel(pipeline_id)
+            if replay:
+                for event in channel.buffer:
+                    sub._offer(event)
+            if not sub.closed:
+                channel.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if sub.topic is None:
+                self._global.discard(sub)
+            else:
+                channel = self._channels.get(sub.topic)
+                if channel is not None:
+                    channel.subscribers.discard(sub)
+
+    def has_events(self, pipeline_id: str) -> bool:
+        with self._lock:
+            channel = self._channels.get(pipeline_id)
+            return channel is not None and len(channel.buffer) > 0
+
+event_bus = EventBus()
+atexit.register(event_bus.sink.flush)
 
-def emit_event(event_type: str, payload: dict):
-    return event_bus.emit(event_type, payload)
+def emit_event(event_type: str, payload: dict, level: str = "INFO"):
+    return event_bus.emit(event_type, payload, level)
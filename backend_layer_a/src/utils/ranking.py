@@ -0,0 +1,37 @@
+import heapq
+from typing import Any, Callable, Dict, List, Sequence
+
+def select_top_k(
+    match_percent: Sequence[float],
+    sku_ids: Sequence[str],
+    k: int,
+    price_lookup: Callable[[List[str]], Dict[str, Dict[str, Any]]],
+) -> List[int]:
+    """
+    Pick the k best candidates ranked by (match_percent desc, unit price asc).
+
+    A size-k heap finds the boundary score without sorting every candidate.
+    Prices are fetched in a single bulk call, and only for candidates whose
+    score is shared with another contender, i.e. where price decides the order.
+    Remaining ties keep candidate (repo) order.
+    """
+    n = len(match_percent)
+    if n == 0 or k <= 0:
+        return []
+
+    top = heapq.nlargest(k, range(n), key=lambda j: match_percent[j])
+    boundary = match_percent[top[-1]]
+    contenders = [j for j in range(n) if match_percent[j] >= boundary] if n > k else list(range(n))
+
+    counts: Dict[float, int] = {}
+    for j in contenders:
+        counts[match_percent[j]] = counts.get(match_percent[j], 0) + 1
+    tied = [sku_ids[j] for j in contenders if counts[match_percent[j]] > 1]
+
+    prices = price_lookup(tied) if tied else {}
+
+    def rank_key(j):
+        price = prices.get(sku_ids[j], {}).get("price", 0.0)
+        return (-match_percent[j], price, j)
+
+    return heapq.nsmallest(k, contenders, key=rank_key)
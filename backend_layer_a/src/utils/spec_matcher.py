@@ -1,5 +1,6 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional
 import re
+import sys
 
 SYNONYMS = {
     "xlpe": ["cross-linked polyethylene", "xlpe"],
@@ -9,17 +10,31 @@ SYNONYMS = {
     "al": ["aluminum", "aluminium", "al"]
 }
 
+# Reverse map: synonym -> canonical key (built once instead of scanning SYNONYMS per call)
+SYNONYM_LOOKUP = {syn: sys.intern(key) for key, synonyms in SYNONYMS.items() for syn in synonyms}
+
 def canonicalize(value: Any) -> str:
     if isinstance(value, str):
         val = value.lower().strip()
-        # Check synonyms
-        for key, synonyms in SYNONYMS.items():
-            if val in synonyms:
-                return key
-        return val
+        return SYNONYM_LOOKUP.get(val) or sys.intern(val)
     return str(value)
 
-def check_numeric_match(req_val: float, sku_val: float, tolerance: float = 0.1) -> bool:
+DEFAULT_TOLERANCE = 0.1
+
+# Per-parameter tolerance overrides. Voltage classes are discrete, so they
+# compare numerically ("132 kV" == "0.132MV") but without the ±10% window.
+NUMERIC_TOLERANCE = {
+    "voltage": 0.0,
+}
+
+def tolerance_for(key: str, default: float = DEFAULT_TOLERANCE) -> float:
+    return NUMERIC_TOLERANCE.get(key, default)
+
+def is_numeric_requirement(req_val: Any) -> bool:
+    """HEURISTIC: if it looks like a number, try numeric match."""
+    return isinstance(req_val, (int, float)) or (isinstance(req_val, str) and req_val.replace('.','',1).isdigit())
+
+def check_numeric_match(req_val: float, sku_val: float, tolerance: float = DEFAULT_TOLERANCE) -> bool:
     """Check if sku_val is within tolerance of req_val."""
     try:
         req = float(req_val)
@@ -28,48 +43,98 @@ def check_numeric_match(req_val: float, sku_val: float, tolerance: float = 0.1)
     except (ValueError, TypeError):
         return False
 
+# --- Precompiled specs ---
+# Specs are compiled once per SKU (at catalog load) and once per line item,
+# so the matcher compares typed values instead of re-parsing strings.
+
+_VOLTAGE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(kv|mv|v)?\s*$", re.IGNORECASE)
+_VOLTAGE_SCALE_KV = {"v": 0.001, "kv": 1.0, "mv": 1000.0}
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(?:mm2|mm²|sqmm|sq\.?\s*mm)?\s*$", re.IGNORECASE)
+
+def parse_voltage_kv(value: Any) -> Optional[float]:
+    """'132kV' / '132 kV' / '0.132MV' / '415V' -> kV as float. Bare numbers are kV."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _VOLTAGE_RE.match(str(value))
+    if not match:
+        return None
+    scale = _VOLTAGE_SCALE_KV[(match.group(2) or "kv").lower()]
+    return round(float(match.group(1)) * scale, 6)
+
+def parse_size_mm2(value: Any) -> Optional[float]:
+    """'300', 300, '300mm2', '300 sqmm' -> mm² as float."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _SIZE_RE.match(str(value))
+    return float(match.group(1)) if match else None
+
+UNIT_PARSERS = {
+    "voltage": parse_voltage_kv,
+    "conductor_size_mm2": parse_size_mm2,
+}
+
+class SpecValue(NamedTuple):
+    raw: Any                  # original value, used in mismatch reasons
+    number: Optional[float]   # unit-normalized numeric value, if any
+    token: str                # interned canonical token for categorical compare
+    numeric: bool             # as a requirement: compare numerically
+
+def compile_value(key: str, value: Any) -> SpecValue:
+    if isinstance(value, SpecValue):
+        return value
+    parser = UNIT_PARSERS.get(key)
+    number = parser(value) if parser else None
+    if number is None:
+        try:
+            number = float(value)
+        except (ValueError, TypeError):
+            number = None
+    numeric = number is not None and (parser is not None or is_numeric_requirement(value))
+    return SpecValue(value, number, canonicalize(value), numeric)
+
+def compile_specs(specs: Dict[str, Any]) -> Dict[str, SpecValue]:
+    """Compile a spec dict (idempotent)."""
+    return {key: compile_value(key, val) for key, val in specs.items()}
+
+def values_match(key: str, req: SpecValue, sku: SpecValue, tolerance: float = DEFAULT_TOLERANCE) -> bool:
+    # Numeric check
+    if req.numeric and sku.number is not None:
+        if abs(sku.number - req.number) <= req.number * tolerance_for(key, tolerance):
+            return True
+    # Categorical/Exact check (fallback or string)
+    return req.token == sku.token
+
 def calculate_spec_match(required_specs: Dict[str, Any], sku_specs: Dict[str, Any]) -> Dict[str, Any]:
     """
     Deterministically calculate match percentage.
+    Accepts raw or precompiled (compile_specs) spec dicts.
     Returns details including match %, params matched vs total, and reasons.
     """
     matched_count = 0
     total_params = 0
     mismatch_reasons = []
+    sku_compiled = compile_specs(sku_specs)
 
-    for key, req_val in required_specs.items():
+    for key, req_val in compile_specs(required_specs).items():
         total_params += 1
-        sku_val = sku_specs.get(key)
-        
+        sku_val = sku_compiled.get(key)
+
         # Missing param logic
-        if sku_val is None:
+        if sku_val is None or sku_val.raw is None:
             mismatch_reasons.append(f"Missing {key}")
             continue
 
-        # Canonicalize
-        canon_req = canonicalize(req_val)
-        canon_sku = canonicalize(sku_val)
-
-        is_match = False
-        
-        # Numeric check
-        # HEURISTIC: if it looks like a number, try numeric match
-        if isinstance(req_val, (int, float)) or (isinstance(req_val, str) and req_val.replace('.','',1).isdigit()):
-             if check_numeric_match(req_val, sku_val):
-                 is_match = True
-        
-        # Categorical/Exact check (fallback or string)
-        if not is_match:
-             if canon_req == canon_sku:
-                 is_match = True
-        
-        if is_match:
+        if values_match(key, req_val, sku_val):
             matched_count += 1
         else:
-            mismatch_reasons.append(f"Mismatch {key}: Req '{req_val}' vs SKU '{sku_val}'")
+            mismatch_reasons.append(f"Mismatch {key}: Req '{req_val.raw}' vs SKU '{sku_val.raw}'")
 
     match_percent = (matched_count / total_params * 100) if total_params > 0 else 0.0
-    
+
     return {
         "match_percent": round(match_percent, 2),
         "matched_params": matched_count,
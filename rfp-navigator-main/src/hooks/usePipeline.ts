@@ -172,13 +172,39 @@ export function usePipeline() {
           }
         };
 
-        // Task B: Real Backend Polling
+        // Task B: Real Backend Events. Fetch the final JSON once the pipeline
+        // reports COMPLETED; fall back to polling if the socket drops.
+        const waitForEvents = () =>
+          new Promise<string>((resolve) => {
+            let status = 'UNKNOWN';
+            api.subscribe(
+              pipelineId,
+              (events) => {
+                for (const e of events) {
+                  if (e.type === 'PIPELINE_STATUS') {
+                    status = e.payload.status;
+                  } else if (e.type === 'AGENT_OUTPUT' || e.type === 'AGENT_START') {
+                    addEvent({
+                      type: 'AGENT_OUTPUT',
+                      message: e.payload.output?.message || e.payload.message || `${e.payload.agent} started.`,
+                      agent: e.payload.agent,
+                      data: e.payload.output,
+                    });
+                  }
+                }
+              },
+              () => resolve(status)
+            );
+          });
+
         const pollingTask = async () => {
+          const status = await waitForEvents();
+          if (status === 'FAILED') throw new Error("Pipeline Failed");
+
           let finalResult = null;
           let attempts = 0;
           while (!finalResult && attempts < 60) {
             attempts++;
-            await new Promise(r => setTimeout(r, 2000)); // 2 sec poll
             try {
               const check = await api.getPipelineFinal(pipelineId);
               if (check && !check.error) {
@@ -186,6 +212,7 @@ export function usePipeline() {
                 break;
               }
             } catch (ignore) { }
+            await new Promise(r => setTimeout(r, 2000)); // 2 sec poll
           }
           if (!finalResult) throw new Error("Pipeline Timeout");
           return finalResult;
@@ -1,15 +1,60 @@
 const API_BASE = "http://localhost:8000"; // Assuming local backend
+const WS_BASE = API_BASE.replace(/^http/, "ws");
+
+export interface BackendEvent {
+    type: string;
+    timestamp?: string;
+    pipeline_id?: string;
+    seq?: number;
+    payload: any;
+}
+
+// Local scans are paged by deadline; pass the previous response's next_cursor for the next page
+export interface ScanOptions {
+    cursor?: string;
+    limit?: number;
+    days?: number;
+    issuer?: string;
+    min_value?: number;
+    max_value?: number;
+    query?: string;
+}
 
 export const api = {
-    scan: async (demo: boolean = true, urls: string[] = []) => {
+    scan: async (demo: boolean = true, urls: string[] = [], options: ScanOptions = {}) => {
         const res = await fetch(`${API_BASE}/api/v1/scan`, {
             method: "POST",
             headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ demo, urls }),
+            body: JSON.stringify({ demo, urls, ...options }),
         });
         return res.json();
     },
 
+    // Concurrent URL scan: onRecord gets one record per URL as it finishes
+    // ({type: "rfp" | "skipped" | "error", ...}), then {type: "summary", ...}
+    scanStream: async (urls: string[], onRecord: (record: any) => void) => {
+        const res = await fetch(`${API_BASE}/api/v1/scan`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ urls, stream: true }),
+        });
+        if (!res.body) throw new Error("Streaming not supported");
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = "";
+        for (;;) {
+            const { done, value } = await reader.read();
+            buffered += decoder.decode(value, { stream: !done });
+            const lines = buffered.split("\n");
+            buffered = lines.pop() ?? "";
+            for (const line of lines) {
+                if (line.trim()) onRecord(JSON.parse(line));
+            }
+            if (done) break;
+        }
+        if (buffered.trim()) onRecord(JSON.parse(buffered));
+    },
+
     trigger: async (rfp_url?: string) => {
         const res = await fetch(`${API_BASE}/api/v1/trigger`, {
             method: "POST",
@@ -19,6 +64,20 @@ export const api = {
         return res.json();
     },
 
+    triggerBatch: async (rfp_ids: string[] = [], rfp_urls: string[] = []) => {
+        const res = await fetch(`${API_BASE}/api/v1/trigger/batch`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ rfp_ids, rfp_urls }),
+        });
+        return res.json();
+    },
+
+    getBatchStatus: async (batchId: string) => {
+        const res = await fetch(`${API_BASE}/api/v1/trigger/batch/${batchId}`);
+        return res.json();
+    },
+
     getPipelineStatus: async (pipelineId: string) => {
         const res = await fetch(`${API_BASE}/api/v1/pipeline/${pipelineId}`);
         return res.json();
@@ -27,5 +86,21 @@ export const api = {
     getPipelineFinal: async (pipelineId: string) => {
         const res = await fetch(`${API_BASE}/api/v1/pipeline/${pipelineId}/final`);
         return res.json();
+    },
+
+    // Live events for one pipeline (buffered events are replayed first).
+    // Returns a function that closes the socket.
+    subscribe: (
+        pipelineId: string,
+        onEvents: (events: BackendEvent[], dropped: number) => void,
+        onClose?: (clean: boolean) => void
+    ) => {
+        const ws = new WebSocket(`${WS_BASE}/ws?pipeline_id=${encodeURIComponent(pipelineId)}`);
+        ws.onmessage = (msg) => {
+            const frame = JSON.parse(msg.data);
+            onEvents(frame.events || [], frame.dropped || 0);
+        };
+        ws.onclose = (e) => onClose?.(e.wasClean);
+        return () => ws.close();
     }
 };